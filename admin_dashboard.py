@@ -1,13 +1,23 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ui_components import ModernButton
+from ui_components import ModernButton, BusyIndicator
 from config import Config
+from task_runner import TaskRunner
 from property_management import PropertyManagementWindow
 from user_management import UserManagementWindow
 from transaction_management import TransactionManagementWindow
 from analytics_dashboard import AnalyticsDashboard
+from analytics_snapshots import SnapshotView
+from image_manager import get_image_manager
 
-class AdminDashboard:
+def fetch_admin_snapshot(db_manager):
+    """Overview statistics and recent activity (snapshot source, worker thread)"""
+    return {
+        'stats': db_manager.get_admin_statistics(),
+        'activities': db_manager.get_recent_activities(limit=Config.ACTIVITY_PAGE_SIZE)
+    }
+
+class AdminDashboard(SnapshotView):
     def __init__(self, parent, db_manager, admin_user):
         self.parent = parent
         self.db_manager = db_manager
@@ -22,8 +32,12 @@ class AdminDashboard:
         self.window.transient(parent)
         self.window.grab_set()
         
+        self.init_snapshot("admin_overview", fetch_admin_snapshot, self.display_dashboard_data)
+        
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window, on_busy_change=self.busy_indicator.set_busy)
         self.load_dashboard_data()
+        self.start_snapshot_updates(self.db_manager)
     
     def create_widgets(self):
         # Header
@@ -140,7 +154,20 @@ class AdminDashboard:
             selectbackground=Config.PRIMARY_COLOR,
             height=10
         )
-        self.activity_listbox.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        self.activity_listbox.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        
+        # Older entries are paged in from the activity log, below the snapshot's first page
+        self.activity_cursor = None
+        self.older_btn = ModernButton(
+            activity_frame,
+            text="Show older",
+            command=self.load_older_activities,
+            style="outline",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            padx=10,
+            pady=5
+        )
+        self.older_btn.pack(pady=(0, 20))
     
     def create_stat_card(self, parent, title, value, color):
         """Create a statistics card"""
@@ -233,13 +260,16 @@ class AdminDashboard:
         info_header.pack(pady=20)
         
         # System details
+        cache_stats = get_image_manager().cache_stats()
         system_info = [
             ("Application Name", Config.APP_NAME),
             ("Version", Config.VERSION),
             ("Database Host", Config.DB_HOST),
             ("Database Name", Config.DB_NAME),
             ("Admin User", f"{self.admin_user['first_name']} {self.admin_user['last_name']}"),
-            ("Admin Email", self.admin_user['email'])
+            ("Admin Email", self.admin_user['email']),
+            ("Image Cache", f"{cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                            f"({cache_stats['hit_rate']:.0%}), {cache_stats['bytes'] / (1024 * 1024):.1f} MB")
         ]
         
         for label, value in system_info:
@@ -280,12 +310,58 @@ class AdminDashboard:
             anchor="w"
         )
         self.status_label.pack(side="left", padx=10, pady=2)
+        
+        self.busy_indicator = BusyIndicator(self.status_bar)
+        self.busy_indicator.pack(side="right", padx=10, pady=2)
+        
+        refresh_link = tk.Label(
+            self.status_bar,
+            text="Refresh",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL, "underline"),
+            bg=Config.BORDER_COLOR,
+            fg=Config.PRIMARY_COLOR,
+            cursor="hand2"
+        )
+        refresh_link.pack(side="right", padx=10, pady=2)
+        refresh_link.bind("<Button-1>", lambda e: self.load_dashboard_data(force=True))
+        
+        # Age of the overview figures
+        self.as_of_label = tk.Label(
+            self.status_bar,
+            text="",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            bg=Config.BORDER_COLOR,
+            fg=Config.TEXT_SECONDARY
+        )
+        self.as_of_label.pack(side="right", pady=2)
+    
+    def load_dashboard_data(self, force=False):
+        """Show the shared overview snapshot now; query in the background only if it is missing, stale or forced"""
+        snapshot = self.snapshots.get("admin_overview")
+        if snapshot is not None:
+            self.display_snapshot(snapshot)
+        if not force and not self.snapshots.is_stale(snapshot):
+            return
+        
+        self.task_runner.submit(
+            "dashboard",
+            self.snapshots.refresh,
+            "admin_overview",
+            self.db_manager,
+            force,
+            on_success=self.display_snapshot,
+            on_error=self.on_dashboard_error,
+            description="Loading dashboard..."
+        )
     
-    def load_dashboard_data(self):
-        """Load dashboard statistics and recent activity"""
+    def on_dashboard_error(self, error):
+        messagebox.showerror("Error", f"Failed to load dashboard data: {str(error)}")
+        self.update_status("Error loading dashboard data")
+    
+    def display_dashboard_data(self, results):
+        """Update stat cards and activity feed"""
         try:
-            # Get statistics
-            stats = self.db_manager.get_admin_statistics()
+            stats = results['stats']
             
             # Update stat cards
             self.stats_cards['properties_count'].value_label.configure(text=str(stats['total_properties']))
@@ -294,11 +370,9 @@ class AdminDashboard:
             self.stats_cards['monthly_revenue'].value_label.configure(text=f"${stats['monthly_revenue']:,.0f}")
             
             # Load recent activity
-            activities = self.db_manager.get_recent_activities(limit=20)
             self.activity_listbox.delete(0, tk.END)
-            
-            for activity in activities:
-                self.activity_listbox.insert(tk.END, activity)
+            self.activity_cursor = None
+            self.append_activities(results['activities'])
             
             self.update_status("Dashboard data loaded successfully")
             
@@ -306,6 +380,30 @@ class AdminDashboard:
             messagebox.showerror("Error", f"Failed to load dashboard data: {str(e)}")
             self.update_status("Error loading dashboard data")
     
+    def append_activities(self, activities):
+        """Add a page of activity log entries (newest first) below those shown"""
+        for activity in activities:
+            self.activity_listbox.insert(tk.END, f"{activity['created_at']:%b %d %H:%M}   {activity['message']}")
+        if activities:
+            self.activity_cursor = activities[-1]['cursor']
+        self.older_btn.configure(
+            state="normal" if len(activities) == Config.ACTIVITY_PAGE_SIZE else "disabled"
+        )
+    
+    def load_older_activities(self):
+        """Fetch the page of activity before the oldest entry shown"""
+        if self.activity_cursor is None:
+            return
+        self.task_runner.submit(
+            "older_activities",
+            self.db_manager.get_recent_activities,
+            Config.ACTIVITY_PAGE_SIZE,
+            self.activity_cursor,
+            on_success=self.append_activities,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load activity: {str(e)}"),
+            description="Loading older activity..."
+        )
+    
     def open_property_management(self):
         """Open property management window"""
         PropertyManagementWindow(self.window, self.db_manager, self.admin_user)
@@ -1,13 +1,157 @@
 import tkinter as tk
+import threading
 from tkinter import ttk, messagebox
-from ui_components import ModernButton
+from collections import OrderedDict
+from PIL import Image, ImageTk
+from ui_components import ModernButton, BusyIndicator
 from config import Config
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from task_runner import TaskRunner, current_task
+from analytics_engine import get_analytics_engine
+from analytics_snapshots import SnapshotView
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import FuncFormatter
 import matplotlib.dates as mdates
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 
-class AnalyticsDashboard:
+CHART_RANGES = {"Last 12 Months": 12, "Last 2 Years": 24, "Last 5 Years": 60}
+BREAKDOWN_DIMENSIONS = {
+    "City": 'city',
+    "State": 'state',
+    "Property Type": 'property_type',
+    "Transaction Type": 'transaction_type',
+    "Year": 'year',
+    "Quarter": 'quarter',
+    "Month": 'month'
+}
+TOP_PROPERTY_METRICS = {
+    "Sale Price": 'sale_price',
+    "Price per Sq Ft": 'price_per_sqft',
+    "Fastest to Close": 'days_to_close',
+    "Most Favorited": 'favorites',
+    "Most Viewed": 'views'
+}
+SALE_PRICE_METRICS = ('sale_price', 'price_per_sqft')
+TOP_PROPERTY_TYPES = ["All Types", "House", "Apartment", "Condo", "Loft", "Townhouse"]
+TOP_PROPERTY_PERIODS = {"All Time": None, "Last 30 Days": 30, "Last 90 Days": 90, "Last 12 Months": 365}
+CHART_DPI = 100
+CHART_DEFAULT_SIZE = (640, 360)
+
+class ChartCache:
+    """Rendered charts keyed by (chart, date range, size), shared by dashboard windows.
+
+    Each entry remembers the series it was drawn from; a lookup with different
+    data (new transactions since) misses, so stale charts are never shown.
+    """
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, data):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != data:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def put(self, key, data, image):
+        with self._lock:
+            self._entries[key] = (data, image)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+chart_cache = ChartCache(Config.ANALYTICS_CHART_CACHE_SIZE)
+
+def style_axes(axes, months):
+    """Shared look for the monthly time-series charts"""
+    locator = mdates.AutoDateLocator(minticks=3, maxticks=8)
+    axes.xaxis.set_major_locator(locator)
+    axes.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    axes.tick_params(labelsize=8, colors=Config.TEXT_SECONDARY)
+    for side in ("top", "right"):
+        axes.spines[side].set_visible(False)
+    axes.grid(axis="y", color=Config.BORDER_COLOR, linewidth=0.8)
+    axes.set_axisbelow(True)
+    if months:
+        axes.set_xlim(months[0] - timedelta(days=16), months[-1] + timedelta(days=16))
+
+def format_currency_tick(value, position):
+    if abs(value) >= 1_000_000:
+        return f"${value / 1_000_000:,.1f}M"
+    return f"${value / 1000:,.0f}k"
+
+def draw_revenue_chart(axes, revenue):
+    """Stacked monthly revenue bars, sales and rentals"""
+    months = [point['month'] for point in revenue]
+    sales = [point['purchase'] for point in revenue]
+    rentals = [point['rent'] for point in revenue]
+    
+    axes.bar(months, sales, width=24, color=Config.PRIMARY_COLOR, label="Sales")
+    axes.bar(months, rentals, width=24, bottom=sales, color=Config.ACCENT_COLOR, label="Rentals")
+    axes.yaxis.set_major_formatter(FuncFormatter(format_currency_tick))
+    axes.legend(loc="upper left", fontsize=8, frameon=False)
+    style_axes(axes, months)
+
+def draw_inventory_chart(axes, inventory):
+    """Stacked listing counts by status at each month end"""
+    months = [point['month'] for point in inventory]
+    statuses = [
+        ('available', "Available", Config.SUCCESS_COLOR),
+        ('pending', "Pending", Config.ACCENT_COLOR),
+        ('sold', "Sold", Config.PRIMARY_COLOR),
+        ('rented', "Rented", Config.SECONDARY_COLOR)
+    ]
+    
+    axes.stackplot(
+        months,
+        *[[point[key] for point in inventory] for key, _, _ in statuses],
+        labels=[label for _, label, _ in statuses],
+        colors=[color for _, _, color in statuses],
+        alpha=0.85
+    )
+    axes.legend(loc="upper left", fontsize=8, frameon=False)
+    style_axes(axes, months)
+
+CHART_DRAWERS = {'revenue': draw_revenue_chart, 'inventory': draw_inventory_chart}
+
+def fetch_analytics_snapshot(db_manager):
+    """Dashboard cards, days-on-market and price-per-sqft tables (snapshot source, worker thread)"""
+    return {
+        'analytics': db_manager.get_analytics_data(),
+        'days_on_market': {
+            group_by: db_manager.get_days_on_market_stats(group_by)
+            for group_by in ('property_type', 'city')
+        },
+        'price_per_sqft': {
+            (group_by, kind): db_manager.get_price_per_sqft_percentiles(group_by, kind)
+            for group_by in ('property_type', 'city') for kind in ('listing', 'sale')
+        }
+    }
+
+def render_chart(name, data, size):
+    """Draw a chart with the Agg backend (safe off the Tk thread) into a PIL image"""
+    width, height = size
+    figure = Figure(figsize=(width / CHART_DPI, height / CHART_DPI), dpi=CHART_DPI, facecolor=Config.CARD_COLOR)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.set_facecolor(Config.CARD_COLOR)
+    
+    if data:
+        CHART_DRAWERS[name](axes, data)
+    else:
+        axes.set_axis_off()
+        axes.text(0.5, 0.5, "No data for this period", ha="center", va="center",
+                  color=Config.TEXT_SECONDARY, transform=axes.transAxes)
+    
+    figure.tight_layout()
+    canvas.draw()
+    return Image.frombuffer("RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1).copy()
+
+class AnalyticsDashboard(SnapshotView):
     def __init__(self, parent, db_manager, admin_user):
         self.parent = parent
         self.db_manager = db_manager
@@ -18,8 +162,18 @@ class AnalyticsDashboard:
         self.window.geometry("1400x900")
         self.window.configure(bg=Config.BACKGROUND_COLOR)
         
+        self.analytics_engine = get_analytics_engine()
+        self.init_snapshot("analytics", fetch_analytics_snapshot, self.display_analytics_data)
+        self.chart_images = {}
+        self.chart_sizes = {}
+        self.chart_resize_job = None
+        
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window, on_busy_change=self.busy_indicator.set_busy)
         self.load_analytics_data()
+        self.load_breakdown()
+        self.load_top_properties()
+        self.start_snapshot_updates(self.db_manager)
     
     def create_widgets(self):
         # Header
@@ -47,6 +201,28 @@ class AnalyticsDashboard:
         )
         close_btn.pack(side="right")
         
+        refresh_btn = ModernButton(
+            header_content,
+            text="Refresh",
+            command=self.refresh_all,
+            style="outline"
+        )
+        refresh_btn.pack(side="right", padx=(0, 10))
+        
+        # Age of the figures shown
+        self.as_of_label = tk.Label(
+            header_content,
+            text="",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            bg=Config.PRIMARY_COLOR,
+            fg="white"
+        )
+        self.as_of_label.pack(side="right", padx=(0, 20))
+        
+        # Background activity indicator
+        self.busy_indicator = BusyIndicator(header_content, bg=Config.PRIMARY_COLOR, fg="white")
+        self.busy_indicator.pack(side="right", padx=(0, 20))
+        
         # Main content with notebook
         main_frame = tk.Frame(self.window, bg=Config.BACKGROUND_COLOR)
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -86,35 +262,74 @@ class AnalyticsDashboard:
         for i in range(4):
             metrics_frame.columnconfigure(i, weight=1)
         
+        # Chart period
+        range_frame = tk.Frame(overview_frame, bg=Config.BACKGROUND_COLOR)
+        range_frame.pack(fill="x", pady=(0, 10))
+        
+        range_label = tk.Label(
+            range_frame,
+            text="Period:",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM),
+            bg=Config.BACKGROUND_COLOR,
+            fg=Config.TEXT_PRIMARY
+        )
+        range_label.pack(side="left", padx=(10, 5))
+        
+        self.chart_range_var = tk.StringVar(value=next(iter(CHART_RANGES)))
+        range_combo = ttk.Combobox(
+            range_frame,
+            textvariable=self.chart_range_var,
+            values=list(CHART_RANGES),
+            state="readonly",
+            width=15
+        )
+        range_combo.pack(side="left")
+        range_combo.bind("<<ComboboxSelected>>", lambda e: self.load_charts())
+        
         # Charts frame
         charts_frame = tk.Frame(overview_frame, bg=Config.BACKGROUND_COLOR)
         charts_frame.pack(fill="both", expand=True)
         
-        # Revenue trend chart
+        # Revenue trend chart (sized by the layout, not by the rendered image)
         self.revenue_chart_frame = tk.Frame(charts_frame, bg=Config.CARD_COLOR, relief="solid", borderwidth=1)
         self.revenue_chart_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        self.revenue_chart_frame.pack_propagate(False)
         
         revenue_header = tk.Label(
             self.revenue_chart_frame,
-            text="Revenue Trend (Last 12 Months)",
+            text="Monthly Revenue by Transaction Type",
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY
         )
         revenue_header.pack(pady=10)
         
-        # Property type distribution chart
+        # Listing inventory chart
         self.property_chart_frame = tk.Frame(charts_frame, bg=Config.CARD_COLOR, relief="solid", borderwidth=1)
         self.property_chart_frame.pack(side="right", fill="both", expand=True, padx=(10, 0))
+        self.property_chart_frame.pack_propagate(False)
         
         property_header = tk.Label(
             self.property_chart_frame,
-            text="Property Type Distribution",
+            text="Listing Inventory by Status",
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY
         )
         property_header.pack(pady=10)
+        
+        self.chart_labels = {}
+        for name, frame in (('revenue', self.revenue_chart_frame), ('inventory', self.property_chart_frame)):
+            chart_label = tk.Label(
+                frame,
+                text="Loading chart...",
+                font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM),
+                bg=Config.CARD_COLOR,
+                fg=Config.TEXT_SECONDARY
+            )
+            chart_label.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+            chart_label.bind("<Configure>", self.on_chart_resize, add="+")
+            self.chart_labels[name] = chart_label
     
     def create_sales_tab(self):
         """Create sales analytics tab"""
@@ -130,57 +345,106 @@ class AnalyticsDashboard:
             ("This Month Sales", "monthly_sales", Config.SUCCESS_COLOR),
             ("This Year Sales", "yearly_sales", Config.PRIMARY_COLOR),
             ("Avg. Days on Market", "avg_days_market", Config.SECONDARY_COLOR),
-            ("Conversion Rate", "conversion_rate", Config.ACCENT_COLOR)
+            ("Conversion Rate", "conversion_rate", Config.ACCENT_COLOR),
+            ("View to Favorite", "favorite_rate", Config.SECONDARY_COLOR),
+            ("Favorite to Transaction", "favorite_conversion_rate", Config.SUCCESS_COLOR)
         ]
         
         for i, (title, key, color) in enumerate(sales_data):
             card = self.create_metric_card(sales_metrics_frame, title, "Loading...", color)
-            card.grid(row=0, column=i, padx=10, pady=10, sticky="ew")
+            card.grid(row=i // 3, column=i % 3, padx=10, pady=10, sticky="ew")
             self.sales_cards[key] = card
         
         # Configure grid weights
-        for i in range(4):
+        for i in range(3):
             sales_metrics_frame.columnconfigure(i, weight=1)
         
         # Sales charts
         sales_charts_frame = tk.Frame(sales_frame, bg=Config.BACKGROUND_COLOR)
         sales_charts_frame.pack(fill="both", expand=True)
         
-        # Monthly sales chart
+        # Completed sales broken down by a chosen dimension
         self.monthly_sales_frame = tk.Frame(sales_charts_frame, bg=Config.CARD_COLOR, relief="solid", borderwidth=1)
         self.monthly_sales_frame.pack(fill="both", expand=True, pady=(0, 10))
         
+        breakdown_header_frame = tk.Frame(self.monthly_sales_frame, bg=Config.CARD_COLOR)
+        breakdown_header_frame.pack(fill="x", padx=20, pady=10)
+        
         monthly_header = tk.Label(
-            self.monthly_sales_frame,
-            text="Monthly Sales Volume",
+            breakdown_header_frame,
+            text="Sales Breakdown by",
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY
         )
-        monthly_header.pack(pady=10)
+        monthly_header.pack(side="left")
+        
+        self.breakdown_var = tk.StringVar(value=next(iter(BREAKDOWN_DIMENSIONS)))
+        breakdown_combo = ttk.Combobox(
+            breakdown_header_frame,
+            textvariable=self.breakdown_var,
+            values=list(BREAKDOWN_DIMENSIONS),
+            state="readonly",
+            width=15
+        )
+        breakdown_combo.pack(side="left", padx=(10, 0))
+        breakdown_combo.bind("<<ComboboxSelected>>", lambda e: self.load_breakdown())
+        
+        breakdown_columns = ("Group", "Sales", "Revenue", "Average", "Median")
+        self.breakdown_tree = ttk.Treeview(
+            self.monthly_sales_frame,
+            columns=breakdown_columns,
+            show="headings",
+            height=8
+        )
+        
+        for col in breakdown_columns:
+            self.breakdown_tree.heading(col, text=col)
+            self.breakdown_tree.column(col, width=150)
+        
+        self.breakdown_tree.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
         # Top performing properties
         top_properties_frame = tk.Frame(sales_charts_frame, bg=Config.CARD_COLOR, relief="solid", borderwidth=1)
         top_properties_frame.pack(fill="both", expand=True)
         
+        top_header_frame = tk.Frame(top_properties_frame, bg=Config.CARD_COLOR)
+        top_header_frame.pack(fill="x", padx=20, pady=10)
+        
         top_header = tk.Label(
-            top_properties_frame,
-            text="Top Performing Properties",
+            top_header_frame,
+            text=f"Top {Config.TOP_PROPERTIES_LIMIT} Properties by",
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY
         )
-        top_header.pack(pady=10)
+        top_header.pack(side="left")
+        
+        self.top_metric_var = tk.StringVar(value=next(iter(TOP_PROPERTY_METRICS)))
+        self.top_type_var = tk.StringVar(value=TOP_PROPERTY_TYPES[0])
+        self.top_period_var = tk.StringVar(value=next(iter(TOP_PROPERTY_PERIODS)))
+        for variable, values in ((self.top_metric_var, list(TOP_PROPERTY_METRICS)),
+                                 (self.top_type_var, TOP_PROPERTY_TYPES),
+                                 (self.top_period_var, list(TOP_PROPERTY_PERIODS))):
+            combo = ttk.Combobox(
+                top_header_frame,
+                textvariable=variable,
+                values=values,
+                state="readonly",
+                width=15
+            )
+            combo.pack(side="left", padx=(10, 0))
+            combo.bind("<<ComboboxSelected>>", lambda e: self.load_top_properties())
         
         # Top properties list
         self.top_properties_tree = ttk.Treeview(
             top_properties_frame,
-            columns=("Property", "Type", "Sale Price", "Days on Market"),
+            columns=("Property", "Type", "City", "Value"),
             show="headings",
             height=8
         )
         
-        for col in ["Property", "Type", "Sale Price", "Days on Market"]:
+        for col in ["Property", "Type", "City", "Value"]:
             self.top_properties_tree.heading(col, text=col)
             self.top_properties_tree.column(col, width=150)
         
@@ -222,25 +486,54 @@ class AnalyticsDashboard:
         
         price_header = tk.Label(
             self.price_dist_frame,
-            text="Price Distribution",
+            text="Price per Sq Ft by Type and Location",
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY
         )
         price_header.pack(pady=10)
         
+        price_columns = ("Listings", "Median Ask", "P90 Ask", "Sales", "Median Sale", "P90 Sale")
+        self.price_sqft_tree = ttk.Treeview(
+            self.price_dist_frame,
+            columns=price_columns,
+            show="tree headings",
+            height=8
+        )
+        self.price_sqft_tree.heading("#0", text="Group")
+        self.price_sqft_tree.column("#0", width=150)
+        for col in price_columns:
+            self.price_sqft_tree.heading(col, text=col)
+            self.price_sqft_tree.column(col, width=80)
+        
+        self.price_sqft_tree.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
         # Location distribution chart
         self.location_dist_frame = tk.Frame(prop_charts_frame, bg=Config.CARD_COLOR, relief="solid", borderwidth=1)
         self.location_dist_frame.pack(side="right", fill="both", expand=True, padx=(10, 0))
         
         location_header = tk.Label(
             self.location_dist_frame,
-            text="Properties by Location",
+            text="Days on Market by Type and Location",
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY
         )
         location_header.pack(pady=10)
+        
+        self.days_market_tree = ttk.Treeview(
+            self.location_dist_frame,
+            columns=("Closed", "Avg. Days", "Range"),
+            show="tree headings",
+            height=8
+        )
+        self.days_market_tree.heading("#0", text="Group")
+        self.days_market_tree.column("#0", width=180)
+        for col in ["Closed", "Avg. Days", "Range"]:
+            self.days_market_tree.heading(col, text=col)
+            self.days_market_tree.column(col, width=100)
+        
+        self.days_market_tree.pack(fill="both", expand=True, padx=20, pady=(0, 20))
     
     def create_users_tab(self):
         """Create users analytics tab"""
@@ -334,11 +627,36 @@ class AnalyticsDashboard:
         
         return card_frame
     
-    def load_analytics_data(self):
-        """Load all analytics data"""
+    def load_analytics_data(self, force=False):
+        """Show the shared analytics snapshot now; query in the background only if it is missing, stale or forced"""
+        snapshot = self.snapshots.get("analytics")
+        if snapshot is not None:
+            self.display_snapshot(snapshot)
+        if not force and not self.snapshots.is_stale(snapshot):
+            return
+        
+        self.task_runner.submit(
+            "analytics",
+            self.snapshots.refresh,
+            "analytics",
+            self.db_manager,
+            force,
+            on_success=self.display_snapshot,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load analytics data: {str(e)}"),
+            description="Loading analytics..."
+        )
+    
+    def refresh_all(self):
+        """Forced refresh of the snapshot and every panel"""
+        self.load_analytics_data(force=True)
+        self.load_charts()
+        self.load_breakdown()
+        self.load_top_properties()
+    
+    def display_analytics_data(self, results):
+        """Populate cards, charts and tables from fetched analytics"""
         try:
-            # Get analytics data from database
-            analytics_data = self.db_manager.get_analytics_data()
+            analytics_data = results['analytics']
             
             # Update overview cards
             self.overview_cards['total_revenue'].value_label.configure(
@@ -364,9 +682,8 @@ class AnalyticsDashboard:
             self.sales_cards['avg_days_market'].value_label.configure(
                 text=f"{analytics_data['avg_days_market']} days"
             )
-            self.sales_cards['conversion_rate'].value_label.configure(
-                text=f"{analytics_data['conversion_rate']:.1f}%"
-            )
+            for key in ('conversion_rate', 'favorite_rate', 'favorite_conversion_rate'):
+                self.sales_cards[key].value_label.configure(text=f"{analytics_data[key]:.1f}%")
             
             # Update property cards
             self.property_cards['total_properties'].value_label.configure(
@@ -396,66 +713,210 @@ class AnalyticsDashboard:
                 text=f"{analytics_data['user_growth']:+.1f}%"
             )
             
-            # Load charts
-            self.load_charts(analytics_data)
-            
-            # Load top properties
-            self.load_top_properties()
+            self.load_days_on_market(results['days_on_market'])
+            self.load_price_per_sqft(results['price_per_sqft'])
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load analytics data: {str(e)}")
     
-    def load_charts(self, analytics_data):
-        """Load chart data"""
-        try:
-            # This is a simplified version - in a real implementation,
-            # you would create actual matplotlib charts here
-            
-            # For now, just show placeholder text
-            placeholder_text = "Chart visualization would be displayed here\nwith matplotlib integration"
-            
-            # Revenue chart placeholder
-            revenue_placeholder = tk.Label(
-                self.revenue_chart_frame,
-                text=placeholder_text,
-                font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM),
-                bg=Config.CARD_COLOR,
-                fg=Config.TEXT_SECONDARY,
-                justify="center"
-            )
-            revenue_placeholder.pack(expand=True)
-            
-            # Property chart placeholder
-            property_placeholder = tk.Label(
-                self.property_chart_frame,
-                text=placeholder_text,
-                font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM),
-                bg=Config.CARD_COLOR,
-                fg=Config.TEXT_SECONDARY,
-                justify="center"
-            )
-            property_placeholder.pack(expand=True)
-            
-        except Exception as e:
-            print(f"Error loading charts: {e}")
+    def chart_period(self):
+        """(start, end) of the selected period: whole months up to and including this one"""
+        months = CHART_RANGES[self.chart_range_var.get()]
+        this_month = date.today().replace(day=1)
+        end = (this_month + timedelta(days=32)).replace(day=1)
+        index = this_month.year * 12 + this_month.month - months
+        return date(index // 12, index % 12 + 1, 1), end
+    
+    def chart_size(self, name):
+        """Pixel size the chart label currently has room for (inside its border)"""
+        label = self.chart_labels[name]
+        inset = 2 * (int(label.cget("borderwidth")) + int(label.cget("highlightthickness")))
+        width, height = label.winfo_width() - inset, label.winfo_height() - inset
+        if width < 100 or height < 100:
+            return CHART_DEFAULT_SIZE
+        return width, height
+    
+    def load_charts(self):
+        """Fetch and render the time-series charts for the selected period in the background"""
+        start, end = self.chart_period()
+        sizes = {name: self.chart_size(name) for name in self.chart_labels}
+        self.chart_sizes = sizes
+        
+        self.task_runner.submit(
+            "charts",
+            self.fetch_charts,
+            start,
+            end,
+            sizes,
+            on_success=self.display_charts,
+            on_error=lambda e: print(f"Error loading charts: {e}"),
+            description="Rendering charts..."
+        )
+    
+    def fetch_charts(self, start, end, sizes):
+        """Run the time-bucketed queries and render each chart, reusing cached renders (worker thread)"""
+        task = current_task()
+        series = {
+            'revenue': self.db_manager.get_monthly_revenue(start, end),
+            'inventory': self.db_manager.get_monthly_inventory(start, end)
+        }
+        
+        images = {}
+        for name, data in series.items():
+            task.check_cancelled()
+            key = (name, start, end, sizes[name])
+            image = chart_cache.get(key, data)
+            if image is None:
+                image = render_chart(name, data, sizes[name])
+                chart_cache.put(key, data, image)
+            images[name] = image
+        return images
+    
+    def display_charts(self, images):
+        """Show rendered charts (Tk thread)"""
+        for name, image in images.items():
+            photo = ImageTk.PhotoImage(image)
+            self.chart_labels[name].configure(image=photo, text="")
+            self.chart_images[name] = photo
+    
+    def on_chart_resize(self, event):
+        """Render once the chart area is laid out, and again when it settles at a new size"""
+        if self.chart_sizes and all(self.chart_size(name) == size for name, size in self.chart_sizes.items()):
+            return
+        
+        if self.chart_resize_job:
+            self.window.after_cancel(self.chart_resize_job)
+        # The first layout settles quickly; window drags keep firing until released
+        self.chart_resize_job = self.window.after(300 if self.chart_sizes else 50, self.resize_charts)
+    
+    def resize_charts(self):
+        self.chart_resize_job = None
+        if not self.task_runner.closed:
+            self.load_charts()
+    
+    def load_breakdown(self):
+        """Bring the analytics engine up to date and break completed sales down by the chosen dimension"""
+        self.task_runner.submit(
+            "breakdown",
+            self.fetch_breakdown,
+            BREAKDOWN_DIMENSIONS[self.breakdown_var.get()],
+            on_success=self.display_breakdown,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load sales breakdown: {str(e)}"),
+            description="Loading sales breakdown..."
+        )
+    
+    def fetch_breakdown(self, dimension):
+        """Incrementally refresh the engine, then aggregate in memory (worker thread)"""
+        self.analytics_engine.refresh(self.db_manager)
+        current_task().check_cancelled()
+        
+        completed = {'status': 'completed'}
+        rows = {}
+        for name, agg in (('total', 'sum'), ('average', 'mean'), ('median', 'quantile')):
+            for row in self.analytics_engine.query('amount', agg, by=(dimension,), where=completed):
+                group = rows.setdefault(row[dimension], {'count': row['count']})
+                group[name] = row['value']
+        return dimension, rows
+    
+    def display_breakdown(self, result):
+        dimension, rows = result
+        for item in self.breakdown_tree.get_children():
+            self.breakdown_tree.delete(item)
+        
+        # Time buckets read chronologically, everything else by revenue
+        if dimension in ('year', 'quarter', 'month'):
+            groups = sorted(rows, reverse=True)
+        else:
+            groups = sorted(rows, key=lambda group: rows[group]['total'], reverse=True)
+        
+        for group in groups:
+            values = rows[group]
+            if dimension == 'month':
+                label = group.strftime("%b %Y")
+            elif dimension == 'quarter':
+                label = f"{group.year} Q{(group.month - 1) // 3 + 1}"
+            else:
+                label = str(group) if group is not None else "Unknown"
+            self.breakdown_tree.insert("", "end", values=(
+                label,
+                values['count'],
+                f"${values['total']:,.0f}",
+                f"${values['average']:,.0f}",
+                f"${values['median']:,.0f}"
+            ))
     
     def load_top_properties(self):
-        """Load top performing properties"""
-        try:
-            top_properties = self.db_manager.get_top_properties()
-            
-            # Clear existing items
-            for item in self.top_properties_tree.get_children():
-                self.top_properties_tree.delete(item)
-            
-            # Add top properties
-            for prop in top_properties[:10]:  # Top 10
-                self.top_properties_tree.insert("", "end", values=(
-                    prop['title'][:30] + "..." if len(prop['title']) > 30 else prop['title'],
-                    prop['property_type'],
-                    f"${prop['price']:,.0f}",
-                    f"{prop.get('days_on_market', 'N/A')} days"
-                ))
-                
-        except Exception as e:
-            print(f"Error loading top properties: {e}")
\ No newline at end of file
+        """Rank properties by the chosen metric within the chosen type and period in the background"""
+        metric = TOP_PROPERTY_METRICS[self.top_metric_var.get()]
+        property_type = self.top_type_var.get()
+        days = TOP_PROPERTY_PERIODS[self.top_period_var.get()]
+        
+        self.task_runner.submit(
+            "top_properties",
+            self.db_manager.get_top_properties,
+            metric,
+            Config.TOP_PROPERTIES_LIMIT,
+            property_type=None if property_type == TOP_PROPERTY_TYPES[0] else property_type,
+            # Rents are monthly amounts, so prices are only ranked among sale listings
+            listing_type='sale' if metric in SALE_PRICE_METRICS else None,
+            start=date.today() - timedelta(days=days) if days else None,
+            on_success=lambda top_properties: self.display_top_properties(metric, top_properties),
+            on_error=lambda e: print(f"Error loading top properties: {e}"),
+            description="Ranking properties..."
+        )
+    
+    def display_top_properties(self, metric, top_properties):
+        """Show ranked properties with the ranked value (Tk thread)"""
+        self.top_properties_tree.heading("Value", text=self.top_metric_var.get())
+        for item in self.top_properties_tree.get_children():
+            self.top_properties_tree.delete(item)
+        
+        for prop in top_properties:
+            value = prop['metric_value']
+            if metric == 'sale_price':
+                value = f"${value:,.0f}"
+            elif metric == 'price_per_sqft':
+                value = f"${value:,.2f}"
+            elif metric == 'days_to_close':
+                value = f"{value} days"
+            self.top_properties_tree.insert("", "end", values=(
+                prop['title'][:30] + "..." if len(prop['title']) > 30 else prop['title'],
+                prop['property_type'],
+                prop['city'],
+                value
+            ))
+    
+    def load_price_per_sqft(self, price_per_sqft):
+        """Show sketched median and p90 price per sq ft of listings and sales per property type and per city"""
+        for item in self.price_sqft_tree.get_children():
+            self.price_sqft_tree.delete(item)
+        
+        def stats(rows, group_by):
+            return {row[group_by]: row for row in rows}
+        
+        def cells(row):
+            if row is None:
+                return (0, "-", "-")
+            return (row['observations'], f"${row['quantiles'][0.5]:,.0f}", f"${row['quantiles'][0.9]:,.0f}")
+        
+        for group_by, title in (('property_type', "By Property Type"), ('city', "By City")):
+            parent = self.price_sqft_tree.insert("", "end", text=title, open=True)
+            listings = stats(price_per_sqft[(group_by, 'listing')], group_by)
+            sales = stats(price_per_sqft[(group_by, 'sale')], group_by)
+            for group in sorted(set(listings) | set(sales)):
+                self.price_sqft_tree.insert(parent, "end", text=group,
+                                            values=cells(listings.get(group)) + cells(sales.get(group)))
+    
+    def load_days_on_market(self, days_on_market):
+        """Show days on market of closed listings per property type and per city"""
+        for item in self.days_market_tree.get_children():
+            self.days_market_tree.delete(item)
+        
+        for group_by, title in (('property_type', "By Property Type"), ('city', "By City")):
+            parent = self.days_market_tree.insert("", "end", text=title, open=True)
+            for stats in days_on_market[group_by]:
+                self.days_market_tree.insert(parent, "end", text=stats[group_by], values=(
+                    stats['closed_listings'],
+                    f"{stats['avg_days']:.0f}",
+                    f"{stats['min_days']}-{stats['max_days']}"
+                ))
\ No newline at end of file
@@ -0,0 +1,327 @@
+"""In-process columnar analytics over the transaction history.
+
+Transactions joined to their property's attributes are loaded once into
+compact NumPy columns (dimensions dictionary-encoded as small integer codes)
+and kept current by appending rows newer than the last one loaded. Queries
+group by any mix of dimensions and time buckets and aggregate a measure with
+vectorized kernels, so a new breakdown is a query() call rather than another
+SQL aggregate.
+"""
+import threading
+import datetime
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+# Row layout of DatabaseManager.get_transaction_facts
+FACT_COLUMNS = (
+    'id', 'transaction_date', 'amount', 'transaction_type', 'status',
+    'property_type', 'listing_type', 'city', 'state', 'list_price', 'square_feet'
+)
+
+# Dictionary-encoded dimensions and the dtype of their codes
+DIMENSIONS = {
+    'transaction_type': np.int8,
+    'status': np.int8,
+    'property_type': np.int8,
+    'listing_type': np.int8,
+    'state': np.int16,
+    'city': np.int32
+}
+TIME_DIMENSIONS = ('year', 'quarter', 'month')
+MEASURES = {'amount': np.float64, 'list_price': np.float64, 'square_feet': np.float32}
+AGGREGATES = ('count', 'sum', 'mean', 'min', 'max', 'quantile')
+
+# Group-by key spaces up to this size are indexed directly; larger ones are compacted first
+DENSE_GROUPS_LIMIT = 1 << 22
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+def to_day(value):
+    """Days since 1970-01-01 of a date or datetime"""
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.toordinal() - EPOCH_ORDINAL
+
+def to_float(value):
+    return np.nan if value is None else float(value)
+
+class AnalyticsEngine:
+    """Append-only columnar store of transaction facts with group-by queries.
+
+    Rows arrive in ascending transaction id order (refresh pages by id), which
+    keeps the id column sorted for point updates. All methods are thread-safe.
+    """
+
+    def __init__(self, initial_capacity=1024):
+        self.size = 0
+        self.capacity = initial_capacity
+        self.columns = {
+            'id': np.zeros(initial_capacity, dtype=np.int64),
+            'day': np.zeros(initial_capacity, dtype=np.int32),
+            'month': np.zeros(initial_capacity, dtype=np.int32),
+            'live': np.zeros(initial_capacity, dtype=bool)
+        }
+        for name, dtype in {**DIMENSIONS, **MEASURES}.items():
+            self.columns[name] = np.zeros(initial_capacity, dtype=dtype)
+
+        self.categories = {dimension: [] for dimension in DIMENSIONS}
+        self.codes = {dimension: {} for dimension in DIMENSIONS}
+
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def last_id(self):
+        with self.lock:
+            return int(self.columns['id'][self.size - 1]) if self.size else 0
+
+    def memory_bytes(self):
+        """Bytes held by the loaded rows"""
+        with self.lock:
+            return sum(column.itemsize * self.size for column in self.columns.values())
+
+    def refresh(self, db_manager, batch_size=50000):
+        """Append transactions added since the last refresh; returns the number of new rows"""
+        with self.refresh_lock:
+            appended = 0
+            while True:
+                rows = db_manager.get_transaction_facts(self.last_id, batch_size)
+                if not rows:
+                    return appended
+                self.append(rows)
+                appended += len(rows)
+
+    def append(self, rows: Sequence[Sequence]):
+        """Append fact rows laid out as FACT_COLUMNS"""
+        if not rows:
+            return
+        values = dict(zip(FACT_COLUMNS, zip(*rows)))
+        self.append_columns({
+            'id': np.array(values['id'], dtype=np.int64),
+            'day': np.fromiter(map(to_day, values['transaction_date']), dtype=np.int32, count=len(rows)),
+            'amount': np.fromiter(map(to_float, values['amount']), dtype=np.float64, count=len(rows)),
+            'list_price': np.fromiter(map(to_float, values['list_price']), dtype=np.float64, count=len(rows)),
+            'square_feet': np.fromiter(map(to_float, values['square_feet']), dtype=np.float32, count=len(rows)),
+            **{dimension: values[dimension] for dimension in DIMENSIONS}
+        })
+
+    def append_columns(self, columns: Dict):
+        """Append whole columns: id, day and measures as arrays, dimensions as raw values"""
+        count = len(columns['id'])
+        if not count:
+            return
+
+        with self.lock:
+            if self.size and columns['id'][0] <= self.columns['id'][self.size - 1]:
+                raise ValueError("Transaction facts must be appended in ascending id order")
+
+            self.reserve(self.size + count)
+            rows = slice(self.size, self.size + count)
+            for name in ('id', 'day', *MEASURES):
+                self.columns[name][rows] = columns[name]
+            # Months since 1970-01, the base of every time bucket
+            self.columns['month'][rows] = np.asarray(columns['day']).astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+            for dimension in DIMENSIONS:
+                self.columns[dimension][rows] = self.encode(dimension, columns[dimension])
+            self.columns['live'][rows] = True
+            self.size += count
+
+    def reserve(self, capacity):
+        """Grow every column geometrically so appends stay amortized O(1)"""
+        if capacity <= self.capacity:
+            return
+        self.capacity = max(capacity, self.capacity * 2)
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+
+    def encode(self, dimension, values):
+        """Integer codes of values, registering unseen categories"""
+        codes = self.codes[dimension]
+        categories = self.categories[dimension]
+
+        def code(value):
+            result = codes.get(value)
+            if result is None:
+                result = codes[value] = len(categories)
+                categories.append(value)
+            return result
+
+        encoded = np.fromiter(map(code, values), dtype=np.int64, count=len(values))
+        if len(categories) > np.iinfo(DIMENSIONS[dimension]).max:
+            raise ValueError(f"Too many distinct values for dimension {dimension}")
+        return encoded
+
+    def row_index(self, transaction_id):
+        """Position of a loaded transaction, or None"""
+        ids = self.columns['id'][:self.size]
+        index = int(np.searchsorted(ids, transaction_id))
+        if index < self.size and ids[index] == transaction_id:
+            return index
+        return None
+
+    def update_status(self, transaction_id, status):
+        """Reflect a status change made after the row was loaded"""
+        with self.lock:
+            index = self.row_index(transaction_id)
+            if index is not None:
+                self.columns['status'][index] = self.encode('status', [status])[0]
+
+    def remove(self, transaction_id):
+        """Exclude a deleted transaction from every later query"""
+        with self.lock:
+            index = self.row_index(transaction_id)
+            if index is not None:
+                self.columns['live'][index] = False
+
+    def query(self, measure: str = 'amount', agg: str = 'sum', by: Sequence[str] = (),
+              where: Optional[Dict] = None, start: datetime.date = None, end: datetime.date = None,
+              q: float = 0.5) -> List[Dict]:
+        """Aggregate measure over rows matching where and [start, end), grouped by dimensions.
+
+        by may name any of DIMENSIONS and TIME_DIMENSIONS; where maps dimensions
+        to a value or a list of values. Returns one dict per non-empty group with
+        the group's labels, 'value' and 'count', ordered by group labels.
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure: {measure}")
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate: {agg}")
+        for dimension in by:
+            if dimension not in DIMENSIONS and dimension not in TIME_DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {dimension}")
+
+        with self.lock:
+            mask = self.columns['live'][:self.size].copy()
+            day = self.columns['day'][:self.size]
+            if start is not None:
+                mask &= day >= to_day(start)
+            if end is not None:
+                mask &= day < to_day(end)
+
+            for dimension, wanted in (where or {}).items():
+                if dimension not in DIMENSIONS:
+                    raise ValueError(f"Unknown dimension: {dimension}")
+                if not isinstance(wanted, (list, tuple, set)):
+                    wanted = [wanted]
+                codes = [self.codes[dimension][value] for value in wanted if value in self.codes[dimension]]
+                column = self.columns[dimension][:self.size]
+                if len(codes) == 1:
+                    mask &= column == codes[0]
+                else:
+                    selected = np.zeros(len(self.categories[dimension]) + 1, dtype=bool)
+                    selected[codes] = True
+                    mask &= selected[column]
+
+            values = self.columns[measure][:self.size]
+            mask &= ~np.isnan(values)
+
+            # Copies taken under the lock; aggregation runs without it
+            rows = slice(0, self.size) if mask.all() else np.flatnonzero(mask)
+            values = values[rows].astype(np.float64)
+            keys = [self.group_codes(dimension, rows) for dimension in by]
+            categories = {dimension: list(self.categories.get(dimension, ())) for dimension in by}
+
+        return self.aggregate(values, keys, by, categories, agg, q)
+
+    def group_codes(self, dimension, rows):
+        """(codes, offset) of a grouping dimension for the selected rows"""
+        if dimension in DIMENSIONS:
+            return self.columns[dimension][rows].astype(np.int64), 0
+
+        months = self.columns['month'][rows].astype(np.int64)
+        if dimension == 'year':
+            codes = months // 12
+        elif dimension == 'quarter':
+            codes = months // 3
+        else:
+            codes = months
+        offset = int(codes.min()) if len(codes) else 0
+        return codes - offset, offset
+
+    @staticmethod
+    def label(dimension, code, offset, categories):
+        """Display value of a group code"""
+        if dimension in DIMENSIONS:
+            return categories[dimension][code]
+
+        value = code + offset
+        if dimension == 'year':
+            return 1970 + value
+        if dimension == 'quarter':
+            return datetime.date(1970 + value // 4, value % 4 * 3 + 1, 1)
+        return datetime.date(1970 + value // 12, value % 12 + 1, 1)
+
+    def aggregate(self, values, keys, by, categories, agg, q):
+        """Group rows by their composite key and reduce each group"""
+        radices = [int(codes.max()) + 1 if len(codes) else 1 for codes, _ in keys]
+        composite = keys[0][0] if keys else np.zeros(len(values), dtype=np.int64)
+        for (codes, _), radix in zip(keys[1:], radices[1:]):
+            composite = composite * radix + codes
+        key_space = int(np.prod(radices, dtype=np.int64)) if radices else 1
+
+        # Dense group ids: the composite key itself when small, otherwise its rank among present keys
+        if key_space <= DENSE_GROUPS_LIMIT:
+            group_ids = composite
+            present = np.flatnonzero(np.bincount(group_ids, minlength=key_space))
+            groups = present
+        else:
+            groups, group_ids = np.unique(composite, return_inverse=True)
+            key_space = len(groups)
+            present = slice(None)
+        counts = np.bincount(group_ids, minlength=key_space)[present]
+
+        if agg in ('count', 'sum', 'mean'):
+            sums = np.bincount(group_ids, weights=values, minlength=key_space)[present]
+            if agg == 'count':
+                results = counts.astype(np.float64)
+            elif agg == 'sum':
+                results = sums
+            else:
+                results = sums / counts
+        else:
+            # Stable sort by group id makes each group a contiguous run (radix sort for 16-bit ids)
+            id_type = np.uint16 if key_space <= np.iinfo(np.uint16).max else np.int64
+            runs = values[np.argsort(group_ids.astype(id_type), kind='stable')]
+            starts = np.r_[0, np.cumsum(counts)[:-1]].astype(np.int64) if len(counts) else np.zeros(0, dtype=np.int64)
+
+            if agg == 'min':
+                results = np.minimum.reduceat(runs, starts) if len(starts) else np.zeros(0)
+            elif agg == 'max':
+                results = np.maximum.reduceat(runs, starts) if len(starts) else np.zeros(0)
+            else:
+                # Linear-time selection of the two order statistics around q in each run
+                results = np.empty(len(starts))
+                for g, (start, count) in enumerate(zip(starts, counts)):
+                    position = q * (count - 1)
+                    lower = int(position)
+                    upper = min(lower + 1, count - 1)
+                    run = np.partition(runs[start:start + count], (lower, upper))
+                    results[g] = run[lower] + (run[upper] - run[lower]) * (position - lower)
+
+        labels = np.unravel_index(groups, radices) if radices else ()
+        output = []
+        for i in range(len(groups)):
+            row = {
+                dimension: self.label(dimension, int(labels[d][i]), keys[d][1], categories)
+                for d, dimension in enumerate(by)
+            }
+            row['value'] = float(results[i])
+            row['count'] = int(counts[i])
+            output.append(row)
+        return output
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+def get_analytics_engine():
+    """Process-wide AnalyticsEngine, so dashboards share one loaded history"""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = AnalyticsEngine()
+        return _shared_engine
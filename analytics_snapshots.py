@@ -0,0 +1,184 @@
+import threading
+import datetime
+from typing import Callable, Dict, NamedTuple, Optional
+from config import Config
+
+
+class Snapshot(NamedTuple):
+    """One computed analytics result and when its queries ran"""
+    data: object
+    taken_at: datetime.datetime
+    seconds: float
+
+
+class SnapshotStore:
+    """Process-wide store of precomputed analytics results shared by dashboards.
+
+    Each source is a function of a DatabaseManager registered under a name.
+    Dashboards render the last snapshot immediately and only wait on the
+    database when there is none yet or the user forces a refresh. A
+    background thread recomputes snapshots once they are older than
+    refresh_interval seconds while at least one dashboard has called start()
+    without a matching stop(), and concurrent refreshes of the same source
+    share one computation, so several open dashboards cost one set of queries.
+    """
+
+    def __init__(self, refresh_interval: float = 300):
+        self.refresh_interval = refresh_interval
+
+        self._sources: Dict[str, Callable] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._db_manager = None
+        self._viewers = 0
+
+    def register(self, name: str, compute: Callable):
+        """Add a source; registering the same name again replaces its function but keeps its snapshot"""
+        with self._lock:
+            self._sources[name] = compute
+            self._refresh_locks.setdefault(name, threading.Lock())
+        self._wakeup.set()
+
+    def get(self, name: str) -> Optional[Snapshot]:
+        """Last snapshot of a source, however old, or None if it was never computed"""
+        with self._lock:
+            return self._snapshots.get(name)
+
+    def is_stale(self, snapshot: Optional[Snapshot]) -> bool:
+        if snapshot is None:
+            return True
+        age = (datetime.datetime.now() - snapshot.taken_at).total_seconds()
+        return age >= self.refresh_interval
+
+    def refresh(self, name: str, db_manager, force: bool = False) -> Snapshot:
+        """Recompute a source unless a current snapshot exists (blocking; call off the Tk thread).
+
+        With force, a snapshot is still reused if its queries started after
+        this call was made, i.e. another caller refreshed it meanwhile.
+        """
+        requested_at = datetime.datetime.now()
+        with self._lock:
+            if name not in self._sources:
+                raise KeyError(f"Unknown analytics snapshot: {name}")
+            compute, refresh_lock = self._sources[name], self._refresh_locks[name]
+
+        with refresh_lock:
+            snapshot = self.get(name)
+            if snapshot is not None:
+                if snapshot.taken_at >= requested_at or (not force and not self.is_stale(snapshot)):
+                    return snapshot
+
+            taken_at = datetime.datetime.now()
+            data = compute(db_manager)
+            snapshot = Snapshot(data, taken_at, (datetime.datetime.now() - taken_at).total_seconds())
+            with self._lock:
+                self._snapshots[name] = snapshot
+            return snapshot
+
+    def start(self, db_manager):
+        """Keep the background refresher running until the matching stop()"""
+        with self._lock:
+            self._viewers += 1
+            self._db_manager = db_manager
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="analytics-snapshots", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Release one start(); the refresher exits once no dashboard holds it"""
+        with self._lock:
+            self._viewers = max(0, self._viewers - 1)
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._viewers:
+                    # Checked under the lock, so a concurrent start() either sees the thread gone or keeps it
+                    self._thread = None
+                    return
+                names = list(self._sources)
+            for name in names:
+                if not self.is_stale(self.get(name)):
+                    continue
+                try:
+                    self.refresh(name, self._db_manager)
+                except Exception as e:
+                    print(f"Error refreshing analytics snapshot {name}: {e}")
+            self._wakeup.wait(self.seconds_until_stale(names))
+            self._wakeup.clear()
+
+    def seconds_until_stale(self, names) -> float:
+        """Sleep until the oldest snapshot expires (UI refreshes push that back)"""
+        now = datetime.datetime.now()
+        remaining = [self.refresh_interval]
+        for name in names:
+            snapshot = self.get(name)
+            if snapshot is not None:
+                remaining.append(self.refresh_interval - (now - snapshot.taken_at).total_seconds())
+        return max(1.0, min(remaining))
+
+
+class SnapshotView:
+    """Dashboard mixin that shows one shared snapshot source with an "as of" label.
+
+    Call init_snapshot() before building the widgets (which must include
+    self.as_of_label), then start_snapshot_updates() once self.task_runner
+    exists. The view holds the background refresher until self.window is
+    destroyed.
+    """
+
+    def init_snapshot(self, name: str, compute: Callable, on_data: Callable):
+        self.snapshots = get_snapshot_store()
+        self.snapshots.register(name, compute)
+        self.snapshot_name = name
+        self.on_snapshot_data = on_data
+        self.snapshot_taken_at = None
+
+    def start_snapshot_updates(self, db_manager):
+        self.snapshots.start(db_manager)
+        self.window.bind("<Destroy>", self.on_snapshot_view_destroy, add="+")
+        self.window.after(Config.ANALYTICS_SNAPSHOT_CHECK_MS, self.check_snapshot)
+
+    def on_snapshot_view_destroy(self, event):
+        if event.widget is self.window:
+            self.snapshots.stop()
+
+    def check_snapshot(self):
+        """Pick up snapshots refreshed in the background and keep the "as of" label current"""
+        if self.task_runner.closed:
+            return
+        snapshot = self.snapshots.get(self.snapshot_name)
+        if snapshot is not None and snapshot.taken_at != self.snapshot_taken_at:
+            self.display_snapshot(snapshot)
+        else:
+            self.update_as_of()
+        self.window.after(Config.ANALYTICS_SNAPSHOT_CHECK_MS, self.check_snapshot)
+
+    def display_snapshot(self, snapshot: Snapshot):
+        self.snapshot_taken_at = snapshot.taken_at
+        self.update_as_of()
+        self.on_snapshot_data(snapshot.data)
+
+    def update_as_of(self):
+        if self.snapshot_taken_at is None:
+            return
+        minutes = int((datetime.datetime.now() - self.snapshot_taken_at).total_seconds() // 60)
+        age = "just now" if minutes < 1 else f"{minutes} min ago"
+        self.as_of_label.configure(text=f"As of {self.snapshot_taken_at:%H:%M:%S} ({age})")
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def get_snapshot_store():
+    """Process-wide SnapshotStore, so dashboards share snapshots and one refresher"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = SnapshotStore(Config.ANALYTICS_SNAPSHOT_INTERVAL)
+        return _shared_store
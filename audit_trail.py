@@ -0,0 +1,53 @@
+"""Audit entries for admin changes: who changed which entity, and each changed field's before and after value.
+
+Entries are rows of the audit_log table. DatabaseManager buffers routine
+changes in an EventBuffer as (actor, action, entity, before, after, time)
+and diffs them on the writer thread, so auditing an edit costs the caller
+one append. Deletes are written in the same database transaction as the
+delete itself.
+"""
+import json
+import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+# Row layout of audit_log inserts (DatabaseManager.write_audit_entries)
+AUDIT_COLUMNS = ('actor_id', 'action', 'entity_type', 'entity_id', 'changes', 'created_at')
+
+# Fields whose changes are recorded without their values
+REDACTED_FIELDS = frozenset({'password_hash'})
+
+def audit_value(value):
+    """Comparable, JSON-serializable form of a column or form value"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if value == "":
+        return None
+    return value
+
+def audit_diff(before: Optional[Dict], after: Optional[Dict]) -> Dict:
+    """{field: [before, after]} for fields that differ; a deleted entity lists every field it had"""
+    before = before or {}
+    after = after or {}
+    changes = {}
+    for field in list(before) + [field for field in after if field not in before]:
+        old, new = before.get(field), after.get(field)
+        if old == new:
+            continue
+        # Equal after normalization, e.g. '' and None, or 1 and True
+        old, new = audit_value(old), audit_value(new)
+        if old != new:
+            changes[field] = [None, None] if field in REDACTED_FIELDS else [old, new]
+    return changes
+
+def audit_entry(actor_id: Optional[int], action: str, entity_type: str, entity_id: int,
+                before: Dict = None, after: Dict = None, created_at: datetime.datetime = None) -> Optional[Tuple]:
+    """audit_log row (AUDIT_COLUMNS) for one change, or None for an update that changed nothing"""
+    changes = audit_diff(before, after)
+    if not changes and action != 'delete':
+        return None
+    return (actor_id, action, entity_type, entity_id, json.dumps(changes), created_at or datetime.datetime.now())
@@ -0,0 +1,253 @@
+"""Automated valuation model (AVM): ridge regression of log price on listing attributes.
+
+One model per listing type is trained on completed transactions (purchases
+value 'sale' listings, rents value 'rent' listings) and used to score every
+available listing. Features are log square feet, bedrooms, bathrooms, age,
+log lot size and years since the transaction (0 when scoring, so estimates
+are in today's prices), plus property type and city as one-hot categories.
+
+The design matrix is never materialized. Its Gram matrix X'X is assembled
+from the numeric block and bincounts over the category codes, so training
+costs O(rows * numeric features^2) plus a small dense solve, and scoring is
+a matrix-vector product plus two lookups.
+
+The confidence band comes from held-out residuals (every fifth row by id):
+an estimate's band is where AVM_BAND_QUANTILES of held-out log-price errors
+fell.
+"""
+import math
+import datetime
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from config import Config
+
+# Row layout of DatabaseManager.get_avm_training_rows (price is the transaction amount) and
+# get_avm_scoring_rows (price is the asking price; transaction_date is NULL)
+AVM_COLUMNS = (
+    'id', 'listing_type', 'price', 'property_type', 'city', 'bedrooms', 'bathrooms',
+    'square_feet', 'lot_size', 'year_built', 'transaction_date'
+)
+NUMERIC_FEATURES = ('log_square_feet', 'bedrooms', 'bathrooms', 'age', 'log_lot_size', 'years_ago')
+CATEGORICAL_FEATURES = ('property_type', 'city')
+
+HOLDOUT_EVERY = 5
+
+def float_column(values, count):
+    return np.fromiter((math.nan if value is None else float(value) for value in values),
+                       dtype=np.float64, count=count)
+
+def numeric_features(columns: Dict[str, Sequence], count: int, today: datetime.date) -> np.ndarray:
+    """Raw (count x NUMERIC_FEATURES) matrix; NaN where unknown"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        square_feet = float_column(columns['square_feet'], count)
+        lot_size = float_column(columns['lot_size'], count)
+        year_built = float_column(columns['year_built'], count)
+        days_ago = np.fromiter((
+            0.0 if value is None else (today - (value.date() if isinstance(value, datetime.datetime) else value)).days
+            for value in columns['transaction_date']
+        ), dtype=np.float64, count=count)
+        return np.column_stack((
+            np.where(square_feet > 0, np.log(square_feet), np.nan),
+            float_column(columns['bedrooms'], count),
+            float_column(columns['bathrooms'], count),
+            today.year - year_built,
+            np.log1p(np.where(lot_size >= 0, lot_size, np.nan)),
+            days_ago / 365.25
+        ))
+
+class ValuationModel:
+    """Ridge regression for one listing type, with its encodings and error band"""
+
+    def __init__(self, listing_type: str):
+        self.listing_type = listing_type
+        self.categories: Dict[str, Dict[str, int]] = {}
+        self.center: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        self.intercept = 0.0
+        self.numeric_weights: Optional[np.ndarray] = None
+        self.category_weights: Dict[str, np.ndarray] = {}
+        self.band: Tuple[float, float] = (0.0, 0.0)
+        self.metrics: Dict = {}
+
+    def encode(self, feature, values, count) -> np.ndarray:
+        """Category codes; 0 is the baseline for rare or unseen values"""
+        codes = self.categories[feature]
+        return np.fromiter((codes.get(value, 0) for value in values), dtype=np.int64, count=count)
+
+    def standardize(self, raw: np.ndarray) -> np.ndarray:
+        """Centered and scaled numeric features, with unknowns at the center"""
+        return np.nan_to_num((raw - self.center) / self.scale)
+
+    def fit(self, raw: np.ndarray, codes: Dict[str, np.ndarray], target: np.ndarray, alpha: float):
+        """Solve (X'X + alpha I) b = X'y with the intercept unpenalized"""
+        count, numeric_count = raw.shape
+        dense = np.column_stack((np.ones(count), self.standardize(raw)))
+
+        # Column ranges: intercept and numeric features, then one column per non-baseline category
+        spans = {}
+        position = dense.shape[1]
+        for feature in CATEGORICAL_FEATURES:
+            spans[feature] = slice(position, position + len(self.categories[feature]))
+            position += len(self.categories[feature])
+        gram = np.zeros((position, position))
+        moment = np.zeros(position)
+
+        dense_span = slice(0, dense.shape[1])
+        gram[dense_span, dense_span] = dense.T @ dense
+        moment[dense_span] = dense.T @ target
+
+        # One-hot blocks from bincounts; code 0 is the baseline and has no column
+        levels = {feature: len(self.categories[feature]) + 1 for feature in CATEGORICAL_FEATURES}
+        for feature in CATEGORICAL_FEATURES:
+            code, columns = codes[feature], spans[feature]
+            for index in range(dense.shape[1]):
+                cross = np.bincount(code, weights=dense[:, index], minlength=levels[feature])[1:]
+                gram[index, columns] = cross
+                gram[columns, index] = cross
+            gram[columns, columns] = np.diag(np.bincount(code, minlength=levels[feature])[1:].astype(np.float64))
+            moment[columns] = np.bincount(code, weights=target, minlength=levels[feature])[1:]
+
+        first, second = CATEGORICAL_FEATURES
+        pairs = np.bincount(codes[first] * levels[second] + codes[second], minlength=levels[first] * levels[second])
+        cross = pairs.reshape(levels[first], levels[second])[1:, 1:].astype(np.float64)
+        gram[spans[first], spans[second]] = cross
+        gram[spans[second], spans[first]] = cross.T
+
+        penalty = np.full(position, float(alpha))
+        penalty[0] = 0.0
+        solution = np.linalg.solve(gram + np.diag(penalty), moment)
+
+        self.intercept = solution[0]
+        self.numeric_weights = solution[1:dense.shape[1]]
+        for feature in CATEGORICAL_FEATURES:
+            self.category_weights[feature] = np.concatenate(([0.0], solution[spans[feature]]))
+
+    def predict_log(self, raw: np.ndarray, codes: Dict[str, np.ndarray]) -> np.ndarray:
+        prediction = self.intercept + self.standardize(raw) @ self.numeric_weights
+        for feature in CATEGORICAL_FEATURES:
+            prediction += self.category_weights[feature][codes[feature]]
+        return prediction
+
+class AutomatedValuation:
+    """Trains per-listing-type models and scores listings in batches"""
+
+    def __init__(self, alpha: float = None, band_quantiles: Tuple[float, float] = None,
+                 min_category_rows: int = None, min_training_rows: int = None):
+        self.alpha = Config.AVM_RIDGE_ALPHA if alpha is None else alpha
+        self.band_quantiles = Config.AVM_BAND_QUANTILES if band_quantiles is None else band_quantiles
+        self.min_category_rows = Config.AVM_MIN_CATEGORY_ROWS if min_category_rows is None else min_category_rows
+        self.min_training_rows = Config.AVM_MIN_TRAINING_ROWS if min_training_rows is None else min_training_rows
+        self.models: Dict[str, ValuationModel] = {}
+        self.today = datetime.date.today()
+
+    def train(self, rows: Sequence[Sequence]) -> Dict[str, Dict]:
+        """Fit one model per listing type from AVM_COLUMNS rows; returns each model's held-out metrics"""
+        if not rows:
+            return {}
+        count = len(rows)
+        columns = dict(zip(AVM_COLUMNS, zip(*rows)))
+        ids = np.array(columns['id'], dtype=np.int64)
+        prices = float_column(columns['price'], count)
+        raw = numeric_features(columns, count, self.today)
+        listing_types = np.array(columns['listing_type'], dtype=object)
+
+        metrics = {}
+        for listing_type in sorted(set(columns['listing_type'])):
+            selected = (listing_types == listing_type) & (prices > 0)
+            if selected.sum() < self.min_training_rows:
+                continue
+            model = ValuationModel(listing_type)
+            subset = {name: [value for value, keep in zip(columns[name], selected) if keep] for name in CATEGORICAL_FEATURES}
+            metrics[listing_type] = self.fit_model(model, raw[selected], subset, np.log(prices[selected]), ids[selected])
+            self.models[listing_type] = model
+        return metrics
+
+    def fit_model(self, model: ValuationModel, raw, categorical, target, ids) -> Dict:
+        count = len(target)
+        for feature in CATEGORICAL_FEATURES:
+            values, frequencies = np.unique(np.array(categorical[feature], dtype=object).astype(str), return_counts=True)
+            frequent = [value for value, frequency in zip(values, frequencies) if frequency >= self.min_category_rows]
+            model.categories[feature] = {value: code for code, value in enumerate(frequent, start=1)}
+        codes = {feature: model.encode(feature, map(str, categorical[feature]), count) for feature in CATEGORICAL_FEATURES}
+
+        with np.errstate(invalid='ignore'):
+            model.center = np.nan_to_num(np.nanmean(raw, axis=0))
+            scale = np.nanstd(raw, axis=0)
+        model.scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+        # Band and metrics from rows the fit has not seen, then refit on everything
+        holdout = ids % HOLDOUT_EVERY == 0
+        training = ~holdout
+        if holdout.any() and training.sum() >= self.min_training_rows:
+            model.fit(raw[training], {f: c[training] for f, c in codes.items()}, target[training], self.alpha)
+            residuals = target[holdout] - model.predict_log(raw[holdout], {f: c[holdout] for f, c in codes.items()})
+            low, high = np.quantile(residuals, self.band_quantiles)
+            model.band = (float(low), float(high))
+            model.metrics = {
+                'training_rows': count,
+                'holdout_rows': int(holdout.sum()),
+                'median_abs_error': float(np.median(np.abs(np.expm1(-residuals)))),
+                'rmse_log': float(np.sqrt(np.mean(residuals ** 2)))
+            }
+        else:
+            model.metrics = {'training_rows': count, 'holdout_rows': 0}
+
+        model.fit(raw, codes, target, self.alpha)
+        return model.metrics
+
+    def score(self, rows: Sequence[Sequence]) -> List[Tuple]:
+        """(property_id, estimate, low, high) for AVM_COLUMNS rows whose listing type has a model"""
+        if not rows:
+            return []
+        count = len(rows)
+        columns = dict(zip(AVM_COLUMNS, zip(*rows)))
+        raw = numeric_features(columns, count, self.today)
+        listing_types = np.array(columns['listing_type'], dtype=object)
+
+        results = []
+        for listing_type, model in self.models.items():
+            selected = np.flatnonzero(listing_types == listing_type)
+            if not len(selected):
+                continue
+            codes = {
+                feature: model.encode(feature, (str(columns[feature][i]) for i in selected), len(selected))
+                for feature in CATEGORICAL_FEATURES
+            }
+            log_estimate = model.predict_log(raw[selected], codes)
+            low, high = model.band
+            estimates = np.round(np.exp(log_estimate), 2)
+            lows = np.round(np.exp(log_estimate + low), 2)
+            highs = np.round(np.exp(log_estimate + high), 2)
+            ids = [columns['id'][i] for i in selected]
+            results.extend(zip(ids, estimates.tolist(), lows.tolist(), highs.tolist()))
+        return results
+
+def run_valuations(db_manager, batch_size: int = 50000, on_progress: Callable = None) -> Dict:
+    """Train on every completed transaction and score every available listing; returns a summary"""
+    training_rows = []
+    after_id = 0
+    while True:
+        rows = db_manager.get_avm_training_rows(after_id, batch_size)
+        if not rows:
+            break
+        training_rows.extend(rows)
+        after_id = rows[-1][0]
+
+    valuation = AutomatedValuation()
+    metrics = valuation.train(training_rows)
+    del training_rows
+
+    scored = 0
+    after_id = 0
+    while valuation.models:
+        rows = db_manager.get_avm_scoring_rows(after_id, batch_size)
+        if not rows:
+            break
+        if not db_manager.save_valuations(valuation.score(rows)):
+            raise RuntimeError("Failed to save valuations")
+        scored += len(rows)
+        after_id = rows[-1][0]
+        if on_progress:
+            on_progress(scored)
+
+    return {'models': metrics, 'scored': scored}
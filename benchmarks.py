@@ -0,0 +1,705 @@
+"""Performance benchmarks for RealEstate Pro.
+
+Run a benchmark with:  python benchmarks.py <name> [options]
+List them with:        python benchmarks.py --help
+
+Benchmarks use synthetic data and do not need MySQL or a display.
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+
+CITIES = [
+    "New York", "San Francisco", "San Diego", "San Antonio", "Seattle", "Austin",
+    "Portland", "Boston", "Denver", "Chicago", "Miami", "Atlanta", "Dallas", "Houston"
+]
+PROPERTY_TYPES = ["House", "Apartment", "Condo", "Loft", "Townhouse"]
+
+
+def make_listings(count, seed=42):
+    """Synthetic rows shaped like DatabaseManager.get_properties results"""
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        city = rng.choice(CITIES)
+        listings.append({
+            'id': i + 1,
+            'title': f"Listing {i + 1}",
+            'property_type': rng.choice(PROPERTY_TYPES),
+            'city': city,
+            'state': "XX",
+            'price': float(rng.randrange(50_000, 3_000_000, 1000)),
+            'bedrooms': rng.randint(1, 6),
+            'bathrooms': rng.randint(1, 4),
+            'square_feet': rng.randint(400, 5000),
+            'listing_type': 'sale'
+        })
+    return listings
+
+
+def report(name, samples_ms, budget_ms=None):
+    samples = sorted(samples_ms)
+    p50 = statistics.median(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    line = f"{name:<40} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms   max {samples[-1]:8.2f} ms"
+    if budget_ms is not None:
+        line += "   " + ("OK" if p95 <= budget_ms else f"OVER {budget_ms} ms budget")
+    print(line)
+
+
+def bench_live_search(args):
+    """Keystroke-to-results cost of live search refinements served from memory"""
+    from property_search import PropertySearch
+
+    listings = make_listings(args.listings)
+    search = PropertySearch(max_age=3600)
+    search.store('sale', {}, listings)
+
+    # Typing a city one character at a time, then tightening the price range
+    steps = [{'city': "san francisco"[:i]} for i in range(1, 14)]
+    steps += [{'city': "san", 'min_price': price} for price in (100_000, 250_000, 500_000, 750_000)]
+    steps += [{'city': "san", 'min_price': 500_000, 'max_price': price} for price in (2_000_000, 1_500_000, 1_000_000)]
+
+    samples = []
+    for _ in range(args.repeat):
+        for filters in steps:
+            start = time.perf_counter()
+            results = search.lookup('sale', filters)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert results is not None
+
+    print(f"{args.listings:,} listings, {len(steps)} refinements x {args.repeat}")
+    report("in-memory refinement", samples, budget_ms=100)
+    print(f"cache hits {search.hits}, misses {search.misses}")
+
+
+def bench_grid_paint(args):
+    """Time to first paint and widget count of VirtualPropertyGrid vs. result size (needs a display)"""
+    import tkinter as tk
+    import tracemalloc
+    from ui_components import PropertyCard, VirtualPropertyGrid
+
+    root = tk.Tk()
+    root.geometry("1200x800")
+    grid = VirtualPropertyGrid(root, create_card=lambda parent, item: PropertyCard(parent, item))
+    grid.pack(fill="both", expand=True)
+    root.update()
+
+    for count in (100, 1_000, 10_000, 100_000):
+        listings = make_listings(count)
+        tracemalloc.start()
+        start = time.perf_counter()
+        grid.set_items(listings)
+        root.update_idletasks()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{count:>8,} items: first paint {elapsed_ms:7.1f} ms, "
+              f"{len(grid.window_ids)} cards, peak alloc {peak / 1024:7.1f} KiB")
+
+    root.destroy()
+
+
+def bench_filter_toggle(args):
+    """Repeated filter toggles: rebuilding every PropertyCard vs. the pooled grid (needs a display)"""
+    import tkinter as tk
+    from ui_components import PropertyCard, VirtualPropertyGrid
+
+    root = tk.Tk()
+    root.geometry("1200x800")
+    result_sets = [make_listings(args.listings, seed=1), make_listings(args.listings, seed=2)]
+    for listing in result_sets[1]:
+        listing['listing_type'] = 'rent'
+
+    # Previous behaviour: destroy all children, build a card per result
+    frame = tk.Frame(root)
+    frame.pack(fill="both", expand=True)
+    root.update()
+    rebuild_samples = []
+    for i in range(args.toggles):
+        start = time.perf_counter()
+        for widget in frame.winfo_children():
+            widget.destroy()
+        for index, item in enumerate(result_sets[i % 2]):
+            PropertyCard(frame, item).grid(row=index // 3, column=index % 3)
+        root.update_idletasks()
+        rebuild_samples.append((time.perf_counter() - start) * 1000)
+    frame.destroy()
+
+    # Pooled, virtualized grid
+    grid = VirtualPropertyGrid(root, create_card=lambda parent, item: PropertyCard(parent, item))
+    grid.pack(fill="both", expand=True)
+    root.update()
+    pooled_samples = []
+    for i in range(args.toggles):
+        start = time.perf_counter()
+        grid.set_items(result_sets[i % 2])
+        root.update_idletasks()
+        pooled_samples.append((time.perf_counter() - start) * 1000)
+
+    print(f"{args.listings} results per filter, {args.toggles} toggles")
+    report("destroy + rebuild all cards", rebuild_samples)
+    report("pooled virtual grid", pooled_samples)
+    pool = grid.card_pool
+    print(f"cards created {pool.created}, reused {pool.reused}, destroyed {pool.destroyed}")
+
+    root.destroy()
+
+
+def bench_image_ingest(args):
+    """Upload throughput in images/sec: serial save_property_image vs. the process-pool ingest"""
+    import os
+    import tempfile
+    from PIL import Image
+    from image_manager import ImageManager
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # ImageManager stores under ./images, so keep the benchmark's output out of the repo
+        os.chdir(workdir)
+        try:
+            sources = []
+            for i in range(args.images):
+                channels = [Image.effect_noise((args.width, args.height), 40 + i % 20) for _ in range(3)]
+                path = os.path.join(workdir, f"upload_{i}.jpg")
+                Image.merge('RGB', channels).save(path, 'JPEG', quality=90)
+                sources.append(path)
+
+            image_manager = ImageManager()
+            for label, workers in (("serial", 1), ("process pool", args.workers or None)):
+                start = time.perf_counter()
+                results = image_manager.ingest_images(sources, max_workers=workers)
+                elapsed = time.perf_counter() - start
+                assert all(saved for _, saved, _ in results)
+                print(f"{label:<40} {len(sources) / elapsed:8.2f} images/sec   ({elapsed:.2f} s)")
+        finally:
+            os.chdir(cwd)
+
+    print(f"{args.images} images of {args.width}x{args.height}, {os.cpu_count()} CPUs")
+
+
+def bench_image_decode(args):
+    """Rendition generation from large JPEGs: full decode vs. draft-mode reduced decode"""
+    import os
+    import tempfile
+    from PIL import Image, ImageOps
+    from config import Config
+    from image_manager import decode_image
+
+    sizes = list(Config.IMAGE_RENDITIONS.values())
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = []
+        for i in range(args.photos):
+            channels = [Image.effect_noise((args.width, args.height), 30 + i % 20) for _ in range(3)]
+            path = os.path.join(workdir, f"photo_{i}.jpg")
+            Image.merge('RGB', channels).save(path, 'JPEG', quality=90)
+            corpus.append(path)
+
+        def render_full(path):
+            with Image.open(path) as img:
+                img.load()
+                pixels = img.width * img.height
+                for size in sizes:
+                    ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+            return pixels
+
+        def render_draft(path):
+            with decode_image(path, sizes) as img:
+                pixels = img.width * img.height
+                for size in sizes:
+                    ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+            return pixels
+
+        print(f"{args.photos} photos of {args.width}x{args.height} ({args.width * args.height / 1e6:.0f} MP), "
+              f"{len(sizes)} renditions each")
+        for label, render in (("full decode", render_full), ("draft-mode decode", render_draft)):
+            samples = []
+            pixels = 0
+            for path in corpus:
+                start = time.perf_counter()
+                pixels = render(path)
+                samples.append((time.perf_counter() - start) * 1000)
+            report(label, samples)
+            print(f"{'':<40} decoded {pixels / 1e6:.1f} MP = {pixels * 3 / (1024 * 1024):.0f} MiB per photo")
+
+
+def bench_rendition_formats(args):
+    """Bytes on disk, encode and decode time per rendition encoding (JPEG, WebP, PNG)"""
+    import io
+    from PIL import Image, ImageOps, features
+    from config import Config
+    from image_manager import IMAGE_ENCODINGS
+
+    # Photo-like corpus: smooth gradients with structure and sensor noise
+    corpus = []
+    for i in range(args.photos):
+        size = (args.width, args.height)
+        detail = Image.effect_mandelbrot(size, (-2.0 + i * 0.05, -1.2, 1.0, 1.2), 64)
+        gradient = Image.linear_gradient('L').rotate(i * 17).resize(size)
+        noise = Image.effect_noise(size, 12)
+        corpus.append(Image.merge('RGB', [detail, gradient, Image.blend(gradient, noise, 0.3)]))
+
+    for rendition in args.renditions.split(','):
+        size = Config.IMAGE_RENDITIONS[rendition]
+        renders = [ImageOps.fit(photo, size, Image.Resampling.LANCZOS) for photo in corpus]
+        print(f"{rendition} {size[0]}x{size[1]}, {len(renders)} images")
+
+        for name, encoding in IMAGE_ENCODINGS.items():
+            if name == 'webp' and not features.check('webp'):
+                print(f"  {name:<6} skipped: Pillow built without WebP")
+                continue
+
+            sizes = []
+            encode_ms = []
+            decode_ms = []
+            for render in renders:
+                buffer = io.BytesIO()
+                start = time.perf_counter()
+                render.save(buffer, encoding['format'], **encoding['options'])
+                encode_ms.append((time.perf_counter() - start) * 1000)
+                sizes.append(buffer.tell())
+
+                buffer.seek(0)
+                start = time.perf_counter()
+                with Image.open(buffer) as img:
+                    img.load()
+                decode_ms.append((time.perf_counter() - start) * 1000)
+
+            print(f"  {name:<6} {statistics.mean(sizes) / 1024:8.1f} KiB   "
+                  f"encode {statistics.median(encode_ms):6.2f} ms   decode {statistics.median(decode_ms):6.2f} ms   "
+                  f"{encoding['mime_type']}")
+
+
+def bench_analytics_charts(args):
+    """Dashboard chart cost for a multi-year period: cold Agg render vs. cached render"""
+    from datetime import date, timedelta
+    from analytics_dashboard import ChartCache, render_chart
+    from database import DatabaseManager
+
+    rng = random.Random(42)
+    this_month = date.today().replace(day=1)
+    index = this_month.year * 12 + this_month.month - args.months
+    months = DatabaseManager.month_starts(date(index // 12, index % 12 + 1, 1), (this_month + timedelta(days=32)).replace(day=1))
+
+    # Series shaped like get_monthly_revenue / get_monthly_inventory results
+    revenue = [{'month': month, 'purchase': rng.uniform(2e6, 9e6), 'rent': rng.uniform(1e5, 4e5),
+                'transactions': rng.randint(20, 90)} for month in months]
+    inventory = []
+    listed = 5000
+    for month in months:
+        listed += rng.randint(50, 200)
+        sold, rented, pending = int(listed * 0.4), int(listed * 0.15), rng.randint(50, 300)
+        inventory.append({'month': month, 'available': listed - sold - rented - pending,
+                          'pending': pending, 'sold': sold, 'rented': rented})
+    series = {'revenue': revenue, 'inventory': inventory}
+    size = (args.width, args.height)
+
+    cold = []
+    warm = []
+    for _ in range(args.repeat):
+        cache = ChartCache(8)
+        for samples in (cold, warm):
+            start = time.perf_counter()
+            for name, data in series.items():
+                key = (name, months[0], months[-1], size)
+                if cache.get(key, data) is None:
+                    cache.put(key, data, render_chart(name, data, size))
+            samples.append((time.perf_counter() - start) * 1000)
+
+    print(f"{len(months)} months, 2 charts of {args.width}x{args.height} (queries not included)")
+    report("cold render", cold, budget_ms=1000)
+    report("cached", warm, budget_ms=1000)
+
+
+def bench_analytics_engine(args):
+    """Load, incremental append and group-by query latency of the in-process analytics engine"""
+    import numpy as np
+    from analytics_engine import AnalyticsEngine, to_day
+    from datetime import date
+
+    rng = np.random.default_rng(42)
+    cities = np.array(CITIES, dtype=object)
+    types = np.array(PROPERTY_TYPES, dtype=object)
+    first_day = to_day(date.today()) - 10 * 365
+
+    def batch(start_id, count):
+        """Synthetic columns shaped like DatabaseManager.get_transaction_facts"""
+        return {
+            'id': np.arange(start_id, start_id + count, dtype=np.int64),
+            'day': np.sort(rng.integers(first_day, first_day + 10 * 365, count)).astype(np.int32),
+            'amount': rng.lognormal(13, 0.6, count),
+            'list_price': rng.lognormal(13, 0.6, count),
+            'square_feet': rng.integers(400, 5000, count).astype(np.float32),
+            'transaction_type': np.array(['purchase', 'rent'], dtype=object)[rng.integers(0, 2, count)],
+            'status': np.array(['completed', 'pending', 'cancelled'], dtype=object)[rng.choice(3, count, p=[0.8, 0.1, 0.1])],
+            'property_type': types[rng.integers(0, len(types), count)],
+            'listing_type': np.array(['sale', 'rent'], dtype=object)[rng.integers(0, 2, count)],
+            'city': cities[rng.integers(0, len(cities), count)],
+            'state': np.array(['XX'], dtype=object)[np.zeros(count, dtype=np.int64)]
+        }
+
+    engine = AnalyticsEngine()
+    batches = [batch(i + 1, min(args.batch, args.transactions - i)) for i in range(0, args.transactions, args.batch)]
+    start = time.perf_counter()
+    for columns in batches:
+        engine.append_columns(columns)
+    elapsed = time.perf_counter() - start
+    print(f"{len(engine):,} transactions loaded in {elapsed:.2f} s ({engine.memory_bytes() / (1024 * 1024):.0f} MiB)")
+    del batches
+
+    samples = []
+    for i in range(args.repeat):
+        columns = batch(engine.last_id + 1, args.append)
+        start = time.perf_counter()
+        engine.append_columns(columns)
+        samples.append((time.perf_counter() - start) * 1000)
+    report(f"append {args.append:,} rows", samples)
+
+    completed = {'status': 'completed'}
+    queries = [
+        ("sum(amount) by month", dict(agg='sum', by=('month',), where=completed)),
+        ("mean(amount) by city", dict(agg='mean', by=('city',), where=completed)),
+        ("count by year, city, type", dict(agg='count', by=('year', 'city', 'transaction_type'))),
+        ("median(amount) by property_type", dict(agg='quantile', by=('property_type',), where=completed)),
+        ("p90(list_price) by quarter, city", dict(measure='list_price', agg='quantile', q=0.9, by=('quarter', 'city'))),
+    ]
+    for label, query in queries:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            engine.query(**query)
+            samples.append((time.perf_counter() - start) * 1000)
+        report(label, samples)
+
+
+def bench_quantile_sketch(args):
+    """Accuracy and cost of KLL price-per-sqft percentiles vs. exact sorting, per segment and merged"""
+    from bisect import bisect_left, bisect_right
+    from quantile_sketch import KLLSketch, normalized_rank_error
+
+    rng = random.Random(42)
+    segments = [(city, property_type) for city in CITIES for property_type in PROPERTY_TYPES]
+    levels = {segment: rng.uniform(4.5, 6.5) for segment in segments}
+    values = {segment: [] for segment in segments}
+    for _ in range(args.values):
+        segment = rng.choice(segments)
+        values[segment].append(rng.lognormvariate(levels[segment], 0.45))
+
+    start = time.perf_counter()
+    sketches = {}
+    for segment, segment_values in values.items():
+        sketches[segment] = KLLSketch(args.k)
+        sketches[segment].update_many(segment_values)
+    elapsed = time.perf_counter() - start
+    stored = sum(len(sketch.to_bytes()) for sketch in sketches.values())
+    print(f"{args.values:,} values in {len(segments)} segments, k={args.k}: "
+          f"{args.values / elapsed:,.0f} updates/s, {stored / len(segments):,.0f} bytes per stored sketch")
+
+    # The groups the dashboard asks for: each segment, each city, each type, everything
+    groups = {('segment', segment): [segment] for segment in segments}
+    groups.update({('city', city): [s for s in segments if s[0] == city] for city in CITIES})
+    groups.update({('type', property_type): [s for s in segments if s[1] == property_type] for property_type in PROPERTY_TYPES})
+    groups[('all', None)] = segments
+
+    quantiles = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+    errors = {kind: [] for kind in ('segment', 'city', 'type', 'all')}
+    sketch_ms = []
+    exact_ms = []
+    for (kind, _), members in groups.items():
+        start = time.perf_counter()
+        merged = KLLSketch(args.k)
+        for segment in members:
+            merged.merge(KLLSketch.from_bytes(sketches[segment].to_bytes()))
+        estimates = [merged.quantile(q) for q in quantiles]
+        sketch_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        exact = sorted(value for segment in members for value in values[segment])
+        [exact[min(len(exact) - 1, int(q * len(exact)))] for q in quantiles]
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        # Rank error: how far the estimate's true rank is from the requested one
+        for q, estimate in zip(quantiles, estimates):
+            low, high = bisect_left(exact, estimate) / len(exact), bisect_right(exact, estimate) / len(exact)
+            errors[kind].append(0.0 if low <= q <= high else min(abs(low - q), abs(high - q)))
+
+    bound = normalized_rank_error(args.k)
+    print(f"rank error bound {bound:.2%} (99% confidence per query)")
+    for kind, kind_errors in errors.items():
+        within = sum(error <= bound for error in kind_errors) / len(kind_errors)
+        print(f"{kind:<10} {len(kind_errors):4} queries   mean {statistics.mean(kind_errors):.3%}   "
+              f"max {max(kind_errors):.3%}   within bound {within:.1%}")
+    report("sketch deserialize + merge + query", sketch_ms)
+    report("exact sort + query", exact_ms)
+
+
+def bench_comps(args):
+    """Comparable-properties query latency and incremental update cost of the comps index"""
+    from datetime import datetime, timedelta
+    from comps_engine import CompsEngine
+
+    rng = random.Random(42)
+    now = datetime.now()
+
+    def rows(start_id, count, cities):
+        """Synthetic rows shaped like DatabaseManager.get_comps_rows"""
+        result = []
+        for property_id in range(start_id, start_id + count):
+            status = rng.choice(('available', 'available', 'available', 'sold', 'pending'))
+            closed_at = now - timedelta(days=rng.randrange(720)) if status == 'sold' else None
+            result.append((property_id, 'sale', rng.choice(cities), f"{rng.randrange(10000, 10100)}", status,
+                           rng.randint(1, 6), rng.randint(1, 4), rng.randint(400, 5000), rng.randint(1900, 2025),
+                           rng.uniform(50_000, 3_000_000), closed_at, now))
+        return result
+
+    # Spread over every city, and the worst case of every listing in one city
+    for label, cities in (("14 cities", CITIES), ("1 city", CITIES[:1])):
+        engine = CompsEngine()
+        listings = rows(1, args.listings, cities)
+        start = time.perf_counter()
+        for i in range(0, len(listings), 50_000):
+            engine.upsert(listings[i:i + 50_000])
+        elapsed = time.perf_counter() - start
+        print(f"{args.listings:,} listings in {label}: loaded in {elapsed:.2f} s "
+              f"({engine.memory_bytes() / (1024 * 1024):.0f} MiB)")
+
+        since_day = (now - timedelta(days=365)).toordinal() - datetime(1970, 1, 1).toordinal()
+        samples = {'listings': [], 'closed': []}
+        for _ in range(args.queries):
+            row = rng.choice(listings)
+            prop = dict(zip(('id', 'listing_type', 'city', 'zip_code', 'status', 'bedrooms', 'bathrooms',
+                             'square_feet', 'year_built', 'price'), row))
+            for key, closed in (('listings', False), ('closed', True)):
+                start = time.perf_counter()
+                engine.nearest(prop, args.k, closed=closed, since_day=since_day)
+                samples[key].append((time.perf_counter() - start) * 1000)
+        report(f"  {args.k} similar listings", samples['listings'], budget_ms=20)
+        report(f"  {args.k} closed in last year", samples['closed'], budget_ms=20)
+
+        # A refresh picking up edited listings: re-priced, some moved to another city
+        changed = rows(1, args.updates, cities)
+        start = time.perf_counter()
+        engine.upsert(changed)
+        print(f"  upsert {args.updates:,} changed listings: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def bench_avm(args):
+    """Automated valuation: training on completed transactions and scoring every available listing"""
+    from datetime import date, timedelta
+    import avm
+    from config import Config
+
+    rng = random.Random(42)
+    today = date.today()
+    city_effects = {city: rng.uniform(-0.4, 0.4) for city in CITIES}
+    type_effects = {property_type: rng.uniform(-0.2, 0.2) for property_type in PROPERTY_TYPES}
+
+    def rows(count, transactions):
+        """Synthetic rows shaped like get_avm_training_rows / get_avm_scoring_rows, priced by a known model"""
+        result = []
+        for row_id in range(1, count + 1):
+            listing_type = 'sale' if rng.random() < 0.8 else 'rent'
+            city, property_type = rng.choice(CITIES), rng.choice(PROPERTY_TYPES)
+            bedrooms, bathrooms = rng.randint(1, 6), rng.randint(1, 4)
+            square_feet, year_built = rng.randint(400, 5000), rng.randint(1900, 2025)
+            lot_size = round(rng.uniform(0, 2), 2) if rng.random() < 0.7 else None
+            days_ago = rng.randrange(1500) if transactions else 0
+            log_price = (
+                (7.0 if listing_type == 'sale' else 1.2) + 0.8 * math.log(square_feet) + 0.03 * bedrooms
+                + 0.05 * bathrooms - 0.002 * (today.year - year_built) + city_effects[city]
+                + type_effects[property_type] - 0.05 * days_ago / 365.25 + rng.gauss(0, 0.15)
+            )
+            result.append((row_id, listing_type, round(math.exp(log_price), 2), property_type, city, bedrooms,
+                           bathrooms, square_feet, lot_size, year_built,
+                           today - timedelta(days=days_ago) if transactions else None))
+        return result
+
+    class Catalog:
+        """The DatabaseManager methods run_valuations pages through, over in-memory rows with ids 1..n"""
+
+        def __init__(self):
+            self.training = rows(args.transactions, True)
+            self.listings = rows(args.listings, False)
+            self.saved = []
+
+        def get_avm_training_rows(self, after_id, limit):
+            return self.training[after_id:after_id + limit]
+
+        def get_avm_scoring_rows(self, after_id, limit):
+            return self.listings[after_id:after_id + limit]
+
+        def save_valuations(self, valuations):
+            self.saved.extend(valuations)
+            return True
+
+    catalog = Catalog()
+    samples = []
+    for _ in range(args.repeat):
+        catalog.saved = []
+        start = time.perf_counter()
+        summary = avm.run_valuations(catalog)
+        samples.append((time.perf_counter() - start) * 1000)
+    report(f"train on {args.transactions:,} transactions, score {args.listings:,} listings", samples,
+           budget_ms=60_000)
+
+    for listing_type, metrics in summary['models'].items():
+        print(f"  {listing_type}: median held-out error {metrics['median_abs_error']:.1%}, "
+              f"log RMSE {metrics['rmse_log']:.3f} (noise 0.150)")
+    prices = {row[0]: row[2] for row in catalog.listings}
+    covered = sum(low <= prices[row_id] <= high for row_id, _, low, high in catalog.saved)
+    print(f"  {len(catalog.saved):,} valued; {covered / len(catalog.saved):.1%} of asking prices inside their band "
+          f"(target {Config.AVM_BAND_QUANTILES[1] - Config.AVM_BAND_QUANTILES[0]:.0%})")
+
+
+def bench_audit(args):
+    """Write throughput of admin property edits without an audit trail, with buffered entries, and with synchronous ones"""
+    import os
+    import sqlite3
+    import tempfile
+    from datetime import datetime
+    from audit_trail import AUDIT_COLUMNS, audit_entry
+    from config import Config
+    from database import DatabaseManager
+    from event_buffer import EventBuffer
+
+    # SQLite stands in for MySQL: each edit is update_property's statements, committed durably, and every
+    # statement or batch waits round_trip_ms as it would for the server's reply. audit_log lives in its
+    # own file because SQLite locks a whole database per writer, where InnoDB locks rows.
+    table, fields = DatabaseManager.AUDIT_FIELDS['property']
+    rng = random.Random(42)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "app.db")
+    audit_path = os.path.join(directory, "audit.db")
+    setup = sqlite3.connect(audit_path)
+    setup.execute("PRAGMA journal_mode=WAL")
+    setup.execute(f"CREATE TABLE audit_log (id INTEGER PRIMARY KEY, {', '.join(AUDIT_COLUMNS)})")
+    setup.execute("CREATE INDEX idx_audit_entity ON audit_log (entity_type, entity_id, created_at)")
+    setup.execute("CREATE INDEX idx_audit_actor ON audit_log (actor_id, created_at)")
+    setup.execute("CREATE INDEX idx_audit_created ON audit_log (created_at)")
+    setup.close()
+    setup = sqlite3.connect(path)
+    setup.execute("PRAGMA journal_mode=WAL")
+    setup.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, {', '.join(fields)})")
+    setup.execute("CREATE TABLE activity_log (id INTEGER PRIMARY KEY, activity_type, entity_id, message, created_at)")
+    setup.execute("CREATE INDEX idx_activity_created ON activity_log (created_at, id)")
+    setup.executemany(f"INSERT INTO {table} VALUES ({', '.join(['?'] * (len(fields) + 1))})", [
+        (i, f"Listing {i}", "Description", rng.choice(PROPERTY_TYPES), f"{i} Main St", rng.choice(CITIES), "NY",
+         "10001", rng.randint(100_000, 2_000_000), 3, 2, 1500, 0.25, 2000, 'sale', 'available')
+        for i in range(1, args.properties + 1)
+    ])
+    setup.commit()
+    setup.close()
+
+    select_sql = f"SELECT {', '.join(fields)} FROM {table} WHERE id = ?"
+    update_sql = f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields)} WHERE id = ?"
+    activity_sql = ("INSERT INTO activity_log (activity_type, entity_id, message, created_at) "
+                    f"SELECT 'property_updated', id, 'Listing updated: ' || title, CURRENT_TIMESTAMP FROM {table} WHERE id = ?")
+    audit_sql = f"INSERT INTO audit_log ({', '.join(AUDIT_COLUMNS)}) VALUES ({', '.join(['?'] * len(AUDIT_COLUMNS))})"
+
+    round_trip = args.round_trip_ms / 1000
+
+    def execute(connection, sql, params=(), many=False):
+        if round_trip:
+            time.sleep(round_trip)
+        return (connection.executemany if many else connection.execute)(sql, params)
+
+    def commit(connection):
+        if round_trip:
+            time.sleep(round_trip)
+        connection.commit()
+
+    def connect(database):
+        connection = sqlite3.connect(database, timeout=30, check_same_thread=False)
+        connection.execute("PRAGMA synchronous=FULL")
+        return connection
+
+    def run(mode):
+        connection = connect(path)
+        connection.execute(f"ATTACH DATABASE '{audit_path}' AS audit")
+        connection.execute("PRAGMA audit.synchronous=FULL")
+        writer = connect(audit_path)
+
+        def write_batch(changes):
+            # As DatabaseManager.write_audit_entries: diff on the writer thread, one batched INSERT
+            entries = [entry for entry in (audit_entry(*change) for change in changes) if entry is not None]
+            execute(writer, audit_sql, entries, many=True)
+            commit(writer)
+            return True
+
+        buffer = EventBuffer(write_batch, Config.AUDIT_BATCH_SIZE, Config.AUDIT_FLUSH_INTERVAL)
+        edits = random.Random(7)
+        start = time.perf_counter()
+        for _ in range(args.writes):
+            property_id = edits.randint(1, args.properties)
+            previous = dict(zip(fields, execute(connection, select_sql, (property_id,)).fetchone()))
+            data = dict(previous, price=previous['price'] + edits.randint(1, 50_000))
+            execute(connection, update_sql, [data[field] for field in fields] + [property_id])
+            execute(connection, activity_sql, (property_id,))
+            if mode == 'sync':
+                execute(connection, audit_sql, audit_entry(1, 'update', 'property', property_id, previous, data))
+            commit(connection)
+            if mode == 'buffered':
+                buffer.append((1, 'update', 'property', property_id, previous, data, datetime.now()))
+        buffer.close()  # the last batch counts against the run
+        elapsed = time.perf_counter() - start
+        connection.close()
+        writer.close()
+        return args.writes / elapsed
+
+    results = {}
+    for _ in range(args.repeat):
+        # Interleaved, so drift in disk or CPU speed hits every mode alike
+        for mode in ('none', 'buffered', 'sync'):
+            results.setdefault(mode, []).append(run(mode))
+    baseline = statistics.median(results['none'])
+
+    print(f"{args.writes:,} property edits on {args.properties:,} listings "
+          f"(SQLite, synchronous=FULL, {args.round_trip_ms} ms round trips)")
+    print(f"  no audit:       {baseline:10,.0f} writes/s")
+    for mode, label in (('buffered', 'buffered audit'), ('sync', 'in-transaction')):
+        throughput = statistics.median(results[mode])
+        overhead = 1 - throughput / baseline
+        line = f"  {label + ':':16}{throughput:10,.0f} writes/s   overhead {overhead:6.1%}"
+        if mode == 'buffered':
+            line += "   OK" if overhead < 0.05 else "   OVER BUDGET (5%)"
+        print(line)
+
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+
+BENCHMARKS = {
+    'live_search': (bench_live_search, {'listings': 100_000, 'repeat': 5}),
+    'grid_paint': (bench_grid_paint, {}),
+    'filter_toggle': (bench_filter_toggle, {'listings': 60, 'toggles': 20}),
+    'image_ingest': (bench_image_ingest, {'images': 40, 'width': 3000, 'height': 2000, 'workers': 0}),
+    'image_decode': (bench_image_decode, {'photos': 10, 'width': 6000, 'height': 4000}),
+    'rendition_formats': (bench_rendition_formats, {'photos': 20, 'width': 1600, 'height': 1067, 'renditions': 'card,gallery,detail'}),
+    'analytics_charts': (bench_analytics_charts, {'months': 60, 'width': 640, 'height': 380, 'repeat': 5}),
+    'analytics_engine': (bench_analytics_engine, {'transactions': 10_000_000, 'batch': 1_000_000, 'append': 10_000, 'repeat': 5}),
+    'quantile_sketch': (bench_quantile_sketch, {'values': 2_000_000, 'k': 200}),
+    'comps': (bench_comps, {'listings': 1_000_000, 'k': 5, 'queries': 200, 'updates': 1000}),
+    'avm': (bench_avm, {'transactions': 1_000_000, 'listings': 1_000_000, 'repeat': 3}),
+    'audit': (bench_audit, {'properties': 10_000, 'writes': 5_000, 'round_trip_ms': 0.2, 'repeat': 3}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    for name, (func, defaults) in BENCHMARKS.items():
+        subparser = subparsers.add_parser(name, help=func.__doc__)
+        for option, default in defaults.items():
+            subparser.add_argument(f"--{option.replace('_', '-')}", type=type(default), default=default)
+        subparser.set_defaults(func=func)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
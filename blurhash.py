@@ -0,0 +1,130 @@
+"""BlurHash encoder/decoder (https://blurha.sh) for instant image previews.
+
+A BlurHash is a ~20-30 character string holding a few DCT components of an
+image. It is stored with each property image so cards can paint a blurred
+preview before the real thumbnail has been decoded.
+"""
+import math
+from typing import List, Sequence, Tuple
+
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def encode_base83(value: int, length: int) -> str:
+    return "".join(BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def decode_base83(text: str) -> int:
+    value = 0
+    for char in text:
+        value = value * 83 + BASE83.index(char)
+    return value
+
+
+def srgb_to_linear(value: int) -> float:
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def encode(pixels: Sequence[Tuple[int, int, int]], width: int, height: int,
+           x_components: int = 4, y_components: int = 3) -> str:
+    """BlurHash of row-major RGB pixels; keep the image small (e.g. 32x32), cost is O(pixels * components)"""
+    if not 1 <= x_components <= 9 or not 1 <= y_components <= 9:
+        raise ValueError("BlurHash components must be between 1 and 9")
+
+    linear = [(srgb_to_linear(r), srgb_to_linear(g), srgb_to_linear(b)) for r, g, b in pixels]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(x_components)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(y_components)]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                basis_y = cos_y[j][y]
+                for x in range(width):
+                    basis = basis_y * cos_x[i][x]
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = encode_base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(c) for factor in ac for c in factor)
+        quantised_max = max(0, min(82, int(actual_max * 166 - 0.5)))
+        maximum_value = (quantised_max + 1) / 166
+        result += encode_base83(quantised_max, 1)
+    else:
+        maximum_value = 1
+        result += encode_base83(0, 1)
+
+    result += encode_base83((linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8) + linear_to_srgb(dc[2]), 4)
+
+    for factor in ac:
+        quant = [max(0, min(18, int(sign_pow(c / maximum_value, 0.5) * 9 + 9.5))) for c in factor]
+        result += encode_base83(quant[0] * 19 * 19 + quant[1] * 19 + quant[2], 2)
+
+    return result
+
+
+def decode(blurhash: str, width: int, height: int, punch: float = 1.0) -> bytes:
+    """Row-major RGB bytes (width * height * 3) of the preview described by blurhash"""
+    if not blurhash or len(blurhash) < 6:
+        raise ValueError("BlurHash must be at least 6 characters")
+
+    size_flag = decode_base83(blurhash[0])
+    y_components = size_flag // 9 + 1
+    x_components = size_flag % 9 + 1
+    if len(blurhash) != 4 + 2 * x_components * y_components:
+        raise ValueError("BlurHash length does not match its component count")
+
+    maximum_value = (decode_base83(blurhash[1]) + 1) / 166 * punch
+
+    dc = decode_base83(blurhash[2:6])
+    colors: List[Tuple[float, float, float]] = [
+        (srgb_to_linear(dc >> 16), srgb_to_linear((dc >> 8) & 255), srgb_to_linear(dc & 255))
+    ]
+    for k in range(1, x_components * y_components):
+        value = decode_base83(blurhash[4 + k * 2:6 + k * 2])
+        colors.append((
+            sign_pow((value // (19 * 19) - 9) / 9, 2) * maximum_value,
+            sign_pow(((value // 19) % 19 - 9) / 9, 2) * maximum_value,
+            sign_pow((value % 19 - 9) / 9, 2) * maximum_value
+        ))
+
+    cos_x = [[math.cos(math.pi * x * i / width) for i in range(x_components)] for x in range(width)]
+    cos_y = [[math.cos(math.pi * y * j / height) for j in range(y_components)] for y in range(height)]
+
+    pixels = bytearray()
+    for y in range(height):
+        basis_y = cos_y[y]
+        for x in range(width):
+            basis_x = cos_x[x]
+            r = g = b = 0.0
+            for j in range(y_components):
+                for i in range(x_components):
+                    basis = basis_x[i] * basis_y[j]
+                    cr, cg, cb = colors[j * x_components + i]
+                    r += cr * basis
+                    g += cg * basis
+                    b += cb * basis
+            pixels += bytes((linear_to_srgb(r), linear_to_srgb(g), linear_to_srgb(b)))
+    return bytes(pixels)
@@ -0,0 +1,291 @@
+"""In-memory nearest-neighbour search for comparable properties (comps).
+
+Every listing is a point in a small feature space: bedrooms, bathrooms,
+log square feet, year built and log price, each standardized and weighted
+so that plain squared Euclidean distance is the similarity. Points are
+partitioned into blocks by (listing_type, city). A block's features are
+stored feature-major and contiguously, so a query scans only its own block,
+in cache-sized chunks, with a handful of vectorized passes and a partial
+sort. A different zip code adds a fixed penalty. Other cities are only
+considered when the block has too few candidates.
+
+The index follows the properties table incrementally: refresh() pulls rows
+whose updated_at moved since the last refresh and moves them in place (or
+between blocks), and remove() drops deleted listings.
+"""
+import math
+import threading
+import datetime
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from analytics_engine import to_day
+
+# Row layout of DatabaseManager.get_comps_rows
+COMPS_COLUMNS = (
+    'id', 'listing_type', 'city', 'zip_code', 'status', 'bedrooms', 'bathrooms',
+    'square_feet', 'year_built', 'price', 'closed_at', 'updated_at'
+)
+
+# Similarity features and their relative weights
+FEATURES = ('bedrooms', 'bathrooms', 'square_feet', 'year_built', 'price')
+FEATURE_WEIGHTS = {'bedrooms': 1.0, 'bathrooms': 1.0, 'square_feet': 1.5, 'year_built': 0.5, 'price': 1.5}
+LOG_FEATURES = ('square_feet', 'price')
+FEATURE_POSITIONS = [COMPS_COLUMNS.index(name) for name in FEATURES]
+
+# Squared-distance penalties for location, in standardized units
+ZIP_PENALTY = 0.5
+CITY_PENALTY = 4.0
+
+# What a point can be matched as
+REMOVED, LISTING, CLOSED, OTHER = 0, 1, 2, 3
+
+# Distance of points that do not qualify; float32 keeps every pass in single precision
+EXCLUDED = np.float32(1e30)
+ZIP_PENALTY_32 = np.float32(ZIP_PENALTY)
+
+CHUNK_ROWS = 1 << 16
+
+def zip_number(zip_code):
+    digits = str(zip_code or "")[:5]
+    return int(digits) if digits.isdigit() else -1
+
+def raw_features(columns: Sequence[Sequence], count: int) -> np.ndarray:
+    """Unweighted feature matrix (count x FEATURES) of raw value columns in FEATURES order; None becomes NaN"""
+    raw = np.empty((count, len(FEATURES)), dtype=np.float64)
+    for feature, (name, values) in enumerate(zip(FEATURES, columns)):
+        column = np.fromiter((math.nan if value is None else float(value) for value in values),
+                             dtype=np.float64, count=count)
+        if name in LOG_FEATURES:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                column = np.where(column > 0, np.log(column), np.nan)
+        raw[:, feature] = column
+    return raw
+
+class CompsBlock:
+    """Points of one (listing_type, city), feature-major with a free list of removed slots"""
+
+    def __init__(self, initial_capacity=256):
+        self.size = 0
+        self.capacity = initial_capacity
+        self.features = np.zeros((len(FEATURES), initial_capacity), dtype=np.float32)
+        self.ids = np.zeros(initial_capacity, dtype=np.int64)
+        self.zips = np.zeros(initial_capacity, dtype=np.int32)
+        self.kinds = np.zeros(initial_capacity, dtype=np.int8)
+        self.closed_days = np.zeros(initial_capacity, dtype=np.int32)
+        self.free: List[int] = []
+
+    def reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        self.capacity = max(capacity, self.capacity * 2)
+        features = np.zeros((len(FEATURES), self.capacity), dtype=np.float32)
+        features[:, :self.size] = self.features[:, :self.size]
+        self.features = features
+        for name in ('ids', 'zips', 'kinds', 'closed_days'):
+            column = getattr(self, name)
+            grown = np.zeros(self.capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def allocate(self) -> int:
+        if self.free:
+            return self.free.pop()
+        self.reserve(self.size + 1)
+        self.size += 1
+        return self.size - 1
+
+    def store(self, positions, ids, vectors, zips, kinds, closed_days):
+        self.features[:, positions] = vectors.T
+        self.ids[positions] = ids
+        self.zips[positions] = zips
+        self.kinds[positions] = kinds
+        self.closed_days[positions] = closed_days
+
+    def release(self, row):
+        self.kinds[row] = REMOVED
+        self.free.append(row)
+
+    def nearest(self, vector, zip_code, k, kind, since_day=None, exclude_id=None, penalty=0.0):
+        """Up to k (distance, id) pairs of the wanted kind, closest first"""
+        found_distances = []
+        found_ids = []
+        for start in range(0, self.size, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, self.size)
+            excluded = self.kinds[start:stop] != kind
+            if since_day is not None:
+                excluded |= self.closed_days[start:stop] < since_day
+            if exclude_id is not None:
+                excluded |= self.ids[start:stop] == exclude_id
+            if excluded.all():
+                continue
+
+            # Penalties are added arithmetically: masked writes are several times slower on scattered masks
+            distances = excluded * EXCLUDED
+            distances += (self.zips[start:stop] != zip_code) * ZIP_PENALTY_32
+            difference = np.empty(stop - start, dtype=np.float32)
+            for feature in range(len(FEATURES)):
+                np.subtract(self.features[feature, start:stop], vector[feature], out=difference)
+                np.multiply(difference, difference, out=difference)
+                distances += difference
+
+            take = min(k, stop - start)
+            candidates = np.argpartition(distances, take - 1)[:take] if take < stop - start else np.arange(take)
+            candidates = candidates[distances[candidates] < EXCLUDED]
+            found_distances.append(distances[candidates] + penalty)
+            found_ids.append(self.ids[start:stop][candidates])
+
+        if not found_distances:
+            return []
+        distances = np.concatenate(found_distances)
+        ids = np.concatenate(found_ids)
+        order = np.argsort(distances, kind='stable')[:k]
+        return list(zip(distances[order].tolist(), ids[order].tolist()))
+
+class CompsEngine:
+    """Incrementally maintained comps index over all properties. All methods are thread-safe."""
+
+    def __init__(self):
+        self.blocks: Dict[Tuple[str, str], CompsBlock] = {}
+        self.locations: Dict[int, Tuple[Tuple[str, str], int]] = {}
+        # Per listing type: (center, 1 / scale) of each feature, fixed at the first rows seen
+        self.calibration: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.updated_since: Optional[datetime.datetime] = None
+
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.locations)
+
+    def refresh(self, db_manager, batch_size=50000):
+        """Load rows changed since the last refresh (all rows the first time); returns the number loaded"""
+        with self.refresh_lock:
+            since = self.updated_since
+            newest = since
+            loaded = 0
+            after_id = 0
+            while True:
+                rows = db_manager.get_comps_rows(after_id, batch_size, since)
+                if not rows:
+                    break
+                self.upsert(rows)
+                loaded += len(rows)
+                after_id = rows[-1][0]
+                stamps = [row[-1] for row in rows if row[-1] is not None]
+                if stamps and (newest is None or max(stamps) > newest):
+                    newest = max(stamps)
+            # Rows updated within the watermark's second are fetched again next time; upsert is idempotent
+            self.updated_since = newest
+            return loaded
+
+    def calibrate(self, listing_type, vectors):
+        """Standardize features by this listing type's first rows, then weight them"""
+        with np.errstate(invalid='ignore'):
+            center = np.nanmean(vectors, axis=0) if len(vectors) else np.zeros(len(FEATURES))
+            scale = np.nanstd(vectors, axis=0) if len(vectors) > 1 else np.ones(len(FEATURES))
+        center = np.nan_to_num(center)
+        scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        weights = np.sqrt([FEATURE_WEIGHTS[name] for name in FEATURES])
+        self.calibration[listing_type] = (center, weights / scale)
+
+    def vectors(self, listing_type, raw):
+        """Weighted standardized features; a missing value sits at the center"""
+        center, factor = self.calibration[listing_type]
+        return np.nan_to_num((raw - center) * factor).astype(np.float32)
+
+    def upsert(self, rows: Sequence[Sequence]):
+        """Insert or move rows laid out as COMPS_COLUMNS"""
+        if not rows:
+            return
+        count = len(rows)
+        columns = list(zip(*rows))
+        raw = raw_features([columns[position] for position in FEATURE_POSITIONS], count)
+        ids = np.array(columns[0], dtype=np.int64)
+        zips = np.fromiter(map(zip_number, columns[3]), dtype=np.int32, count=count)
+        kinds = np.fromiter((
+            LISTING if status == 'available' else CLOSED if status in ('sold', 'rented') and closed_at is not None else OTHER
+            for status, closed_at in zip(columns[4], columns[10])
+        ), dtype=np.int8, count=count)
+        closed_days = np.fromiter((0 if closed_at is None else to_day(closed_at) for closed_at in columns[10]),
+                                  dtype=np.int32, count=count)
+
+        with self.lock:
+            listing_types = np.array(columns[1], dtype=object)
+            vectors = np.empty((count, len(FEATURES)), dtype=np.float32)
+            for listing_type in set(columns[1]):
+                selected = listing_types == listing_type
+                if listing_type not in self.calibration:
+                    self.calibrate(listing_type, raw[selected])
+                vectors[selected] = self.vectors(listing_type, raw[selected])
+
+            # Place each row (in place, in a free slot, or appended), then write each block's rows at once
+            placements = {}
+            for index, (property_id, listing_type, city) in enumerate(zip(columns[0], columns[1], columns[2])):
+                key = (listing_type, city)
+                location = self.locations.get(property_id)
+                if location is not None and location[0] != key:
+                    self.blocks[location[0]].release(location[1])
+                    location = None
+
+                block = self.blocks.get(key)
+                if block is None:
+                    block = self.blocks[key] = CompsBlock()
+                position = location[1] if location is not None else block.allocate()
+                self.locations[property_id] = (key, position)
+                positions, indices = placements.setdefault(key, ([], []))
+                positions.append(position)
+                indices.append(index)
+
+            for key, (positions, indices) in placements.items():
+                indices = np.array(indices)
+                self.blocks[key].store(np.array(positions), ids[indices], vectors[indices], zips[indices],
+                                       kinds[indices], closed_days[indices])
+
+    def remove(self, property_id):
+        """Drop a deleted listing"""
+        with self.lock:
+            location = self.locations.pop(property_id, None)
+            if location is not None:
+                self.blocks[location[0]].release(location[1])
+
+    def nearest(self, prop: Dict, k: int = 5, closed: bool = False, since_day: int = None) -> List[Tuple[float, int]]:
+        """(distance, id) of the k listings (or closed deals since since_day) most similar to prop"""
+        listing_type = prop['listing_type']
+        kind = CLOSED if closed else LISTING
+        if not closed:
+            since_day = None
+        with self.lock:
+            if listing_type not in self.calibration:
+                return []
+            raw = raw_features([[prop.get(name)] for name in FEATURES], 1)
+            vector = self.vectors(listing_type, raw)[0]
+            zip_code = zip_number(prop.get('zip_code'))
+            exclude_id = prop.get('id')
+
+            home = self.blocks.get((listing_type, prop['city']))
+            results = home.nearest(vector, zip_code, k, kind, since_day, exclude_id) if home else []
+            if len(results) < k:
+                # Too few in town: widen to other cities at a location penalty
+                for key, block in self.blocks.items():
+                    if key[0] == listing_type and block is not home:
+                        results += block.nearest(vector, zip_code, k, kind, since_day, exclude_id, CITY_PENALTY)
+                results.sort()
+            return results[:k]
+
+    def memory_bytes(self):
+        with self.lock:
+            return sum(block.features.nbytes + block.ids.nbytes + block.zips.nbytes + block.kinds.nbytes
+                       + block.closed_days.nbytes for block in self.blocks.values())
+
+
+_shared_engine = None
+_shared_engine_lock = threading.Lock()
+
+def get_comps_engine():
+    """Process-wide CompsEngine, so detail windows share one index"""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = CompsEngine()
+        return _shared_engine
@@ -8,6 +8,7 @@ class Config:
     DB_NAME = "real_estate_db"
     DB_USER = "root"
     DB_PASSWORD = ""  # Set your MySQL password here
+    DB_IDLE_PING_SECONDS = 60  # A thread's connection is checked (and reopened) only after this long unused
     
     # Application Settings
     APP_NAME = "RealEstate Pro"
@@ -41,4 +42,51 @@ class Config:
     
     # Image Settings
     PROPERTY_IMAGE_SIZE = (300, 200)
-    THUMBNAIL_SIZE = (150, 100)
\ No newline at end of file
+    THUMBNAIL_SIZE = (150, 100)
+    IMAGE_RENDITIONS = {  # Pre-rendered at upload; name -> exact display size
+        'card': (320, 120),
+        'gallery': (150, 100),
+        'detail': (600, 300),
+        'preview': (250, 150)
+    }
+    IMAGE_RENDITION_ENCODINGS = {  # 'jpeg', 'webp' or lossless 'png' (for graphics such as floor plans)
+        'card': 'webp',
+        'gallery': 'webp',
+        'detail': 'jpeg',
+        'preview': 'jpeg'
+    }
+    IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Decoded-image LRU budget
+    IMAGE_INGEST_WORKERS = None  # Upload worker processes (None = one per CPU)
+    IMAGE_DECODE_WORKERS = 2  # Concurrent background decodes for cards and galleries
+    IMAGE_MAX_DECODE_PIXELS = 50_000_000  # Refuse images that would decode larger than this
+    
+    # Search Settings
+    SEARCH_DEBOUNCE_MS = 150  # Quiet period before a live search fires
+    SEARCH_CACHE_MAX_AGE = 60  # Seconds a result set may serve in-memory refinements
+    
+    # Analytics Settings
+    ANALYTICS_CHART_CACHE_SIZE = 24  # Rendered dashboard charts kept per process
+    ANALYTICS_PERIOD_DAYS = 30  # Window for user growth and conversion metrics
+    TOP_PROPERTIES_LIMIT = 10  # Rows in the dashboard's top properties ranking
+    ANALYTICS_SNAPSHOT_INTERVAL = 300  # Seconds before dashboard figures are recomputed in the background
+    ANALYTICS_SNAPSHOT_CHECK_MS = 5000  # How often open dashboards look for a newer snapshot
+    PRICE_SKETCH_K = 200  # KLL sketch size for price per sq ft percentiles (~1.3% rank error)
+    ACTIVITY_PAGE_SIZE = 20  # Activity log entries per page of the admin feed
+    
+    # Automated Valuation Settings
+    AVM_RIDGE_ALPHA = 10.0  # Ridge penalty on standardized features and category effects
+    AVM_BAND_QUANTILES = (0.1, 0.9)  # Held-out error quantiles spanned by the confidence band
+    AVM_MIN_CATEGORY_ROWS = 20  # Cities/types with fewer sales share the baseline effect
+    AVM_MIN_TRAINING_ROWS = 50  # Completed transactions needed before a listing type is valued
+    AVM_FLAG_RATIO = 0.2  # Flag listings outside their band and this far from the estimate
+    
+    # Comparable Properties Settings
+    COMPS_COUNT = 5  # Similar listings and closed deals shown per property
+    COMPS_CLOSED_DAYS = 365  # How far back closed deals count as comparables
+    
+    # Event Settings
+    EVENT_BATCH_SIZE = 500  # Buffered activity events per batched INSERT
+    EVENT_FLUSH_INTERVAL = 5.0  # Seconds between background event writes
+    EVENT_ROLLUP_LOOKBACK_DAYS = 1  # Days before the newest rollup re-aggregated for late-written events
+    AUDIT_BATCH_SIZE = 200  # Buffered audit entries per batched INSERT (deletes are written immediately)
+    AUDIT_FLUSH_INTERVAL = 2.0  # Seconds between background audit writes
@@ -1,15 +1,205 @@
 import mysql.connector
 from mysql.connector import Error
 import hashlib
+import json
 import datetime
+import threading
+import time
+import weakref
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 from config import Config
+from event_buffer import EventBuffer
+from quantile_sketch import KLLSketch, normalized_rank_error
+from audit_trail import AUDIT_COLUMNS, audit_entry
+
+class ThreadSlot:
+    """Marker kept in a thread's locals next to its connection; freed (and finalized) when the thread exits"""
 
 class DatabaseManager:
-    def __init__(self):
-        self.connection = None
+    # Listing columns shared by get_properties and get_user_favorites; the primary
+    # image comes from an indexed (property_id, is_primary) lookup in the same query
+    PROPERTY_SELECT = '''
+        SELECT p.*, u.first_name, u.last_name, u.phone, u.email,
+            pi.image_path, pi.blurhash, pi.dominant_color
+        FROM properties p
+        LEFT JOIN users u ON p.agent_id = u.id
+        LEFT JOIN property_images pi ON pi.id = (
+            SELECT ppi.id FROM property_images ppi
+            WHERE ppi.property_id = p.id AND ppi.is_primary = TRUE
+            ORDER BY ppi.id LIMIT 1
+        )
+    '''
+    
+    # Column order of the properties table, i.e. of p.* in listing queries
+    PROPERTY_COLUMNS = (
+        'id', 'title', 'description', 'property_type', 'address', 'city', 'state', 'zip_code',
+        'price', 'bedrooms', 'bathrooms', 'square_feet', 'lot_size', 'year_built', 'listing_type',
+        'owner_id', 'agent_id', 'status', 'created_at', 'updated_at', 'listed_at', 'closed_at',
+        'days_on_market', 'sale_price', 'price_per_sqft', 'favorites_count', 'view_count'
+    )
+    
+    # get_top_properties metrics: ranked column, date the period applies to, default order
+    RANKING_METRICS = {
+        'sale_price': ('p.sale_price', 'p.closed_at', 'DESC'),
+        'price_per_sqft': ('p.price_per_sqft', 'p.listed_at', 'DESC'),
+        'days_to_close': ('p.days_on_market', 'p.closed_at', 'ASC'),
+        'favorites': ('p.favorites_count', 'p.listed_at', 'DESC'),
+        'views': ('p.view_count', 'p.listed_at', 'DESC')
+    }
+    
+    # activity_log entries: entity type, source tables, entity id, user id, message, key condition, and
+    # the time column a backfill dates entries by (None for changes the source tables do not record)
+    ACTIVITY_SOURCES = {
+        'property_listed': (
+            'property', "properties p", "p.id", "p.owner_id",
+            "CONCAT('New ', p.listing_type, ' listing: ''', p.title, ''' in ', p.city)", "p.id = %s", "p.created_at"
+        ),
+        'property_updated': (
+            'property', "properties p", "p.id", "p.owner_id",
+            "CONCAT('Listing updated: ''', p.title, '''')", "p.id = %s", None
+        ),
+        'property_deleted': (
+            'property', "properties p", "p.id", "p.owner_id",
+            "CONCAT('Listing deleted: ''', p.title, '''')", "p.id = %s", None
+        ),
+        'images_added': (
+            'property', "properties p", "p.id", "p.owner_id",
+            "CONCAT('Photos added to ''', p.title, '''')", "p.id = %s", None
+        ),
+        'primary_image_set': (
+            'property', "properties p", "p.id", "p.owner_id",
+            "CONCAT('Cover photo changed for ''', p.title, '''')", "p.id = %s", None
+        ),
+        'image_deleted': (
+            'property', "property_images i JOIN properties p ON i.property_id = p.id", "p.id", "p.owner_id",
+            "CONCAT('Photo removed from ''', p.title, '''')", "i.id = %s", None
+        ),
+        'user_registered': (
+            'user', "users u", "u.id", "u.id",
+            "CONCAT('New ', u.user_type, ' registered: ', u.first_name, ' ', u.last_name)", "u.id = %s", "u.created_at"
+        ),
+        'user_updated': (
+            'user', "users u", "u.id", "u.id",
+            "CONCAT('User updated: ', u.first_name, ' ', u.last_name)", "u.id = %s", None
+        ),
+        'user_status': (
+            'user', "users u", "u.id", "u.id",
+            "CONCAT(IF(u.is_active, 'User activated: ', 'User deactivated: '), u.first_name, ' ', u.last_name)",
+            "u.id = %s", None
+        ),
+        'user_deleted': (
+            'user', "users u", "u.id", "u.id",
+            "CONCAT('User deleted: ', u.first_name, ' ', u.last_name)", "u.id = %s", None
+        ),
+        'transaction': (
+            'transaction', "transactions t JOIN properties p ON t.property_id = p.id JOIN users u ON t.buyer_id = u.id",
+            "t.id", "t.buyer_id",
+            "CONCAT(u.first_name, ' ', u.last_name, ' ', t.transaction_type, 'd ''', p.title, ''' for $', FORMAT(t.amount, 0))",
+            "t.id = %s", "t.transaction_date"
+        ),
+        'transaction_status': (
+            'transaction', "transactions t JOIN properties p ON t.property_id = p.id", "t.id", "t.buyer_id",
+            "CONCAT('Transaction #', t.id, ' for ''', p.title, ''' marked ', t.status)", "t.id = %s", None
+        ),
+        'transaction_deleted': (
+            'transaction', "transactions t JOIN properties p ON t.property_id = p.id", "t.id", "t.buyer_id",
+            "CONCAT('Transaction #', t.id, ' for ''', p.title, ''' deleted')", "t.id = %s", None
+        ),
+        'favorite_added': (
+            'property', "favorites f JOIN properties p ON f.property_id = p.id JOIN users u ON f.user_id = u.id",
+            "p.id", "u.id", "CONCAT(u.first_name, ' ', u.last_name, ' saved ''', p.title, '''')",
+            "f.user_id = %s AND f.property_id = %s", None
+        ),
+        'favorite_removed': (
+            'property', "favorites f JOIN properties p ON f.property_id = p.id JOIN users u ON f.user_id = u.id",
+            "p.id", "u.id", "CONCAT(u.first_name, ' ', u.last_name, ' unsaved ''', p.title, '''')",
+            "f.user_id = %s AND f.property_id = %s", None
+        )
+    }
+    
+    # Audited entities: table and the fields an audit entry compares
+    AUDIT_FIELDS = {
+        'property': ('properties', (
+            'title', 'description', 'property_type', 'address', 'city', 'state', 'zip_code', 'price',
+            'bedrooms', 'bathrooms', 'square_feet', 'lot_size', 'year_built', 'listing_type', 'status'
+        )),
+        'user': ('users', ('username', 'email', 'first_name', 'last_name', 'phone', 'user_type', 'is_active')),
+        'transaction': ('transactions', (
+            'property_id', 'buyer_id', 'seller_id', 'transaction_type', 'amount', 'transaction_date', 'status', 'notes'
+        ))
+    }
+    
+    # Per-image metadata recorded at ingest (see image_manager.describe_image)
+    IMAGE_METADATA_FIELDS = ('width', 'height', 'byte_size', 'content_hash', 'dominant_color', 'blurhash')
+    
+    def __init__(self, initialize: bool = True):
+        # MySQL connections are not thread-safe, so each thread (the Tk
+        # thread and every TaskRunner worker) gets its own connection
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self.events = EventBuffer(self.record_events, Config.EVENT_BATCH_SIZE, Config.EVENT_FLUSH_INTERVAL)
+        # Audit rows are never shed: past max_pending the caller writes them itself
+        self.audit = EventBuffer(self.write_audit_entries, Config.AUDIT_BATCH_SIZE, Config.AUDIT_FLUSH_INTERVAL,
+                                 shed=False)
+        # Bumped by every write that changes listings, so cached search results can tell they are stale
+        self.listings_version = 0
         self.connect_to_database()
-        self.init_database()
+        # init_database recreates every table; maintenance tools attach to the existing data instead
+        if initialize:
+            self.init_database()
+    
+    @property
+    def connection(self):
+        """Connection owned by the calling thread, opened on first use.
+
+        is_connected() costs a round trip, so a connection is only checked
+        (and replaced if the server dropped it) after DB_IDLE_PING_SECONDS
+        unused.
+        """
+        connection = getattr(self._local, 'connection', None)
+        now = time.monotonic()
+        if connection is None or (now - self._local.last_used >= Config.DB_IDLE_PING_SECONDS
+                                  and not connection.is_connected()):
+            connection = self.open_thread_connection()
+        self._local.last_used = now
+        return connection
+    
+    @connection.setter
+    def connection(self, value):
+        self._local.connection = value
+        self._local.last_used = time.monotonic()
+        with self._connections_lock:
+            self._connections.append(value)
+        # A worker thread's locals are freed when it exits (e.g. after its TaskRunner shuts down),
+        # and so is this slot: its connection is closed then, not at app exit
+        self._local.slot = ThreadSlot()
+        weakref.finalize(self._local.slot, self.release_connection, value)
+    
+    def release_connection(self, connection):
+        """Close a thread's connection once the thread is gone or has replaced it"""
+        with self._connections_lock:
+            if not any(tracked is connection for tracked in self._connections):
+                return
+            self._connections = [tracked for tracked in self._connections if tracked is not connection]
+        try:
+            connection.close()
+        except Error:
+            pass
+    
+    def open_thread_connection(self):
+        """Open a connection to the application database for the calling thread"""
+        connection = mysql.connector.connect(
+            host=Config.DB_HOST,
+            port=Config.DB_PORT,
+            user=Config.DB_USER,
+            password=Config.DB_PASSWORD,
+            database=Config.DB_NAME,
+            autocommit=True
+        )
+        self.connection = connection
+        return connection
     
     def connect_to_database(self):
         """Establish connection to MySQL database"""
@@ -37,7 +227,7 @@ class DatabaseManager:
     
     def init_database(self):
         """Initialize the database with required tables"""
-        if not self.connection or not self.connection.is_connected():
+        if not getattr(self._local, 'connection', None) or not self._local.connection.is_connected():
             self.connect_to_database()
         
         try:
@@ -46,8 +236,15 @@ class DatabaseManager:
             # Drop existing tables to recreate with proper structure
             cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
             cursor.execute("DROP TABLE IF EXISTS favorites")
+            cursor.execute("DROP TABLE IF EXISTS events")
+            cursor.execute("DROP TABLE IF EXISTS event_daily")
+            cursor.execute("DROP TABLE IF EXISTS price_sketches")
+            cursor.execute("DROP TABLE IF EXISTS property_valuations")
+            cursor.execute("DROP TABLE IF EXISTS activity_log")
+            cursor.execute("DROP TABLE IF EXISTS audit_log")
             cursor.execute("DROP TABLE IF EXISTS transactions")
             cursor.execute("DROP TABLE IF EXISTS property_images")
+            cursor.execute("DROP TABLE IF EXISTS image_files")
             cursor.execute("DROP TABLE IF EXISTS properties")
             cursor.execute("DROP TABLE IF EXISTS users")
             cursor.execute("DROP TABLE IF EXISTS admins")
@@ -79,7 +276,8 @@ class DatabaseManager:
                     phone VARCHAR(20),
                     user_type ENUM('buyer', 'seller', 'agent') DEFAULT 'buyer',
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE
+                    is_active BOOLEAN DEFAULT TRUE,
+                    INDEX idx_users_created (created_at)
                 )
             ''')
             
@@ -106,8 +304,24 @@ class DatabaseManager:
                     status ENUM('available', 'sold', 'rented', 'pending') DEFAULT 'available',
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    listed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    closed_at TIMESTAMP NULL DEFAULT NULL,
+                    days_on_market INT AS (DATEDIFF(closed_at, listed_at)) STORED,
+                    sale_price DECIMAL(12,2) NULL DEFAULT NULL,
+                    price_per_sqft DECIMAL(12,2) AS (IF(square_feet > 0, COALESCE(sale_price, price) / square_feet, NULL)) STORED,
+                    favorites_count INT NOT NULL DEFAULT 0,
+                    view_count INT NOT NULL DEFAULT 0,
                     FOREIGN KEY (owner_id) REFERENCES users(id),
-                    FOREIGN KEY (agent_id) REFERENCES users(id)
+                    FOREIGN KEY (agent_id) REFERENCES users(id),
+                    INDEX idx_properties_created (created_at),
+                    INDEX idx_properties_updated (updated_at),
+                    INDEX idx_properties_dom_type (property_type, days_on_market),
+                    INDEX idx_properties_dom_city (city, days_on_market),
+                    INDEX idx_properties_days_on_market (days_on_market),
+                    INDEX idx_properties_sale_price (sale_price),
+                    INDEX idx_properties_price_per_sqft (price_per_sqft),
+                    INDEX idx_properties_favorites (favorites_count),
+                    INDEX idx_properties_views (view_count)
                 )
             ''')
             
@@ -118,7 +332,24 @@ class DatabaseManager:
                     property_id INT,
                     image_path VARCHAR(500) NOT NULL,
                     is_primary BOOLEAN DEFAULT FALSE,
-                    FOREIGN KEY (property_id) REFERENCES properties(id) ON DELETE CASCADE
+                    width INT,
+                    height INT,
+                    byte_size BIGINT,
+                    content_hash CHAR(64),
+                    dominant_color CHAR(7),
+                    blurhash VARCHAR(100),
+                    FOREIGN KEY (property_id) REFERENCES properties(id) ON DELETE CASCADE,
+                    INDEX idx_property_images_primary (property_id, is_primary),
+                    INDEX idx_property_images_path (image_path)
+                )
+            ''')
+            
+            # Stored image files (content-addressed, shared between listings) and their reference counts
+            cursor.execute('''
+                CREATE TABLE image_files (
+                    image_path VARCHAR(500) PRIMARY KEY,
+                    ref_count INT NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
             
@@ -136,7 +367,8 @@ class DatabaseManager:
                     notes TEXT,
                     FOREIGN KEY (property_id) REFERENCES properties(id),
                     FOREIGN KEY (buyer_id) REFERENCES users(id),
-                    FOREIGN KEY (seller_id) REFERENCES users(id)
+                    FOREIGN KEY (seller_id) REFERENCES users(id),
+                    INDEX idx_transactions_status_date (status, transaction_date)
                 )
             ''')
             
@@ -153,6 +385,87 @@ class DatabaseManager:
                 )
             ''')
             
+            # Raw activity events (append-only, written in batches by EventBuffer)
+            cursor.execute('''
+                CREATE TABLE events (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    event_type ENUM('view', 'favorite', 'transaction') NOT NULL,
+                    user_id INT,
+                    property_id INT,
+                    created_at DATETIME NOT NULL,
+                    INDEX idx_events_created (created_at)
+                )
+            ''')
+            
+            # Daily event rollups read by the analytics metrics
+            cursor.execute('''
+                CREATE TABLE event_daily (
+                    day DATE NOT NULL,
+                    event_type ENUM('view', 'favorite', 'transaction') NOT NULL,
+                    events INT NOT NULL,
+                    users INT NOT NULL,
+                    properties INT NOT NULL,
+                    PRIMARY KEY (day, event_type)
+                )
+            ''')
+            
+            # Price per square foot quantile sketches (quantile_sketch.KLLSketch) per segment
+            cursor.execute('''
+                CREATE TABLE price_sketches (
+                    kind ENUM('listing', 'sale') NOT NULL,
+                    city VARCHAR(100) NOT NULL,
+                    property_type ENUM('House', 'Apartment', 'Condo', 'Loft', 'Townhouse') NOT NULL,
+                    observations BIGINT NOT NULL,
+                    sketch BLOB NOT NULL,
+                    dirty BOOLEAN NOT NULL DEFAULT FALSE,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (kind, city, property_type)
+                )
+            ''')
+            
+            # Latest automated valuation (avm.py) of each available listing
+            cursor.execute('''
+                CREATE TABLE property_valuations (
+                    property_id INT PRIMARY KEY,
+                    estimate DECIMAL(12,2) NOT NULL,
+                    low DECIMAL(12,2) NOT NULL,
+                    high DECIMAL(12,2) NOT NULL,
+                    valued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    FOREIGN KEY (property_id) REFERENCES properties(id) ON DELETE CASCADE
+                )
+            ''')
+            
+            # Admin activity feed (append-only; no foreign keys, so entries outlive what they describe)
+            cursor.execute('''
+                CREATE TABLE activity_log (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    activity_type VARCHAR(30) NOT NULL,
+                    entity_type ENUM('property', 'user', 'transaction') NOT NULL,
+                    entity_id INT NOT NULL,
+                    user_id INT,
+                    message VARCHAR(400) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_activity_created (created_at, id),
+                    INDEX idx_activity_entity (entity_type, entity_id, activity_type)
+                )
+            ''')
+            
+            # Audit trail of admin changes (append-only; actor_id is admins.id, NULL outside an admin session)
+            cursor.execute('''
+                CREATE TABLE audit_log (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    actor_id INT,
+                    action VARCHAR(20) NOT NULL,
+                    entity_type ENUM('property', 'user', 'transaction') NOT NULL,
+                    entity_id INT NOT NULL,
+                    changes JSON NOT NULL,
+                    created_at DATETIME NOT NULL,
+                    INDEX idx_audit_entity (entity_type, entity_id, created_at),
+                    INDEX idx_audit_actor (actor_id, created_at),
+                    INDEX idx_audit_created (created_at)
+                )
+            ''')
+            
             cursor.close()
             print("Database tables created successfully")
             self.populate_sample_data()
@@ -243,6 +556,9 @@ class DatabaseManager:
                     ''', (property_id, sample_images[i], True))
             
             cursor.close()
+            self.rebuild_image_ref_counts()
+            self.rebuild_price_sketches()
+            self.backfill_activity_log()
             print("Sample data populated successfully")
             
         except Error as e:
@@ -326,46 +642,71 @@ class DatabaseManager:
                 'monthly_revenue': 0
             }
     
-    def get_recent_activities(self, limit: int = 20) -> List[str]:
-        """Get recent system activities"""
+    def log_activity(self, cursor, activity_type: str, *key):
+        """Append one activity_log entry, rendered from the rows it describes (so call it before deleting them)"""
+        entity_type, source, entity, user, message, condition, _ = self.ACTIVITY_SOURCES[activity_type]
+        cursor.execute(f'''
+            INSERT INTO activity_log (activity_type, entity_type, entity_id, user_id, message)
+            SELECT %s, %s, {entity}, {user}, {message} FROM {source} WHERE {condition}
+        ''', (activity_type, entity_type) + key)
+    
+    def backfill_activity_log(self) -> int:
+        """Log listings, registrations and transactions that predate activity_log; returns entries added"""
         try:
             cursor = self.connection.cursor()
+            added = 0
+            
+            for activity_type, (entity_type, source, entity, user, message, _, created) in self.ACTIVITY_SOURCES.items():
+                if created is None:
+                    continue
+                # Idempotent: rows already logged, live or by an earlier backfill, are skipped
+                cursor.execute(f'''
+                    INSERT INTO activity_log (activity_type, entity_type, entity_id, user_id, message, created_at)
+                    SELECT %s, %s, {entity}, {user}, {message}, {created} FROM {source}
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM activity_log a
+                        WHERE a.entity_type = %s AND a.entity_id = {entity} AND a.activity_type = %s
+                    )
+                    ORDER BY {created}, {entity}
+                ''', (activity_type, entity_type, entity_type, activity_type))
+                added += cursor.rowcount
             
-            activities = []
-            
-            # Recent transactions
-            cursor.execute('''
-                SELECT t.transaction_type, t.amount, t.transaction_date, 
-                       p.title, u.first_name, u.last_name
-                FROM transactions t
-                JOIN properties p ON t.property_id = p.id
-                JOIN users u ON t.buyer_id = u.id
-                ORDER BY t.transaction_date DESC
-                LIMIT %s
-            ''', (limit // 2,))
-            
-            transactions = cursor.fetchall()
-            for trans in transactions:
-                activity = f"{trans[4]} {trans[5]} {trans[0]}d '{trans[3]}' for ${trans[1]:,.0f}"
-                activities.append(activity)
+            cursor.close()
+            return added
             
-            # Recent user registrations
-            cursor.execute('''
-                SELECT first_name, last_name, created_at, user_type
-                FROM users
-                ORDER BY created_at DESC
-                LIMIT %s
-            ''', (limit // 2,))
+        except Error as e:
+            print(f"Error backfilling activity log: {e}")
+            return 0
+    
+    def get_recent_activities(self, limit: int = 20, before_cursor: Tuple = None) -> List[Dict]:
+        """Newest activity_log entries, or the page older than before_cursor (an entry's 'cursor')"""
+        try:
+            cursor = self.connection.cursor()
             
-            users = cursor.fetchall()
-            for user in users:
-                activity = f"New {user[3]} registered: {user[0]} {user[1]}"
-                activities.append(activity)
+            # One backward range read of idx_activity_created; id orders entries within a second
+            query = "SELECT id, activity_type, entity_type, entity_id, user_id, message, created_at FROM activity_log"
+            params = []
+            if before_cursor:
+                created_at, activity_id = before_cursor
+                query += " WHERE created_at <= %s AND (created_at < %s OR id < %s)"
+                params.extend([created_at, created_at, activity_id])
+            query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+            params.append(limit)
             
+            cursor.execute(query, params)
+            results = cursor.fetchall()
             cursor.close()
             
-            # Sort by timestamp and return
-            return activities[:limit]
+            return [{
+                'id': row[0],
+                'activity_type': row[1],
+                'entity_type': row[2],
+                'entity_id': row[3],
+                'user_id': row[4],
+                'message': row[5],
+                'created_at': row[6],
+                'cursor': (row[6], row[0])
+            } for row in results]
             
         except Error as e:
             print(f"Error getting recent activities: {e}")
@@ -380,10 +721,12 @@ class DatabaseManager:
             cursor.execute('''
                 SELECT p.*, 
                        CONCAT(owner.first_name, ' ', owner.last_name) as owner_name,
-                       CONCAT(agent.first_name, ' ', agent.last_name) as agent_name
+                       CONCAT(agent.first_name, ' ', agent.last_name) as agent_name,
+                       v.estimate, v.low, v.high
                 FROM properties p
                 LEFT JOIN users owner ON p.owner_id = owner.id
                 LEFT JOIN users agent ON p.agent_id = agent.id
+                LEFT JOIN property_valuations v ON v.property_id = p.id
                 ORDER BY p.created_at DESC
             ''')
             
@@ -392,30 +735,12 @@ class DatabaseManager:
             
             properties = []
             for row in results:
-                properties.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'property_type': row[3],
-                    'address': row[4],
-                    'city': row[5],
-                    'state': row[6],
-                    'zip_code': row[7],
-                    'price': float(row[8]),
-                    'bedrooms': row[9],
-                    'bathrooms': row[10],
-                    'square_feet': row[11],
-                    'lot_size': float(row[12]) if row[12] else 0,
-                    'year_built': row[13],
-                    'listing_type': row[14],
-                    'owner_id': row[15],
-                    'agent_id': row[16],
-                    'status': row[17],
-                    'created_at': row[18],
-                    'updated_at': row[19],
-                    'owner_name': row[20] or 'N/A',
-                    'agent_name': row[21] or 'N/A'
-                })
+                prop = self.property_columns(row)
+                owner_name, agent_name, estimate, low, high = row[len(self.PROPERTY_COLUMNS):]
+                prop['owner_name'] = owner_name or 'N/A'
+                prop['agent_name'] = agent_name or 'N/A'
+                prop['valuation'] = (float(estimate), float(low), float(high)) if estimate is not None else None
+                properties.append(prop)
             
             return properties
             
@@ -431,42 +756,62 @@ class DatabaseManager:
                 return prop
         return None
     
-    def create_property(self, data: Dict) -> bool:
-        """Create new property"""
+    def create_property(self, data: Dict) -> Optional[int]:
+        """Create new property; returns its id, None on error"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             
             cursor.execute('''
                 INSERT INTO properties (title, description, property_type, address, city, state,
                                       zip_code, price, bedrooms, bathrooms, square_feet, lot_size,
-                                      year_built, listing_type, status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                                      year_built, listing_type, status, closed_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                        IF(%s IN ('sold', 'rented'), CURRENT_TIMESTAMP, NULL))
             ''', (
                 data['title'], data.get('description'), data['property_type'],
                 data['address'], data['city'], data['state'], data['zip_code'],
                 data['price'], data.get('bedrooms'), data.get('bathrooms'),
                 data.get('square_feet'), data.get('lot_size'), data.get('year_built'),
-                data['listing_type'], data.get('status', 'available')
+                data['listing_type'], data.get('status', 'available'), data.get('status', 'available')
             ))
+            # Before log_activity, whose INSERT moves lastrowid to the activity_log row
+            property_id = cursor.lastrowid
+            self.log_activity(cursor, 'property_listed', property_id)
             
+            connection.commit()
             cursor.close()
-            return True
+            # Rents are monthly amounts, so only sale listings are asking prices
+            if data['listing_type'] == 'sale':
+                self.add_price_observation('listing', data['city'], data['property_type'],
+                                           data['price'], data.get('square_feet'))
+            self.listings_version += 1
+            return property_id
             
         except Error as e:
             print(f"Error creating property: {e}")
-            return False
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return None
     
-    def update_property(self, property_id: int, data: Dict) -> bool:
-        """Update existing property"""
+    def update_property(self, property_id: int, data: Dict, actor_id: int = None) -> bool:
+        """Update existing property (actor_id: the admin making the change, for the audit trail)"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            previous = self.audit_row(cursor, 'property', property_id)
             
             cursor.execute('''
                 UPDATE properties SET
                     title = %s, description = %s, property_type = %s, address = %s,
                     city = %s, state = %s, zip_code = %s, price = %s,
                     bedrooms = %s, bathrooms = %s, square_feet = %s, lot_size = %s,
-                    year_built = %s, listing_type = %s, status = %s
+                    year_built = %s, listing_type = %s, status = %s,
+                    closed_at = IF(status IN ('sold', 'rented'), COALESCE(closed_at, CURRENT_TIMESTAMP), NULL)
                 WHERE id = %s
             ''', (
                 data['title'], data.get('description'), data['property_type'],
@@ -475,24 +820,68 @@ class DatabaseManager:
                 data.get('square_feet'), data.get('lot_size'), data.get('year_built'),
                 data['listing_type'], data.get('status', 'available'), property_id
             ))
-            
+            self.log_activity(cursor, 'property_updated', property_id)
+            
+            # An asking price cannot be taken out of a sketch, so its segment is rebuilt on the next read
+            sketched = ('listing_type', 'city', 'property_type', 'price', 'square_feet')
+            segments = set()
+            if previous and any(previous[field] != data.get(field) for field in sketched):
+                if previous['listing_type'] == 'sale':
+                    segments.add((previous['city'], previous['property_type']))
+                if data['listing_type'] == 'sale':
+                    segments.add((data['city'], data['property_type']))
+            for city, property_type in segments:
+                self.mark_price_segment_dirty(cursor, city, property_type)
+            
+            connection.commit()
             cursor.close()
+            
+            if previous:
+                updated = dict(data, status=data.get('status', 'available'))
+                self.record_audit(actor_id, 'update', 'property', property_id, previous,
+                                  {field: updated.get(field) for field in previous})
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error updating property: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
-    def delete_property(self, property_id: int) -> bool:
-        """Delete property"""
+    def delete_property(self, property_id: int, actor_id: int = None) -> bool:
+        """Delete property; the audit entry is written in the same transaction"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            # Images go with the property (ON DELETE CASCADE, which fires no triggers)
+            cursor.execute("SELECT image_path FROM property_images WHERE property_id = %s", (property_id,))
+            image_paths = [row[0] for row in cursor.fetchall()]
+            previous = self.audit_row(cursor, 'property', property_id)
+            
+            self.log_activity(cursor, 'property_deleted', property_id)
             cursor.execute("DELETE FROM properties WHERE id = %s", (property_id,))
+            self.release_image_refs(cursor, image_paths)
+            if previous:
+                if previous['listing_type'] == 'sale':
+                    self.mark_price_segment_dirty(cursor, previous['city'], previous['property_type'])
+                self.insert_audit_entries(cursor, [audit_entry(actor_id, 'delete', 'property', property_id, previous)])
+            
+            connection.commit()
             cursor.close()
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error deleting property: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     # User management methods
@@ -569,8 +958,10 @@ class DatabaseManager:
     
     def create_user_admin(self, data: Dict) -> bool:
         """Create new user (admin function)"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             password_hash = self.hash_password(data['password'])
             
             cursor.execute('''
@@ -580,20 +971,32 @@ class DatabaseManager:
                 data['username'], data['email'], password_hash,
                 data['first_name'], data['last_name'], data.get('phone'), data['user_type']
             ))
+            self.log_activity(cursor, 'user_registered', cursor.lastrowid)
             
+            connection.commit()
             cursor.close()
             return True
             
         except mysql.connector.IntegrityError:
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
         except Error as e:
             print(f"Error creating user: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def update_user_admin(self, user_id: int, data: Dict) -> bool:
         """Update user (admin function)"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             
             if data.get('password'):
                 # Update with new password
@@ -617,45 +1020,105 @@ class DatabaseManager:
                     data['username'], data['email'], data['first_name'],
                     data['last_name'], data.get('phone'), data['user_type'], user_id
                 ))
+            self.log_activity(cursor, 'user_updated', user_id)
             
+            connection.commit()
             cursor.close()
             return True
             
         except mysql.connector.IntegrityError:
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
         except Error as e:
             print(f"Error updating user: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
-    def update_user_status(self, user_id: int, is_active: bool) -> bool:
+    def update_user_status(self, user_id: int, is_active: bool, actor_id: int = None) -> bool:
         """Update user active status"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            previous = self.audit_row(cursor, 'user', user_id, ('is_active',))
             cursor.execute("UPDATE users SET is_active = %s WHERE id = %s", (is_active, user_id))
+            self.log_activity(cursor, 'user_status', user_id)
+            connection.commit()
             cursor.close()
+            
+            if previous:
+                self.record_audit(actor_id, 'update', 'user', user_id, previous, {'is_active': is_active})
             return True
             
         except Error as e:
             print(f"Error updating user status: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
-    def delete_user(self, user_id: int) -> bool:
-        """Delete user and all associated data"""
+    def delete_user(self, user_id: int, actor_id: int = None) -> Optional[List[int]]:
+        """Delete user and all associated data; the audit entry is written in the same transaction.
+
+        Returns the ids of the deleted transactions (for the analytics
+        engine to drop), None on error.
+        """
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            previous = self.audit_row(cursor, 'user', user_id)
+            self.log_activity(cursor, 'user_deleted', user_id)
             
             # Delete in order due to foreign key constraints
+            cursor.execute('''
+                UPDATE properties p JOIN favorites f ON f.property_id = p.id
+                SET p.favorites_count = p.favorites_count - 1, p.updated_at = p.updated_at
+                WHERE f.user_id = %s
+            ''', (user_id,))
             cursor.execute("DELETE FROM favorites WHERE user_id = %s", (user_id,))
+            cursor.execute("SELECT id FROM transactions WHERE buyer_id = %s OR seller_id = %s", (user_id, user_id))
+            transaction_ids = [row[0] for row in cursor.fetchall()]
             cursor.execute("DELETE FROM transactions WHERE buyer_id = %s OR seller_id = %s", (user_id, user_id))
+            
+            # The properties' images go with them (ON DELETE CASCADE, which fires no triggers)
+            cursor.execute('''
+                SELECT i.image_path FROM property_images i JOIN properties p ON i.property_id = p.id
+                WHERE p.owner_id = %s OR p.agent_id = %s
+            ''', (user_id, user_id))
+            image_paths = [row[0] for row in cursor.fetchall()]
+            cursor.execute('''
+                SELECT DISTINCT city, property_type FROM properties
+                WHERE (owner_id = %s OR agent_id = %s) AND listing_type = 'sale'
+            ''', (user_id, user_id))
+            for city, property_type in cursor.fetchall():
+                self.mark_price_segment_dirty(cursor, city, property_type)
             cursor.execute("DELETE FROM properties WHERE owner_id = %s OR agent_id = %s", (user_id, user_id))
+            self.release_image_refs(cursor, image_paths)
             cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+            if previous:
+                self.insert_audit_entries(cursor, [audit_entry(actor_id, 'delete', 'user', user_id, previous)])
             
+            connection.commit()
             cursor.close()
-            return True
+            self.listings_version += 1
+            return transaction_ids
             
         except Error as e:
             print(f"Error deleting user: {e}")
-            return False
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return None
     
     # Transaction management methods
     def get_all_transactions_admin(self, status_filter: str = None, type_filter: str = None) -> List[Dict]:
@@ -725,55 +1188,198 @@ class DatabaseManager:
                 return trans
         return None
     
-    def update_transaction_status(self, transaction_id: int, status: str) -> bool:
+    def update_transaction_status(self, transaction_id: int, status: str, actor_id: int = None) -> bool:
         """Update transaction status"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            cursor.execute('''
+                SELECT t.status, t.transaction_type, t.amount, p.city, p.property_type, p.square_feet
+                FROM transactions t JOIN properties p ON t.property_id = p.id
+                WHERE t.id = %s
+            ''', (transaction_id,))
+            previous = cursor.fetchone()
+            
             cursor.execute("UPDATE transactions SET status = %s WHERE id = %s", (status, transaction_id))
+            
+            # The listing's closing price follows its completed purchase (rents are monthly amounts)
+            cursor.execute('''
+                UPDATE properties p JOIN transactions t ON t.property_id = p.id
+                SET p.sale_price = IF(t.status = 'completed' AND t.transaction_type = 'purchase', t.amount, NULL)
+                WHERE t.id = %s
+            ''', (transaction_id,))
+            self.log_activity(cursor, 'transaction_status', transaction_id)
+            connection.commit()
             cursor.close()
+            
+            if previous:
+                self.record_audit(actor_id, 'update', 'transaction', transaction_id,
+                                  {'status': previous[0]}, {'status': status})
+            
+            # Rents are monthly amounts, so only purchases are sale prices
+            if previous and status == 'completed' and previous[0] != 'completed' and previous[1] == 'purchase':
+                previous_status, transaction_type, amount, city, property_type, square_feet = previous
+                self.add_price_observation('sale', city, property_type, amount, square_feet)
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error updating transaction status: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
-    def cancel_transaction(self, transaction_id: int) -> bool:
+    def cancel_transaction(self, transaction_id: int, actor_id: int = None) -> bool:
         """Cancel transaction and make property available again"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             
             # Get transaction details
-            cursor.execute("SELECT property_id FROM transactions WHERE id = %s", (transaction_id,))
+            cursor.execute("SELECT property_id, status FROM transactions WHERE id = %s", (transaction_id,))
             result = cursor.fetchone()
             
             if result:
-                property_id = result[0]
+                property_id, previous_status = result
                 
                 # Update transaction status
                 cursor.execute("UPDATE transactions SET status = 'cancelled' WHERE id = %s", (transaction_id,))
                 
-                # Make property available again
-                cursor.execute("UPDATE properties SET status = 'available' WHERE id = %s", (property_id,))
+                # Make property available again; it is still on the market since listed_at
+                cursor.execute('''
+                    UPDATE properties SET status = 'available', closed_at = NULL, sale_price = NULL WHERE id = %s
+                ''', (property_id,))
+                self.log_activity(cursor, 'transaction_status', transaction_id)
             
+            connection.commit()
             cursor.close()
+            
+            if result:
+                self.record_audit(actor_id, 'cancel', 'transaction', transaction_id,
+                                  {'status': previous_status}, {'status': 'cancelled'})
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error cancelling transaction: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
-    def delete_transaction(self, transaction_id: int) -> bool:
-        """Delete transaction"""
+    def delete_transaction(self, transaction_id: int, actor_id: int = None) -> bool:
+        """Delete transaction; the audit entry is written in the same transaction"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            previous = self.audit_row(cursor, 'transaction', transaction_id)
+            self.log_activity(cursor, 'transaction_deleted', transaction_id)
             cursor.execute("DELETE FROM transactions WHERE id = %s", (transaction_id,))
+            if previous:
+                self.insert_audit_entries(cursor, [audit_entry(actor_id, 'delete', 'transaction', transaction_id, previous)])
+            
+            connection.commit()
             cursor.close()
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error deleting transaction: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
+    # Audit trail methods
+    def audit_row(self, cursor, entity_type: str, entity_id: int, fields: Tuple = None) -> Optional[Dict]:
+        """Current values of an entity's audited fields (all of AUDIT_FIELDS by default), None if it does not exist"""
+        table, audited = self.AUDIT_FIELDS[entity_type]
+        fields = fields or audited
+        cursor.execute(f"SELECT {', '.join(fields)} FROM {table} WHERE id = %s", (entity_id,))
+        row = cursor.fetchone()
+        return dict(zip(fields, row)) if row else None
+    
+    def record_audit(self, actor_id: Optional[int], action: str, entity_type: str, entity_id: int,
+                     before: Dict = None, after: Dict = None):
+        """Buffer a change that has been made; write_audit_entries diffs it off the calling thread"""
+        self.audit.append((actor_id, action, entity_type, entity_id, before, after, datetime.datetime.now()))
+    
+    def insert_audit_entries(self, cursor, entries: List[Tuple]):
+        """Insert audit_log rows on the caller's cursor (and transaction)"""
+        cursor.executemany(f'''
+            INSERT INTO audit_log ({', '.join(AUDIT_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(AUDIT_COLUMNS))})
+        ''', entries)
+    
+    def write_audit_entries(self, changes: List[Tuple]) -> bool:
+        """Write a batch of buffered changes (audit_entry arguments); updates that changed nothing are dropped"""
+        entries = [entry for entry in (audit_entry(*change) for change in changes) if entry is not None]
+        if not entries:
+            return True
+        try:
+            cursor = self.connection.cursor()
+            self.insert_audit_entries(cursor, entries)
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error writing audit entries: {e}")
+            return False
+    
+    def get_audit_trail(self, entity_type: str = None, entity_id: int = None, actor_id: int = None,
+                        limit: int = 50, before_cursor: Tuple = None) -> List[Dict]:
+        """Audit entries, newest first, for an entity and/or an actor; page with an entry's 'cursor'"""
+        try:
+            # Include changes still waiting in the buffer
+            self.audit.flush()
+            cursor = self.connection.cursor()
+            
+            # Each filter is the prefix of an index ending in created_at (idx_audit_entity, idx_audit_actor)
+            query = "SELECT id, actor_id, action, entity_type, entity_id, changes, created_at FROM audit_log WHERE 1=1"
+            params = []
+            if entity_type:
+                query += " AND entity_type = %s"
+                params.append(entity_type)
+                if entity_id is not None:
+                    query += " AND entity_id = %s"
+                    params.append(entity_id)
+            if actor_id is not None:
+                query += " AND actor_id = %s"
+                params.append(actor_id)
+            if before_cursor:
+                created_at, entry_id = before_cursor
+                query += " AND created_at <= %s AND (created_at < %s OR id < %s)"
+                params.extend([created_at, created_at, entry_id])
+            query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+            params.append(limit)
+            
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+            cursor.close()
+            
+            return [{
+                'id': row[0],
+                'actor_id': row[1],
+                'action': row[2],
+                'entity_type': row[3],
+                'entity_id': row[4],
+                'changes': json.loads(row[5]) if isinstance(row[5], (str, bytes)) else row[5],
+                'created_at': row[6],
+                'cursor': (row[6], row[0])
+            } for row in results]
+            
+        except Error as e:
+            print(f"Error getting audit trail: {e}")
+            return []
+    
     # Analytics methods
     def get_analytics_data(self) -> Dict:
         """Get comprehensive analytics data"""
@@ -835,12 +1441,32 @@ class DatabaseManager:
             ''')
             analytics['new_users_month'] = cursor.fetchone()[0]
             
-            # Calculate user growth (simplified)
-            analytics['user_growth'] = 5.2  # Placeholder
-            
-            # Market analytics
-            analytics['avg_days_market'] = 45  # Placeholder
-            analytics['conversion_rate'] = 12.5  # Placeholder
+            # Signups this period vs. the period before (range scan on idx_users_created)
+            now = datetime.datetime.now()
+            period = datetime.timedelta(days=Config.ANALYTICS_PERIOD_DAYS)
+            cursor.execute('''
+                SELECT COALESCE(SUM(created_at >= %s), 0), COUNT(*) FROM users WHERE created_at >= %s
+            ''', (now - period, now - 2 * period))
+            current_signups, both_periods = cursor.fetchone()
+            previous_signups = both_periods - current_signups
+            if previous_signups:
+                analytics['user_growth'] = (current_signups - previous_signups) / previous_signups * 100
+            else:
+                analytics['user_growth'] = 100.0 if current_signups else 0.0
+            
+            # Market analytics (closed listings; covered by idx_properties_dom_type)
+            cursor.execute("SELECT AVG(days_on_market) FROM properties WHERE days_on_market IS NOT NULL")
+            avg_days = cursor.fetchone()[0]
+            analytics['avg_days_market'] = round(float(avg_days)) if avg_days is not None else 0
+            
+            # View -> favorite -> transaction funnel this period, from the daily rollups
+            funnel = self.get_event_funnel((now - period).date(), now.date() + datetime.timedelta(days=1))
+            views = funnel.get('view', {}).get('events', 0)
+            favorites = funnel.get('favorite', {}).get('events', 0)
+            transactions = funnel.get('transaction', {}).get('events', 0)
+            analytics['conversion_rate'] = transactions / views * 100 if views else 0.0
+            analytics['favorite_rate'] = favorites / views * 100 if views else 0.0
+            analytics['favorite_conversion_rate'] = transactions / favorites * 100 if favorites else 0.0
             
             cursor.close()
             return analytics
@@ -849,32 +1475,616 @@ class DatabaseManager:
             print(f"Error getting analytics data: {e}")
             return {}
     
-    def get_top_properties(self) -> List[Dict]:
-        """Get top performing properties"""
+    def get_days_on_market_stats(self, group_by: str = 'property_type') -> List[Dict]:
+        """Days on market of closed listings per property type or city"""
+        if group_by not in ('property_type', 'city'):
+            raise ValueError(f"Cannot group days on market by {group_by}")
+        
         try:
             cursor = self.connection.cursor()
             
+            # Index-only scan of (group_by, days_on_market), already grouped in index order
+            cursor.execute(f'''
+                SELECT {group_by}, COUNT(*), AVG(days_on_market), MIN(days_on_market), MAX(days_on_market)
+                FROM properties
+                WHERE days_on_market IS NOT NULL
+                GROUP BY {group_by}
+                ORDER BY {group_by}
+            ''')
+            
+            results = cursor.fetchall()
+            cursor.close()
+            
+            return [{
+                group_by: row[0],
+                'closed_listings': row[1],
+                'avg_days': float(row[2]),
+                'min_days': row[3],
+                'max_days': row[4]
+            } for row in results]
+            
+        except Error as e:
+            print(f"Error getting days on market: {e}")
+            return []
+    
+    def add_price_observation(self, kind: str, city: str, property_type: str, price, square_feet) -> bool:
+        """Fold one price per square foot ('listing' sale asking price or 'sale' price) into its segment's sketch"""
+        if price is None or not square_feet or square_feet <= 0:
+            return False
+        
+        connection = self.connection
+        try:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            # The row lock serializes concurrent updates of one segment's sketch
             cursor.execute('''
-                SELECT p.*, t.amount as sale_price
-                FROM properties p
-                JOIN transactions t ON p.id = t.property_id
-                WHERE t.status = 'completed'
-                ORDER BY t.amount DESC
-                LIMIT 20
+                SELECT sketch FROM price_sketches
+                WHERE kind = %s AND city = %s AND property_type = %s
+                FOR UPDATE
+            ''', (kind, city, property_type))
+            row = cursor.fetchone()
+            
+            sketch = KLLSketch.from_bytes(row[0]) if row else KLLSketch(Config.PRICE_SKETCH_K)
+            sketch.update(float(price) / square_feet)
+            cursor.execute('''
+                INSERT INTO price_sketches (kind, city, property_type, observations, sketch)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE observations = VALUES(observations), sketch = VALUES(sketch)
+            ''', (kind, city, property_type, sketch.count, sketch.to_bytes()))
+            
+            connection.commit()
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error updating price sketch: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
+    
+    def rebuild_price_sketches(self) -> bool:
+        """Recompute every price per square foot sketch from current sale listings and completed purchases"""
+        sketches = {}
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                SELECT 'listing', city, property_type, price / square_feet
+                FROM properties WHERE listing_type = 'sale' AND square_feet > 0
+                UNION ALL
+                SELECT 'sale', p.city, p.property_type, t.amount / p.square_feet
+                FROM transactions t JOIN properties p ON t.property_id = p.id
+                WHERE t.status = 'completed' AND t.transaction_type = 'purchase' AND p.square_feet > 0
             ''')
+            for kind, city, property_type, price_per_sqft in cursor:
+                segment = (kind, city, property_type)
+                if segment not in sketches:
+                    sketches[segment] = KLLSketch(Config.PRICE_SKETCH_K)
+                sketches[segment].update(float(price_per_sqft))
+            
+            connection = self.connection
+            connection.start_transaction()
+            cursor.execute("DELETE FROM price_sketches")
+            if sketches:
+                cursor.executemany('''
+                    INSERT INTO price_sketches (kind, city, property_type, observations, sketch)
+                    VALUES (%s, %s, %s, %s, %s)
+                ''', [segment + (sketch.count, sketch.to_bytes()) for segment, sketch in sketches.items()])
+            connection.commit()
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error rebuilding price sketches: {e}")
+            try:
+                self.connection.rollback()
+            except Error:
+                pass
+            return False
+    
+    def mark_price_segment_dirty(self, cursor, city: str, property_type: str):
+        """Flag a segment's listing sketch for rebuild_dirty_price_sketches (inside the caller's transaction)"""
+        # An empty placeholder row keeps the flag for a segment that has no sketch yet
+        cursor.execute('''
+            INSERT INTO price_sketches (kind, city, property_type, observations, sketch, dirty)
+            VALUES ('listing', %s, %s, 0, %s, TRUE)
+            ON DUPLICATE KEY UPDATE dirty = TRUE
+        ''', (city, property_type, KLLSketch(Config.PRICE_SKETCH_K).to_bytes()))
+    
+    def rebuild_dirty_price_sketches(self) -> bool:
+        """Recompute the listing sketches of segments whose sale listings were edited or deleted"""
+        connection = self.connection
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT city, property_type FROM price_sketches WHERE kind = 'listing' AND dirty")
+            
+            for city, property_type in cursor.fetchall():
+                connection.start_transaction()
+                # Locked before reading the listings, so an edit committed meanwhile marks the segment again
+                cursor.execute('''
+                    SELECT dirty FROM price_sketches
+                    WHERE kind = 'listing' AND city = %s AND property_type = %s
+                    FOR UPDATE
+                ''', (city, property_type))
+                row = cursor.fetchone()
+                if row and row[0]:
+                    sketch = KLLSketch(Config.PRICE_SKETCH_K)
+                    cursor.execute('''
+                        SELECT price / square_feet FROM properties
+                        WHERE listing_type = 'sale' AND square_feet > 0 AND city = %s AND property_type = %s
+                    ''', (city, property_type))
+                    for (price_per_sqft,) in cursor:
+                        sketch.update(float(price_per_sqft))
+                    
+                    if sketch.count:
+                        cursor.execute('''
+                            UPDATE price_sketches SET observations = %s, sketch = %s, dirty = FALSE
+                            WHERE kind = 'listing' AND city = %s AND property_type = %s
+                        ''', (sketch.count, sketch.to_bytes(), city, property_type))
+                    else:
+                        cursor.execute('''
+                            DELETE FROM price_sketches
+                            WHERE kind = 'listing' AND city = %s AND property_type = %s
+                        ''', (city, property_type))
+                connection.commit()
+            
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error rebuilding dirty price sketches: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
+    
+    def get_price_per_sqft_percentiles(self, group_by: str = None, kind: str = 'listing',
+                                       quantiles: Tuple[float, ...] = (0.5, 0.9),
+                                       city: str = None, property_type: str = None) -> List[Dict]:
+        """Approximate price per square foot percentiles per city or property type (or overall).
+
+        Answered from the stored segment sketches merged per group, so the
+        cost depends on the number of segments, not of listings or sales.
+        Segments whose sale listings were edited or deleted are rebuilt
+        first, so 'listing' covers the current asking prices only.
+        Percentiles are within +/- 'rank_error' in rank (about 1.3% at the
+        default PRICE_SKETCH_K); 'min' and 'max' are exact.
+        """
+        if group_by not in (None, 'property_type', 'city'):
+            raise ValueError(f"Cannot group price percentiles by {group_by}")
+        
+        if kind == 'listing':
+            self.rebuild_dirty_price_sketches()
+        
+        conditions = ["kind = %s", "observations > 0"]
+        params = [kind]
+        for column, value in (('city', city), ('property_type', property_type)):
+            if value is not None:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f'''
+                SELECT city, property_type, sketch FROM price_sketches
+                WHERE {" AND ".join(conditions)}
+            ''', params)
+            
+            results = cursor.fetchall()
+            cursor.close()
+            
+            groups = {}
+            for segment_city, segment_type, data in results:
+                group = {'city': segment_city, 'property_type': segment_type}.get(group_by)
+                sketch = KLLSketch.from_bytes(data)
+                if group in groups:
+                    groups[group].merge(sketch)
+                else:
+                    groups[group] = sketch
+            
+            rows = []
+            for group in sorted(groups, key=lambda g: (g is None, g)):
+                sketch = groups[group]
+                row = {
+                    'observations': sketch.count,
+                    'quantiles': {q: sketch.quantile(q) for q in quantiles},
+                    'min': sketch.min,
+                    'max': sketch.max,
+                    'rank_error': normalized_rank_error(sketch.k)
+                }
+                if group_by:
+                    row[group_by] = group
+                rows.append(row)
+            return rows
+            
+        except Error as e:
+            print(f"Error getting price percentiles: {e}")
+            return []
+    
+    def record_event(self, event_type: str, user_id: int = None, property_id: int = None):
+        """Buffer a user activity event ('view', 'favorite' or 'transaction')"""
+        self.events.record(event_type, user_id, property_id)
+    
+    def record_events(self, events: List[Tuple]) -> bool:
+        """Write a batch of (event_type, user_id, property_id, created_at) events, all or nothing"""
+        connection = self.connection
+        try:
+            cursor = connection.cursor()
+            # One transaction: a failed batch is retried whole, so a partial write would double-count
+            connection.start_transaction()
+            cursor.executemany('''
+                INSERT INTO events (event_type, user_id, property_id, created_at)
+                VALUES (%s, %s, %s, %s)
+            ''', events)
+            
+            # One counter update per viewed listing, not per view
+            views = Counter(property_id for event_type, _, property_id, _ in events
+                            if event_type == 'view' and property_id is not None)
+            if views:
+                cursor.executemany(
+                    "UPDATE properties SET view_count = view_count + %s, updated_at = updated_at WHERE id = %s",
+                    [(count, property_id) for property_id, count in views.items()]
+                )
+            
+            connection.commit()
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error recording events: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
+    
+    def rollup_events(self) -> bool:
+        """Aggregate raw events into event_daily, re-rolling the last rolled-up days.
+
+        Events carry the time they were recorded, and a batch that failed to
+        write is retried later, so rows can land in days already rolled up.
+        The last EVENT_ROLLUP_LOOKBACK_DAYS days before the newest one are
+        recomputed each time (idempotently) to pick those up.
+        """
+        try:
+            self.events.flush()
+            cursor = self.connection.cursor()
+            
+            cursor.execute("SELECT MAX(day) FROM event_daily")
+            last_day = cursor.fetchone()[0]
+            if last_day is None:
+                since = datetime.date(1970, 1, 1)
+            else:
+                since = last_day - datetime.timedelta(days=Config.EVENT_ROLLUP_LOOKBACK_DAYS)
+            
+            # Only events since then are scanned (range on idx_events_created)
+            cursor.execute('''
+                INSERT INTO event_daily (day, event_type, events, users, properties)
+                SELECT DATE(created_at) AS event_day, event_type,
+                    COUNT(*), COUNT(DISTINCT user_id), COUNT(DISTINCT property_id)
+                FROM events
+                WHERE created_at >= %s
+                GROUP BY event_day, event_type
+                ON DUPLICATE KEY UPDATE
+                    events = VALUES(events), users = VALUES(users), properties = VALUES(properties)
+            ''', (since,))
+            
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error rolling up events: {e}")
+            return False
+    
+    def get_event_funnel(self, start: datetime.date, end: datetime.date) -> Dict:
+        """Event totals per type over [start, end) from the daily rollups.
+
+        'users' and 'properties' sum the daily distinct counts, so someone
+        active on several days is counted once per day.
+        """
+        self.rollup_events()
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                SELECT event_type, SUM(events), SUM(users), SUM(properties)
+                FROM event_daily
+                WHERE day >= %s AND day < %s
+                GROUP BY event_type
+            ''', (start, end))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            
+            return {
+                event_type: {'events': int(events), 'users': int(users), 'properties': int(properties)}
+                for event_type, events, users, properties in results
+            }
+            
+        except Error as e:
+            print(f"Error getting event funnel: {e}")
+            return {}
+    
+    @staticmethod
+    def month_starts(start: datetime.date, end: datetime.date) -> List[datetime.date]:
+        """First day of every month from start up to (not including) end"""
+        months = []
+        month = start.replace(day=1)
+        while month < end:
+            months.append(month)
+            month = (month + datetime.timedelta(days=32)).replace(day=1)
+        return months
+    
+    def get_monthly_revenue(self, start: datetime.date, end: datetime.date) -> List[Dict]:
+        """Completed transaction revenue per month in [start, end), split by transaction type"""
+        try:
+            cursor = self.connection.cursor()
+            
+            # Range scan on idx_transactions_status_date; one row per (month, type)
+            cursor.execute('''
+                SELECT YEAR(transaction_date), MONTH(transaction_date), transaction_type,
+                    SUM(amount), COUNT(*)
+                FROM transactions
+                WHERE status = 'completed' AND transaction_date >= %s AND transaction_date < %s
+                GROUP BY YEAR(transaction_date), MONTH(transaction_date), transaction_type
+            ''', (start, end))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            
+            series = {month: {'month': month, 'purchase': 0.0, 'rent': 0.0, 'transactions': 0}
+                      for month in self.month_starts(start, end)}
+            for year, month, transaction_type, revenue, count in results:
+                point = series[datetime.date(year, month, 1)]
+                point[transaction_type] = float(revenue)
+                point['transactions'] += count
+            
+            return list(series.values())
+            
+        except Error as e:
+            print(f"Error getting monthly revenue: {e}")
+            return []
+    
+    def get_monthly_inventory(self, start: datetime.date, end: datetime.date) -> List[Dict]:
+        """Listings by status at the end of each month in [start, end).
+
+        Each listing counts once per month-end, by its latest pending or
+        completed transaction dated on or before it (available if none).
+        A transaction is in effect from its month until the month of the
+        listing's next one; everything before start is folded into an
+        opening bucket so the queries stay a handful of grouped rows.
+        """
+        try:
+            cursor = self.connection.cursor()
+            
+            cursor.execute('''
+                SELECT IF(created_at < %s, 0, YEAR(created_at) * 12 + MONTH(created_at) - 1) AS bucket,
+                    COUNT(*)
+                FROM properties
+                WHERE created_at < %s
+                GROUP BY bucket
+            ''', (start, end))
+            listed = dict(cursor.fetchall())
+            
+            # Cancelled transactions never took effect; NULL next_bucket means still in effect
+            cursor.execute('''
+                SELECT IF(transaction_date < %s, 0, YEAR(transaction_date) * 12 + MONTH(transaction_date) - 1)
+                        AS first_bucket,
+                    IF(next_date < %s, 0, YEAR(next_date) * 12 + MONTH(next_date) - 1) AS next_bucket,
+                    status, transaction_type, COUNT(*)
+                FROM (
+                    SELECT transaction_date, status, transaction_type,
+                        LEAD(transaction_date) OVER (PARTITION BY property_id ORDER BY transaction_date, id) AS next_date
+                    FROM transactions
+                    WHERE status IN ('pending', 'completed') AND transaction_date < %s
+                ) t
+                GROUP BY first_bucket, next_bucket, status, transaction_type
+            ''', (start, start, end))
+            spans = []
+            for first_bucket, next_bucket, status, transaction_type, count in cursor.fetchall():
+                if status == 'pending':
+                    column = 'pending'
+                else:
+                    column = 'sold' if transaction_type == 'purchase' else 'rented'
+                spans.append((first_bucket, next_bucket, column, count))
+            cursor.close()
+            
+            total_listed = listed.get(0, 0)
+            inventory = []
+            for month in self.month_starts(start, end):
+                bucket = month.year * 12 + month.month - 1
+                total_listed += listed.get(bucket, 0)
+                counts = {'pending': 0, 'sold': 0, 'rented': 0}
+                for first_bucket, next_bucket, column, count in spans:
+                    if first_bucket <= bucket and (next_bucket is None or bucket < next_bucket):
+                        counts[column] += count
+                inventory.append({
+                    'month': month,
+                    'available': max(0, total_listed - sum(counts.values())),
+                    **counts
+                })
+            
+            return inventory
+            
+        except Error as e:
+            print(f"Error getting monthly inventory: {e}")
+            return []
+    
+    def get_transaction_facts(self, after_id: int = 0, limit: int = 50000) -> List[Tuple]:
+        """One page of transactions joined to property attributes, in id order (analytics_engine.FACT_COLUMNS)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                SELECT t.id, t.transaction_date, t.amount, t.transaction_type, t.status,
+                    p.property_type, p.listing_type, p.city, p.state, p.price, p.square_feet
+                FROM transactions t
+                LEFT JOIN properties p ON t.property_id = p.id
+                WHERE t.id > %s
+                ORDER BY t.id
+                LIMIT %s
+            ''', (after_id, limit))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            return results
+            
+        except Error as e:
+            print(f"Error getting transaction facts: {e}")
+            return []
+    
+    def get_comps_rows(self, after_id: int = 0, limit: int = 50000,
+                       updated_since: datetime.datetime = None) -> List[Tuple]:
+        """One page of comps features in id order (comps_engine.COMPS_COLUMNS), optionally only rows updated since a time"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f'''
+                SELECT id, listing_type, city, zip_code, status, bedrooms, bathrooms, square_feet,
+                    year_built, COALESCE(sale_price, price), closed_at, updated_at
+                FROM properties
+                WHERE id > %s {"AND updated_at >= %s" if updated_since else ""}
+                ORDER BY id
+                LIMIT %s
+            ''', (after_id, updated_since, limit) if updated_since else (after_id, limit))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            return results
+            
+        except Error as e:
+            print(f"Error getting comps rows: {e}")
+            return []
+    
+    def get_avm_training_rows(self, after_id: int = 0, limit: int = 50000) -> List[Tuple]:
+        """One page of completed transactions with their property's attributes, in id order (avm.AVM_COLUMNS)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                SELECT t.id, IF(t.transaction_type = 'purchase', 'sale', 'rent'), t.amount,
+                    p.property_type, p.city, p.bedrooms, p.bathrooms, p.square_feet, p.lot_size,
+                    p.year_built, t.transaction_date
+                FROM transactions t
+                JOIN properties p ON t.property_id = p.id
+                WHERE t.id > %s AND t.status = 'completed'
+                ORDER BY t.id
+                LIMIT %s
+            ''', (after_id, limit))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            return results
+            
+        except Error as e:
+            print(f"Error getting valuation training rows: {e}")
+            return []
+    
+    def get_avm_scoring_rows(self, after_id: int = 0, limit: int = 50000) -> List[Tuple]:
+        """One page of available listings to value, in id order (avm.AVM_COLUMNS)"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                SELECT id, listing_type, price, property_type, city, bedrooms, bathrooms,
+                    square_feet, lot_size, year_built, NULL
+                FROM properties
+                WHERE id > %s AND status = 'available'
+                ORDER BY id
+                LIMIT %s
+            ''', (after_id, limit))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            return results
+            
+        except Error as e:
+            print(f"Error getting valuation scoring rows: {e}")
+            return []
+    
+    def save_valuations(self, valuations: List[Tuple]) -> bool:
+        """Store (property_id, estimate, low, high) rows, replacing earlier valuations"""
+        if not valuations:
+            return True
+        try:
+            cursor = self.connection.cursor()
+            
+            # executemany sends an INSERT like this as multi-row statements
+            cursor.executemany('''
+                INSERT INTO property_valuations (property_id, estimate, low, high)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE estimate = VALUES(estimate), low = VALUES(low), high = VALUES(high)
+            ''', valuations)
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error saving valuations: {e}")
+            return False
+    
+    def get_properties_by_ids(self, property_ids: List[int]) -> List[Dict]:
+        """Listings with the given ids, in the order given; ids that no longer exist are skipped"""
+        if not property_ids:
+            return []
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f'''
+                {self.PROPERTY_SELECT}
+                WHERE p.id IN ({", ".join(["%s"] * len(property_ids))})
+            ''', list(property_ids))
+            
+            results = cursor.fetchall()
+            cursor.close()
+            
+            properties = {row[0]: self.property_from_row(row) for row in results}
+            return [properties[property_id] for property_id in property_ids if property_id in properties]
+            
+        except Error as e:
+            print(f"Error getting properties by id: {e}")
+            return []
+    
+    def get_top_properties(self, metric: str = 'sale_price', limit: int = 10, city: str = None,
+                           property_type: str = None, listing_type: str = None,
+                           start: datetime.date = None, end: datetime.date = None,
+                           ascending: bool = None) -> List[Dict]:
+        """Top `limit` listings by a RANKING_METRICS metric within a segment.
+
+        Metrics are precomputed columns on properties, so this is an ORDER BY
+        on the metric's index that stops after `limit` matching rows; cost
+        does not grow with transaction or event history. The period
+        [start, end) applies to closed_at for closing metrics and listed_at
+        otherwise. Each result carries its ranked value as 'metric_value'.
+        """
+        if metric not in self.RANKING_METRICS:
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        column, date_column, order = self.RANKING_METRICS[metric]
+        if ascending is not None:
+            order = 'ASC' if ascending else 'DESC'
+        
+        conditions = [f"{column} IS NOT NULL"]
+        params = []
+        for condition, value in (("p.city = %s", city), ("p.property_type = %s", property_type),
+                                 ("p.listing_type = %s", listing_type), (f"{date_column} >= %s", start),
+                                 (f"{date_column} < %s", end)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute(f'''
+                {self.PROPERTY_SELECT}
+                WHERE {" AND ".join(conditions)}
+                ORDER BY {column} {order}, p.id {order}
+                LIMIT %s
+            ''', params + [limit])
             
             results = cursor.fetchall()
             cursor.close()
             
             properties = []
             for row in results:
-                properties.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'property_type': row[3],
-                    'price': float(row[20]),  # sale_price from transaction
-                    'days_on_market': 30  # Placeholder
-                })
+                prop = self.property_from_row(row)
+                prop['metric_value'] = prop[column.split('.')[1]]
+                properties.append(prop)
             
             return properties
             
@@ -882,13 +2092,37 @@ class DatabaseManager:
             print(f"Error getting top properties: {e}")
             return []
     
+    def rebuild_property_metrics(self) -> bool:
+        """Recompute the ranking counters and sale prices from favorites, events and transactions"""
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute('''
+                UPDATE properties p SET
+                    updated_at = p.updated_at,
+                    favorites_count = (SELECT COUNT(*) FROM favorites f WHERE f.property_id = p.id),
+                    view_count = (SELECT COUNT(*) FROM events e WHERE e.property_id = p.id AND e.event_type = 'view'),
+                    sale_price = (
+                        SELECT t.amount FROM transactions t
+                        WHERE t.property_id = p.id AND t.status = 'completed' AND t.transaction_type = 'purchase'
+                        ORDER BY t.transaction_date DESC LIMIT 1
+                    )
+            ''')
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error rebuilding property metrics: {e}")
+            return False
+    
     # Existing methods (keep all the original methods)
     def create_user(self, username: str, email: str, password: str, 
                    first_name: str, last_name: str, phone: str = None, 
                    user_type: str = 'buyer') -> bool:
         """Create a new user"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             password_hash = self.hash_password(password)
             
             cursor.execute('''
@@ -896,14 +2130,24 @@ class DatabaseManager:
                                  last_name, phone, user_type)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
             ''', (username, email, password_hash, first_name, last_name, phone, user_type))
+            self.log_activity(cursor, 'user_registered', cursor.lastrowid)
             
+            connection.commit()
             cursor.close()
             return True
             
         except mysql.connector.IntegrityError:
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
         except Error as e:
             print(f"Error creating user: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def authenticate_user(self, username: str, password: str) -> Optional[Dict]:
@@ -941,12 +2185,7 @@ class DatabaseManager:
         try:
             cursor = self.connection.cursor()
             
-            query = '''
-                SELECT p.*, u.first_name, u.last_name, u.phone, u.email
-                FROM properties p
-                LEFT JOIN users u ON p.agent_id = u.id
-                WHERE p.status = 'available'
-            '''
+            query = self.PROPERTY_SELECT + " WHERE p.status = 'available'"
             params = []
             
             if listing_type:
@@ -976,40 +2215,36 @@ class DatabaseManager:
             results = cursor.fetchall()
             cursor.close()
             
-            properties = []
-            for row in results:
-                properties.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'description': row[2],
-                    'property_type': row[3],
-                    'address': row[4],
-                    'city': row[5],
-                    'state': row[6],
-                    'zip_code': row[7],
-                    'price': float(row[8]),
-                    'bedrooms': row[9],
-                    'bathrooms': row[10],
-                    'square_feet': row[11],
-                    'lot_size': float(row[12]) if row[12] else 0,
-                    'year_built': row[13],
-                    'listing_type': row[14],
-                    'owner_id': row[15],
-                    'agent_id': row[16],
-                    'status': row[17],
-                    'created_at': row[18],
-                    'updated_at': row[19],
-                    'agent_name': f"{row[20]} {row[21]}" if row[20] else "N/A",
-                    'agent_phone': row[22] or "N/A",
-                    'agent_email': row[23] or "N/A"
-                })
-            
-            return properties
+            return [self.property_from_row(row) for row in results]
             
         except Error as e:
             print(f"Error getting properties: {e}")
             return []
     
+    def property_columns(self, row) -> Dict:
+        """Dict of the leading p.* columns of a row, DECIMALs as floats"""
+        prop = dict(zip(self.PROPERTY_COLUMNS, row))
+        prop['price'] = float(prop['price'])
+        prop['lot_size'] = float(prop['lot_size']) if prop['lot_size'] else 0
+        for column in ('sale_price', 'price_per_sqft'):
+            if prop[column] is not None:
+                prop[column] = float(prop[column])
+        return prop
+    
+    def property_from_row(self, row) -> Dict:
+        """Listing dict from a PROPERTY_SELECT row"""
+        prop = self.property_columns(row)
+        first_name, last_name, phone, email, primary_image, primary_blurhash, primary_color = row[len(self.PROPERTY_COLUMNS):]
+        prop.update({
+            'agent_name': f"{first_name} {last_name}" if first_name else "N/A",
+            'agent_phone': phone or "N/A",
+            'agent_email': email or "N/A",
+            'primary_image': primary_image,
+            'primary_blurhash': primary_blurhash,
+            'primary_color': primary_color
+        })
+        return prop
+    
     def get_property_by_id(self, property_id: int) -> Optional[Dict]:
         """Get a specific property by ID"""
         properties = self.get_properties()
@@ -1019,10 +2254,18 @@ class DatabaseManager:
         return None
     
     # Image management methods
-    def add_property_image(self, property_id: int, image_path: str, is_primary: bool = False) -> bool:
+    def image_metadata_values(self, metadata: Optional[Dict]) -> Tuple:
+        """IMAGE_METADATA_FIELDS values of a metadata dict (NULLs when unknown)"""
+        metadata = metadata or {}
+        return tuple(metadata.get(field) for field in self.IMAGE_METADATA_FIELDS)
+    
+    def add_property_image(self, property_id: int, image_path: str, is_primary: bool = False,
+                           metadata: Dict = None) -> bool:
         """Add image to property"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             
             # If this is primary, unset other primary images
             if is_primary:
@@ -1032,24 +2275,218 @@ class DatabaseManager:
                 ''', (property_id,))
             
             cursor.execute('''
-                INSERT INTO property_images (property_id, image_path, is_primary)
-                VALUES (%s, %s, %s)
-            ''', (property_id, image_path, is_primary))
-            
+                INSERT INTO property_images (property_id, image_path, is_primary,
+                    width, height, byte_size, content_hash, dominant_color, blurhash)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ''', (property_id, image_path, is_primary) + self.image_metadata_values(metadata))
+            self.acquire_image_refs(cursor, [image_path])
+            self.log_activity(cursor, 'images_added', property_id)
+            
+            connection.commit()
             cursor.close()
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error adding property image: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
+    
+    def add_property_images(self, property_id: int, image_paths: List[str], first_is_primary: bool = False,
+                            metadata: List[Optional[Dict]] = None) -> bool:
+        """Add several images to a property with one batched INSERT (metadata aligned with image_paths)"""
+        if not image_paths:
+            return True
+        
+        connection = self.connection
+        try:
+            cursor = connection.cursor()
+            connection.start_transaction()
+            
+            # If the first image becomes primary, unset other primary images
+            if first_is_primary:
+                cursor.execute('''
+                    UPDATE property_images SET is_primary = FALSE 
+                    WHERE property_id = %s
+                ''', (property_id,))
+            
+            # executemany sends a single multi-row INSERT
+            metadata = metadata or [None] * len(image_paths)
+            cursor.executemany('''
+                INSERT INTO property_images (property_id, image_path, is_primary,
+                    width, height, byte_size, content_hash, dominant_color, blurhash)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ''', [
+                (property_id, image_path, first_is_primary and i == 0) + self.image_metadata_values(metadata[i])
+                for i, image_path in enumerate(image_paths)
+            ])
+            self.acquire_image_refs(cursor, image_paths)
+            self.log_activity(cursor, 'images_added', property_id)
+            
+            connection.commit()
+            cursor.close()
+            self.listings_version += 1
+            return True
+            
+        except Error as e:
+            print(f"Error adding property images: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
+    
+    def acquire_image_refs(self, cursor, image_paths: List[str]):
+        """Count one more reference to each stored file (per occurrence)"""
+        if image_paths:
+            cursor.executemany('''
+                INSERT INTO image_files (image_path, ref_count) VALUES (%s, 1)
+                ON DUPLICATE KEY UPDATE ref_count = ref_count + 1
+            ''', [(image_path,) for image_path in image_paths])
+    
+    def release_image_refs(self, cursor, image_paths: List[str]):
+        """Drop one reference to each stored file (per occurrence)"""
+        if image_paths:
+            cursor.executemany('''
+                UPDATE image_files SET ref_count = GREATEST(ref_count - 1, 0)
+                WHERE image_path = %s
+            ''', [(image_path,) for image_path in image_paths])
+    
+    def rebuild_image_ref_counts(self) -> int:
+        """Recompute image_files from property_images; returns the number of stored files"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM image_files")
+            cursor.execute('''
+                INSERT INTO image_files (image_path, ref_count)
+                SELECT image_path, COUNT(*) FROM property_images
+                GROUP BY image_path
+            ''')
+            return cursor.rowcount
+        finally:
+            cursor.close()
+    
+    def delete_unreferenced_image_files(self) -> int:
+        """Forget stored files nothing references any more; returns the number removed"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("DELETE FROM image_files WHERE ref_count <= 0")
+            return cursor.rowcount
+        finally:
+            cursor.close()
+    
+    def rename_image_path(self, old_path: str, new_path: str) -> int:
+        """Point every reference to old_path at new_path (storage migration); raises on error"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(
+                "UPDATE property_images SET image_path = %s WHERE image_path = %s",
+                (new_path, old_path)
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
+    
+    def get_images_missing_metadata(self, after_image_path: str = "", limit: int = 1000) -> List[str]:
+        """One page of distinct image paths without recorded metadata, in order; raises on error"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute('''
+                SELECT DISTINCT image_path FROM property_images
+                WHERE content_hash IS NULL AND image_path > %s
+                ORDER BY image_path
+                LIMIT %s
+            ''', (after_image_path, limit))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    
+    def update_image_metadata(self, image_path: str, metadata: Dict) -> bool:
+        """Record metadata on every row referencing a stored file"""
+        try:
+            cursor = self.connection.cursor()
+            assignments = ", ".join(f"{field} = %s" for field in self.IMAGE_METADATA_FIELDS)
+            cursor.execute(
+                f"UPDATE property_images SET {assignments} WHERE image_path = %s",
+                self.image_metadata_values(metadata) + (image_path,)
+            )
+            cursor.close()
+            return True
+            
+        except Error as e:
+            print(f"Error updating image metadata: {e}")
             return False
     
+    def get_image_storage_report(self) -> Dict:
+        """Store-wide image statistics from recorded metadata (no file access)"""
+        try:
+            cursor = self.connection.cursor()
+            
+            cursor.execute('''
+                SELECT COUNT(*), COUNT(DISTINCT image_path), COALESCE(SUM(content_hash IS NULL), 0)
+                FROM property_images
+            ''')
+            references, stored_files, missing_metadata = cursor.fetchone()
+            
+            # Shared (deduplicated) files are counted once
+            cursor.execute('''
+                SELECT COALESCE(SUM(byte_size), 0), MAX(byte_size), AVG(width), AVG(height),
+                    SUM(width * height >= 12000000)
+                FROM (
+                    SELECT image_path, MAX(byte_size) AS byte_size, MAX(width) AS width, MAX(height) AS height
+                    FROM property_images
+                    WHERE content_hash IS NOT NULL
+                    GROUP BY image_path
+                ) AS files
+            ''')
+            total_bytes, largest_bytes, avg_width, avg_height, large_files = cursor.fetchone()
+            cursor.close()
+            
+            return {
+                'references': references,
+                'stored_files': stored_files,
+                'missing_metadata': int(missing_metadata),
+                'total_bytes': int(total_bytes),
+                'largest_bytes': int(largest_bytes or 0),
+                'avg_width': float(avg_width or 0),
+                'avg_height': float(avg_height or 0),
+                'large_files': int(large_files or 0)
+            }
+            
+        except Error as e:
+            print(f"Error getting image storage report: {e}")
+            return {}
+    
+    def get_image_references(self, after_id: int = 0, limit: int = 10000) -> List[Tuple[int, int, str]]:
+        """One page of (id, property_id, image_path) rows ordered by id, for store maintenance.
+
+        Unlike the other getters this raises on database errors: a garbage
+        collector must never mistake a failed query for "no references".
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute('''
+                SELECT id, property_id, image_path
+                FROM property_images
+                WHERE id > %s
+                ORDER BY id
+                LIMIT %s
+            ''', (after_id, limit))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
     def get_property_images(self, property_id: int) -> List[Dict]:
         """Get all images for a property"""
         try:
             cursor = self.connection.cursor()
             
             cursor.execute('''
-                SELECT id, image_path, is_primary
+                SELECT id, image_path, is_primary,
+                    width, height, byte_size, content_hash, dominant_color, blurhash
                 FROM property_images
                 WHERE property_id = %s
                 ORDER BY is_primary DESC, id ASC
@@ -1060,11 +2497,13 @@ class DatabaseManager:
             
             images = []
             for row in results:
-                images.append({
+                image = {
                     'id': row[0],
                     'image_path': row[1],
                     'is_primary': row[2]
-                })
+                }
+                image.update(zip(self.IMAGE_METADATA_FIELDS, row[3:]))
+                images.append(image)
             
             return images
             
@@ -1074,8 +2513,10 @@ class DatabaseManager:
     
     def set_primary_image(self, property_id: int, image_id: int) -> bool:
         """Set an image as primary for property"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             
             # Unset all primary images for this property
             cursor.execute('''
@@ -1088,24 +2529,44 @@ class DatabaseManager:
                 UPDATE property_images SET is_primary = TRUE 
                 WHERE id = %s AND property_id = %s
             ''', (image_id, property_id))
+            self.log_activity(cursor, 'primary_image_set', property_id)
             
+            connection.commit()
             cursor.close()
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error setting primary image: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def delete_property_image(self, image_id: int) -> bool:
         """Delete property image"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            cursor.execute("SELECT image_path FROM property_images WHERE id = %s", (image_id,))
+            image_paths = [row[0] for row in cursor.fetchall()]
+            
+            self.log_activity(cursor, 'image_deleted', image_id)
             cursor.execute("DELETE FROM property_images WHERE id = %s", (image_id,))
+            self.release_image_refs(cursor, image_paths)
+            connection.commit()
             cursor.close()
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error deleting property image: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def get_primary_image(self, property_id: int) -> Optional[str]:
@@ -1131,70 +2592,86 @@ class DatabaseManager:
     def create_transaction(self, property_id: int, buyer_id: int, seller_id: int, 
                           transaction_type: str, amount: float, notes: str = None) -> bool:
         """Create a new transaction"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             
             cursor.execute('''
                 INSERT INTO transactions (property_id, buyer_id, seller_id, 
                                         transaction_type, amount, notes)
                 VALUES (%s, %s, %s, %s, %s, %s)
             ''', (property_id, buyer_id, seller_id, transaction_type, amount, notes))
+            self.log_activity(cursor, 'transaction', cursor.lastrowid)
             
-            # Update property status
+            # Update property status and close the listing
             new_status = 'sold' if transaction_type == 'purchase' else 'rented'
             cursor.execute('''
-                UPDATE properties SET status = %s WHERE id = %s
+                UPDATE properties SET status = %s, closed_at = CURRENT_TIMESTAMP WHERE id = %s
             ''', (new_status, property_id))
             
+            connection.commit()
             cursor.close()
+            self.record_event('transaction', buyer_id, property_id)
+            self.listings_version += 1
             return True
             
         except Error as e:
             print(f"Error creating transaction: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def add_to_favorites(self, user_id: int, property_id: int) -> bool:
         """Add property to user's favorites"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
             cursor.execute('''
                 INSERT INTO favorites (user_id, property_id)
                 VALUES (%s, %s)
             ''', (user_id, property_id))
+            self.log_activity(cursor, 'favorite_added', user_id, property_id)
+            cursor.execute(
+                "UPDATE properties SET favorites_count = favorites_count + 1, updated_at = updated_at WHERE id = %s",
+                (property_id,)
+            )
+            connection.commit()
             cursor.close()
+            self.record_event('favorite', user_id, property_id)
             return True
             
         except mysql.connector.IntegrityError:
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
         except Error as e:
             print(f"Error adding to favorites: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def get_user_favorites(self, user_id: int) -> List[Dict]:
-        """Get user's favorite properties"""
+        """Get user's favorite properties (full listing details, including the primary image)"""
         try:
             cursor = self.connection.cursor()
-            cursor.execute('''
-                SELECT p.* FROM properties p
+            cursor.execute(self.PROPERTY_SELECT + '''
                 JOIN favorites f ON p.id = f.property_id
                 WHERE f.user_id = %s
+                ORDER BY f.created_at DESC
             ''', (user_id,))
             
             results = cursor.fetchall()
             cursor.close()
             
-            favorites = []
-            for row in results:
-                favorites.append({
-                    'id': row[0],
-                    'title': row[1],
-                    'price': float(row[8]),
-                    'property_type': row[3],
-                    'address': row[4],
-                    'city': row[5],
-                    'state': row[6]
-                })
-            return favorites
+            return [self.property_from_row(row) for row in results]
             
         except Error as e:
             print(f"Error getting user favorites: {e}")
@@ -1202,16 +2679,29 @@ class DatabaseManager:
     
     def remove_from_favorites(self, user_id: int, property_id: int) -> bool:
         """Remove property from user's favorites"""
+        connection = self.connection
         try:
-            cursor = self.connection.cursor()
+            cursor = connection.cursor()
+            connection.start_transaction()
+            self.log_activity(cursor, 'favorite_removed', user_id, property_id)
             cursor.execute('''
                 DELETE FROM favorites WHERE user_id = %s AND property_id = %s
             ''', (user_id, property_id))
+            if cursor.rowcount:
+                cursor.execute(
+                    "UPDATE properties SET favorites_count = favorites_count - 1, updated_at = updated_at WHERE id = %s",
+                    (property_id,)
+                )
+            connection.commit()
             cursor.close()
             return True
             
         except Error as e:
             print(f"Error removing from favorites: {e}")
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
     
     def is_favorite(self, user_id: int, property_id: int) -> bool:
@@ -1233,9 +2723,20 @@ class DatabaseManager:
             return False
     
     def close_connection(self):
-        """Close database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
+        """Close all database connections"""
+        # Write buffered events while a connection is still available
+        for buffer in (getattr(self, 'events', None), getattr(self, 'audit', None)):
+            if buffer is not None:
+                buffer.close()
+        
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        
+        for connection in connections:
+            if connection.is_connected():
+                connection.close()
+        
+        if connections:
             print("MySQL connection closed")
     
     def __del__(self):
@@ -0,0 +1,108 @@
+import threading
+import datetime
+from typing import Callable, List, Optional, Tuple
+
+
+class EventBuffer:
+    """In-memory buffer of user activity events written to the database in batches.
+
+    record() only appends under a lock, so it is cheap enough to call from
+    the Tk thread. A background thread writes the buffer with one batched
+    INSERT as soon as batch_size events are waiting, and otherwise every
+    flush_interval seconds. Events carry the time they were recorded, not
+    the time they were written. append() buffers any other row that
+    write_batch accepts (e.g. audit entries).
+
+    Past max_pending rows the oldest are shed; with shed=False the caller
+    writes the buffer synchronously instead and rows are never dropped.
+    """
+
+    def __init__(self, write_batch: Callable[[List[Tuple]], bool], batch_size: int = 500,
+                 flush_interval: float = 5.0, max_pending: int = 100_000, shed: bool = True):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.shed = shed
+
+        self._pending: List[Tuple] = []
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._write_failed = False
+        self.dropped = 0
+
+    def record(self, event_type: str, user_id: int = None, property_id: int = None):
+        """Buffer one event; never blocks on the database"""
+        self.append((event_type, user_id, property_id, datetime.datetime.now()))
+
+    def append(self, row: Tuple):
+        """Buffer one row for write_batch"""
+        with self._condition:
+            if self._closed:
+                # After close() nothing would write the row
+                if self.shed:
+                    return
+                self._pending.append(row)
+                full = True
+            else:
+                if self.shed and len(self._pending) >= self.max_pending:
+                    # Database unreachable for a long time: shed the oldest rows
+                    self._pending.pop(0)
+                    self.dropped += 1
+                self._pending.append(row)
+                full = len(self._pending) >= self.max_pending
+
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="event-buffer", daemon=True)
+                    self._thread.start()
+                if len(self._pending) >= self.batch_size:
+                    self._condition.notify()
+
+        if full and not self.shed:
+            # Back-pressure: the caller waits for the write rather than losing rows
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered event now (on the calling thread); returns the number written"""
+        with self._write_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            self._write_failed = not self.write_batch(batch)
+            if not self._write_failed:
+                return len(batch)
+
+            # Keep the events for the next attempt, ahead of newer ones
+            with self._condition:
+                self._pending[:0] = batch
+                overflow = len(self._pending) - self.max_pending
+                if self.shed and overflow > 0:
+                    del self._pending[:overflow]
+                    self.dropped += overflow
+            return 0
+
+    def close(self):
+        """Stop the background writer after a final flush"""
+        with self._condition:
+            self._closed = True
+            thread = self._thread
+            self._condition.notify()
+        if thread is not None:
+            # Bounded: at interpreter exit the daemon writer may already be frozen
+            thread.join(timeout=self.flush_interval)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                # A failed write backs off for an interval even with a full batch waiting
+                if not self._closed and (len(self._pending) < self.batch_size or self._write_failed):
+                    self._condition.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
@@ -1,7 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ui_components import ModernButton, PropertyCard
+from ui_components import ModernButton, PropertyCard, BusyIndicator, VirtualPropertyGrid
 from config import Config
+from task_runner import TaskRunner, current_task
 
 class FavoritesWindow:
     def __init__(self, parent, db_manager, current_user):
@@ -19,6 +20,7 @@ class FavoritesWindow:
         self.window.grab_set()
         
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window, on_busy_change=self.busy_indicator.set_busy)
         self.load_favorites()
     
     def create_widgets(self):
@@ -49,6 +51,10 @@ class FavoritesWindow:
         )
         close_btn.pack(side="right")
         
+        # Background activity indicator
+        self.busy_indicator = BusyIndicator(header_content, bg=Config.PRIMARY_COLOR, fg="white")
+        self.busy_indicator.pack(side="right", padx=(0, 20))
+        
         # Main content area
         content_frame = tk.Frame(self.window, bg=Config.BACKGROUND_COLOR)
         content_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -57,105 +63,55 @@ class FavoritesWindow:
         self.create_scrollable_favorites(content_frame)
     
     def create_scrollable_favorites(self, parent):
-        """Create scrollable frame for favorite properties"""
-        # Canvas and scrollbar
-        canvas = tk.Canvas(parent, bg=Config.BACKGROUND_COLOR, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(parent, orient="vertical", command=canvas.yview)
-        
-        self.favorites_frame = tk.Frame(canvas, bg=Config.BACKGROUND_COLOR)
-        
-        # Configure scrolling
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.create_window((0, 0), window=self.favorites_frame, anchor="nw")
-        
-        # Pack canvas and scrollbar
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # Update scroll region when frame changes
-        def configure_scroll_region(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-            canvas_width = canvas.winfo_width()
-            canvas.itemconfig(canvas.create_window((0, 0), window=self.favorites_frame, anchor="nw"), width=canvas_width)
-        
-        self.favorites_frame.bind("<Configure>", configure_scroll_region)
-        canvas.bind("<Configure>", configure_scroll_region)
-        
-        # Mouse wheel scrolling
-        def on_mousewheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        """Create the virtualized grid for favorite properties"""
+        self.favorites_grid = VirtualPropertyGrid(
+            parent,
+            create_card=self.create_favorite_card,
+            columns=3,
+            card_height=340
+        )
+        self.favorites_grid.pack(fill="both", expand=True)
+    
+    def create_favorite_card(self, parent, property_data):
+        """Card factory: a property card with a remove button"""
+        property_card = PropertyCard(
+            parent,
+            property_data,
+            on_click=self.handle_property_action
+        )
         
-        canvas.bind("<MouseWheel>", on_mousewheel)
+        # Add remove from favorites button (reads the card's current listing,
+        # since the grid rebinds cards as they scroll)
+        remove_btn = ModernButton(
+            property_card,
+            text="Remove from Favorites",
+            command=lambda: self.remove_favorite(property_card.property_data['id']),
+            style="outline",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            padx=5,
+            pady=3
+        )
+        remove_btn.pack(side="bottom", pady=(5, 10))
         
-        # Store references
-        self.canvas = canvas
+        return property_card
     
     def load_favorites(self):
-        """Load and display favorite properties"""
-        # Clear existing favorites
-        for widget in self.favorites_frame.winfo_children():
-            widget.destroy()
-        
+        """Load favorite properties in the background"""
+        self.task_runner.submit(
+            "favorites",
+            self.get_detailed_favorites,
+            on_success=self.display_favorites,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load favorites: {str(e)}"),
+            description="Loading favorites..."
+        )
+    
+    def display_favorites(self, favorites):
+        """Display favorite properties"""
         try:
-            # Get favorite properties with full details
-            favorites = self.get_detailed_favorites()
-            
-            if not favorites:
-                # No favorites found
-                no_favorites_label = tk.Label(
-                    self.favorites_frame,
-                    text="You haven't added any properties to your favorites yet.\n\nBrowse properties and click 'Add to Favorites' to see them here.",
-                    font=(Config.FONT_FAMILY, Config.FONT_SIZE_LARGE),
-                    bg=Config.BACKGROUND_COLOR,
-                    fg=Config.TEXT_SECONDARY,
-                    justify="center"
-                )
-                no_favorites_label.pack(expand=True, pady=100)
-                return
-            
-            # Configure grid columns
-            self.favorites_frame.columnconfigure(0, weight=1, uniform="column")
-            self.favorites_frame.columnconfigure(1, weight=1, uniform="column")
-            self.favorites_frame.columnconfigure(2, weight=1, uniform="column")
-            
-            # Display favorites in 3-column grid
-            for i, property_data in enumerate(favorites):
-                row = i // 3
-                col = i % 3
-                
-                # Create property card
-                property_card = PropertyCard(
-                    self.favorites_frame,
-                    property_data,
-                    on_click=self.handle_property_action,
-                    width=350,
-                    height=280
-                )
-                
-                # Grid the property card
-                property_card.grid(
-                    row=row,
-                    column=col,
-                    padx=10,
-                    pady=10,
-                    sticky="ew"
-                )
-                
-                # Add remove from favorites button
-                remove_btn = ModernButton(
-                    property_card,
-                    text="Remove from Favorites",
-                    command=lambda prop_id=property_data['id']: self.remove_favorite(prop_id),
-                    style="outline",
-                    font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
-                    padx=5,
-                    pady=3
-                )
-                remove_btn.pack(side="bottom", pady=(5, 10))
-            
-            # Update canvas scroll region
-            self.favorites_frame.update_idletasks()
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            self.favorites_grid.set_items(
+                favorites,
+                empty_text="You haven't added any properties to your favorites yet.\n\nBrowse properties and click 'Add to Favorites' to see them here."
+            )
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load favorites: {str(e)}")
@@ -163,17 +119,14 @@ class FavoritesWindow:
     def get_detailed_favorites(self):
         """Get detailed information for favorite properties"""
         try:
-            # Get basic favorite info
-            basic_favorites = self.db_manager.get_user_favorites(self.current_user['id'])
+            # One query returns full listing details, primary image included
+            favorites = self.db_manager.get_user_favorites(self.current_user['id'])
             
-            # Get full property details for each favorite
-            detailed_favorites = []
-            for fav in basic_favorites:
-                property_details = self.db_manager.get_property_by_id(fav['id'])
-                if property_details and property_details['status'] == 'available':
-                    detailed_favorites.append(property_details)
+            task = current_task()
+            if task:
+                task.check_cancelled()
             
-            return detailed_favorites
+            return [fav for fav in favorites if fav['status'] == 'available']
             
         except Exception as e:
             print(f"Error getting detailed favorites: {e}")
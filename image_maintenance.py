@@ -0,0 +1,458 @@
+"""Maintenance jobs for the property image store.
+
+Run a job with:  python image_maintenance.py <job> [options]
+List them with:  python image_maintenance.py --help
+
+The store is split into 16 buckets by the first hex digit of the filename
+(for content-addressed files, the first character of their shard directory).
+gc, repair and scan process `--buckets N` of them per run and remember where
+they stopped (images/.maintenance_state.json), so a store with millions of
+files can be worked through incrementally, e.g. two buckets a night.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image
+from config import Config
+from database import DatabaseManager
+from image_manager import ImageManager, describe_image, hash_file, is_content_addressed, rendition_encoding
+
+BUCKETS = "0123456789abcdef"
+STATE_FILE = os.path.join("images", ".maintenance_state.json")
+
+_worker_manager = None
+
+
+def bucket_of(filename):
+    """Bucket of a stored file or image_path (uuid and hash names start with a hex digit)"""
+    first = filename[:1].lower()
+    if first in BUCKETS:
+        return first
+    return BUCKETS[zlib.crc32(filename.encode()) % len(BUCKETS)]
+
+
+def image_key(filename):
+    """Stem shared by an original, its legacy thumbnail and its renditions"""
+    return os.path.splitext(filename)[0]
+
+
+def select_buckets(job, count):
+    """Next `count` buckets for job, continuing from the previous run"""
+    state = load_state()
+    start = state.get(job, 0)
+    count = max(1, min(count, len(BUCKETS)))
+    return [BUCKETS[(start + i) % len(BUCKETS)] for i in range(count)], (start + count) % len(BUCKETS)
+
+
+def load_state():
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(job, next_bucket):
+    state = load_state()
+    state[job] = next_bucket
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f)
+
+
+def scan_directory(path, buckets, extension=None):
+    """{key: (filename, mtime, path)} for the files under path that fall in buckets.
+
+    Covers legacy flat files and the two shard levels (ab/cd/) of
+    content-addressed files; shards outside the selected buckets are skipped
+    without being listed. With an extension (rendition directories), files in
+    any other encoding are keyed by their full name, so they never match a
+    reference: gc sweeps them and repair sees the current encoding as missing.
+    """
+    entries = {}
+
+    def scan(directory, depth):
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir():
+                    if depth < 2 and len(entry.name) == 2 and (depth or entry.name[0] in buckets):
+                        scan(entry.path, depth + 1)
+                elif bucket_of(entry.name) in buckets:
+                    key = image_key(entry.name)
+                    if extension and not entry.name.endswith(extension):
+                        key = entry.name
+                    entries[key] = (entry.name, entry.stat().st_mtime, entry.path)
+
+    try:
+        scan(path, 0)
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def scan_store(image_manager, buckets, workers):
+    """List originals, legacy thumbnails and every rendition directory in parallel"""
+    directories = {
+        'originals': (image_manager.property_images_dir, None),
+        'thumbnails': (image_manager.thumbnails_dir, None)
+    }
+    for rendition in Config.IMAGE_RENDITIONS:
+        directories[rendition] = (
+            os.path.join(image_manager.renditions_dir, rendition),
+            rendition_encoding(rendition)['extension']
+        )
+
+    with ThreadPoolExecutor(max_workers=workers or len(directories)) as pool:
+        listings = pool.map(lambda entry: scan_directory(entry[0], buckets, entry[1]), directories.values())
+        return directories, dict(zip(directories, listings))
+
+
+def mark_references(db_manager, buckets, batch_size):
+    """Mark phase: {key: [(id, property_id, image_path), ...]} for rows in buckets"""
+    references = {}
+    after_id = 0
+    while True:
+        rows = db_manager.get_image_references(after_id, batch_size)
+        if not rows:
+            break
+        for row in rows:
+            if bucket_of(row[2]) in buckets:
+                references.setdefault(image_key(row[2]), []).append(row)
+        after_id = rows[-1][0]
+    return references
+
+
+def survey(args, job):
+    """Scan the selected buckets, then mark references (files listed first are safe to judge)"""
+    buckets, next_bucket = select_buckets(job, args.buckets)
+    image_manager = ImageManager()
+    directories, listings = scan_store(image_manager, set(buckets), args.workers)
+
+    db_manager = DatabaseManager(initialize=False)
+    try:
+        references = mark_references(db_manager, set(buckets), args.batch_size)
+    finally:
+        db_manager.close_connection()
+
+    print(f"Buckets {''.join(buckets)}: {len(listings['originals'])} originals, "
+          f"{len(references)} referenced images")
+    return buckets, next_bucket, directories, listings, references
+
+
+def repair_renditions(item):
+    """Re-render stale renditions of one original; runs in a worker process"""
+    global _worker_manager
+    if _worker_manager is None:
+        _worker_manager = ImageManager()
+
+    filename, stale, verify_sizes = item
+    stale = list(stale)
+    if verify_sizes:
+        for rendition, size in Config.IMAGE_RENDITIONS.items():
+            if rendition in stale:
+                continue
+            try:
+                with Image.open(_worker_manager.get_rendition_path(filename, rendition)) as img:
+                    if img.size != size:
+                        stale.append(rendition)
+            except OSError:
+                stale.append(rendition)
+
+    if not stale:
+        return filename, stale, []
+    created = _worker_manager.create_renditions(_worker_manager.get_image_path(filename), filename, stale)
+    return filename, stale, created
+
+
+def verify_original(path):
+    """Whether an original decodes; runs in a worker process"""
+    try:
+        with Image.open(path) as img:
+            img.verify()
+        return path, None
+    except Exception as e:
+        return path, str(e)
+
+
+def describe_stored_image(filename):
+    """Metadata of one stored original, or the error; runs in a worker process"""
+    global _worker_manager
+    if _worker_manager is None:
+        _worker_manager = ImageManager()
+    
+    try:
+        return filename, describe_image(_worker_manager.get_image_path(filename)), None
+    except Exception as e:
+        return filename, None, str(e)
+
+
+def job_renditions(args):
+    """Render missing display renditions for images uploaded before they existed"""
+    image_manager = ImageManager()
+
+    def progress(done, total, filename):
+        if args.verbose:
+            print(f"[{done}/{total}] {filename}")
+
+    migrated, rendered = image_manager.migrate_renditions(force=args.force, progress=progress)
+    print(f"Rendered {rendered} renditions for {migrated} images")
+
+
+def job_gc(args):
+    """Mark-and-sweep removal of image files no property_images row references"""
+    buckets, next_bucket, directories, listings, references = survey(args, 'gc')
+
+    # Recent files may belong to an upload whose row is not inserted yet
+    cutoff = time.time() - args.min_age_hours * 3600
+    swept = 0
+    freed = 0
+    for listing in listings.values():
+        for key, (filename, mtime, path) in listing.items():
+            if key in references or mtime > cutoff:
+                continue
+
+            # A dedupe upload touches the file it reuses, possibly after the scan
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                size = stat.st_size
+                if not args.dry_run:
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            swept += 1
+            freed += size
+            if args.verbose:
+                print(f"{'would remove' if args.dry_run else 'removed'} {path}")
+
+    print(f"{'Would sweep' if args.dry_run else 'Swept'} {swept} orphaned files ({freed / (1024 * 1024):.1f} MB)")
+    if not args.dry_run:
+        db_manager = DatabaseManager(initialize=False)
+        try:
+            forgotten = db_manager.delete_unreferenced_image_files()
+        finally:
+            db_manager.close_connection()
+        print(f"Forgot {forgotten} unreferenced image_files rows")
+        save_state('gc', next_bucket)
+
+
+def job_repair(args):
+    """Regenerate missing or stale renditions of referenced images"""
+    buckets, next_bucket, directories, listings, references = survey(args, 'repair')
+
+    work = []
+    for key in references:
+        original = listings['originals'].get(key)
+        if original is None:
+            continue  # Broken reference, reported by scan
+        filename, mtime, _ = original
+        stale = [
+            rendition for rendition in Config.IMAGE_RENDITIONS
+            if key not in listings[rendition] or listings[rendition][key][1] < mtime
+        ]
+        if stale or args.verify_sizes:
+            work.append((filename, stale, args.verify_sizes))
+
+    repaired = 0
+    failed = 0
+    if work:
+        with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+            for filename, stale, created in pool.map(repair_renditions, work, chunksize=32):
+                if len(created) < len(stale):
+                    failed += 1
+                    print(f"Could not render {', '.join(sorted(set(stale) - set(created)))} for {filename}")
+                elif created:
+                    repaired += 1
+                    if args.verbose:
+                        print(f"Rendered {', '.join(created)} for {filename}")
+
+    print(f"Repaired {repaired} images, {failed} failed")
+    save_state('repair', next_bucket)
+
+
+def job_scan(args):
+    """Integrity report: broken references, orphans, missing renditions and undecodable originals"""
+    buckets, next_bucket, directories, listings, references = survey(args, 'scan')
+
+    broken = [row for key, rows in references.items() if key not in listings['originals'] for row in rows]
+    orphans = {
+        name: sum(1 for key in listing if key not in references)
+        for name, listing in listings.items()
+    }
+    missing = {
+        rendition: sum(1 for key in references if key in listings['originals'] and key not in listings[rendition])
+        for rendition in Config.IMAGE_RENDITIONS
+    }
+
+    print(f"Broken references: {len(broken)}")
+    for row_id, property_id, image_path in broken[:args.show]:
+        print(f"  property_images.id={row_id} property_id={property_id} image_path={image_path}")
+    if len(broken) > args.show:
+        print(f"  ... and {len(broken) - args.show} more")
+
+    print("Orphaned files: " + ", ".join(f"{name} {count}" for name, count in orphans.items()))
+    print("Missing renditions: " + ", ".join(f"{name} {count}" for name, count in missing.items()))
+
+    if args.verify:
+        paths = [path for _, _, path in listings['originals'].values()]
+        with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+            corrupt = [(path, error) for path, error in pool.map(verify_original, paths, chunksize=64) if error]
+        print(f"Undecodable originals: {len(corrupt)}")
+        for path, error in corrupt[:args.show]:
+            print(f"  {path}: {error}")
+
+    save_state('scan', next_bucket)
+
+
+def job_content_address(args):
+    """Move legacy uuid-named originals to content-addressed, sharded storage"""
+    image_manager = ImageManager()
+    legacy = []
+    with os.scandir(image_manager.property_images_dir) as it:
+        for entry in it:
+            if entry.is_file() and not entry.name.startswith('.') and not is_content_addressed(entry.name):
+                legacy.append(entry.name)
+                if args.limit and len(legacy) >= args.limit:
+                    break
+
+    db_manager = DatabaseManager(initialize=False)
+    moved = 0
+    deduplicated = 0
+    try:
+        # Hashing is I/O bound; hashlib releases the GIL
+        with ThreadPoolExecutor(max_workers=args.workers or None) as pool:
+            digests = pool.map(lambda filename: hash_file(image_manager.get_image_path(filename)), legacy)
+
+            for filename, digest in zip(legacy, digests):
+                extension = os.path.splitext(filename)[1].lower()
+                new_filename = f"{digest}{'.jpg' if extension == '.jpeg' else extension}"
+                if args.dry_run:
+                    print(f"{filename} -> {new_filename}")
+                    continue
+
+                old_path = image_manager.get_image_path(filename)
+                new_path = image_manager.get_image_path(new_filename)
+                if os.path.exists(new_path):
+                    deduplicated += 1
+                else:
+                    # Link (or copy) first so the old name stays valid until references move
+                    os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                    temp_path = f"{new_path}.{uuid.uuid4().hex}.tmp"
+                    try:
+                        os.link(old_path, temp_path)
+                    except OSError:
+                        shutil.copyfile(old_path, temp_path)
+                    os.replace(temp_path, new_path)
+
+                    for rendition in Config.IMAGE_RENDITIONS:
+                        old_rendition = image_manager.get_rendition_path(filename, rendition)
+                        new_rendition = image_manager.get_rendition_path(new_filename, rendition)
+                        if os.path.exists(old_rendition) and not os.path.exists(new_rendition):
+                            os.makedirs(os.path.dirname(new_rendition), exist_ok=True)
+                            os.replace(old_rendition, new_rendition)
+                    moved += 1
+
+                db_manager.rename_image_path(filename, new_filename)
+                image_manager.delete_image(filename)
+                if args.verbose:
+                    print(f"{filename} -> {new_filename}")
+
+        if args.dry_run:
+            print(f"{len(legacy)} legacy images would be migrated")
+        else:
+            stored = db_manager.rebuild_image_ref_counts()
+            print(f"Moved {moved} images, {deduplicated} were duplicates; {stored} stored files referenced")
+    finally:
+        db_manager.close_connection()
+
+    if args.limit and len(legacy) == args.limit:
+        print("More legacy images may remain; run again to continue")
+
+
+def job_metadata(args):
+    """Backfill dimensions, size, hash, dominant color and BlurHash for images stored without them"""
+    db_manager = DatabaseManager(initialize=False)
+    described = 0
+    failed = 0
+    after = ""
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+            while True:
+                filenames = db_manager.get_images_missing_metadata(after, args.batch_size)
+                if not filenames:
+                    break
+                after = filenames[-1]
+                
+                for filename, metadata, error in pool.map(describe_stored_image, filenames, chunksize=32):
+                    if metadata is None:
+                        failed += 1
+                        print(f"Could not describe {filename}: {error}")
+                    elif db_manager.update_image_metadata(filename, metadata):
+                        described += 1
+                        if args.verbose:
+                            print(f"{filename}: {metadata['width']}x{metadata['height']} {metadata['blurhash']}")
+    finally:
+        db_manager.close_connection()
+    
+    print(f"Described {described} images, {failed} failed")
+
+
+def job_report(args):
+    """Storage totals from recorded image metadata, without touching the files"""
+    db_manager = DatabaseManager(initialize=False)
+    try:
+        report = db_manager.get_image_storage_report()
+    finally:
+        db_manager.close_connection()
+    if not report:
+        return
+    
+    print(f"References:        {report['references']}")
+    print(f"Stored files:      {report['stored_files']}")
+    print(f"Total size:        {report['total_bytes'] / (1024 * 1024):.1f} MB "
+          f"(largest {report['largest_bytes'] / (1024 * 1024):.1f} MB)")
+    print(f"Average size:      {report['avg_width']:.0f}x{report['avg_height']:.0f}")
+    print(f"12MP and larger:   {report['large_files']}")
+    print(f"Missing metadata:  {report['missing_metadata']} (run the metadata job)")
+
+
+STORE_OPTIONS = {'buckets': len(BUCKETS), 'workers': 0, 'batch_size': 10000, 'verbose': False}
+
+JOBS = {
+    'renditions': (job_renditions, {'force': False, 'verbose': False}),
+    'gc': (job_gc, {**STORE_OPTIONS, 'min_age_hours': 24, 'dry_run': False}),
+    'repair': (job_repair, {**STORE_OPTIONS, 'verify_sizes': False}),
+    'scan': (job_scan, {**STORE_OPTIONS, 'verify': False, 'show': 20}),
+    'content_address': (job_content_address, {'limit': 0, 'workers': 0, 'dry_run': False, 'verbose': False}),
+    'metadata': (job_metadata, {'workers': 0, 'batch_size': 1000, 'verbose': False}),
+    'report': (job_report, {}),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='job', required=True)
+
+    for name, (func, defaults) in JOBS.items():
+        subparser = subparsers.add_parser(name, help=func.__doc__)
+        for option, default in defaults.items():
+            flag = f"--{option.replace('_', '-')}"
+            if isinstance(default, bool):
+                subparser.add_argument(flag, action='store_true')
+            else:
+                subparser.add_argument(flag, type=type(default), default=default)
+        subparser.set_defaults(func=func)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,360 @@
 import os
+import math
 import shutil
+import hashlib
+import threading
+import multiprocessing
 import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tkinter import filedialog, messagebox
-from PIL import Image, ImageTk
+from PIL import Image, ImageOps, ImageTk, features
 import uuid
+import blurhash
 from config import Config
+from task_runner import TaskRunner, current_task
+
+class ImageCache:
+    """Byte-bounded LRU of decoded, resized PIL images keyed by (filename, size, variant)"""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def image_bytes(img):
+        """Approximate decoded size of an image"""
+        return img.width * img.height * len(img.getbands())
+    
+    def get(self, key, count_miss=True):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, img):
+        size = self.image_bytes(img)
+        if size > self.max_bytes:
+            return
+        
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= self.entries.pop(key)[1]
+            
+            self.entries[key] = (img, size)
+            self.current_bytes += size
+            
+            # Evict least recently used entries until within budget
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+    
+    def invalidate(self, filename):
+        """Drop every cached rendition of filename"""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == filename]:
+                self.current_bytes -= self.entries.pop(key)[1]
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+    
+    def stats(self):
+        """Hit/miss metrics for monitoring"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+# Rendition encodings: Pillow format, file extension, MIME type and save options
+IMAGE_ENCODINGS = {
+    'jpeg': {
+        'format': 'JPEG',
+        'extension': '.jpg',
+        'mime_type': 'image/jpeg',
+        'options': {'quality': 85, 'optimize': True, 'progressive': True}
+    },
+    'webp': {
+        'format': 'WEBP',
+        'extension': '.webp',
+        'mime_type': 'image/webp',
+        'options': {'quality': 80, 'method': 4}
+    },
+    'png': {
+        'format': 'PNG',
+        'extension': '.png',
+        'mime_type': 'image/png',
+        'options': {'optimize': True}
+    }
+}
+
+def rendition_encoding(rendition):
+    """Encoding settings for a rendition, falling back to JPEG when Pillow lacks WebP support"""
+    name = Config.IMAGE_RENDITION_ENCODINGS.get(rendition, 'jpeg')
+    if name == 'webp' and not features.check('webp'):
+        name = 'jpeg'
+    return IMAGE_ENCODINGS[name]
+
+_shared_manager = None
+_shared_manager_lock = threading.Lock()
+
+def get_image_manager():
+    """Process-wide ImageManager, so every window shares one decoded-image cache"""
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = ImageManager()
+        return _shared_manager
+
+_shared_loader = None
+
+def get_image_loader(widget):
+    """Process-wide ImageLoader bound to the application's root window"""
+    global _shared_loader
+    if _shared_loader is None or _shared_loader.runner.closed:
+        _shared_loader = ImageLoader(widget.nametowidget("."), get_image_manager(), Config.IMAGE_DECODE_WORKERS)
+    return _shared_loader
+
+class ImageLoader:
+    """Decodes renditions on worker threads and swaps them into labels on the Tk thread.
+    
+    Each label has at most one outstanding request: a newer request for the
+    same label supersedes it, and cancel(label) or destroying the label drops
+    it. At most max_workers decodes run at once; the rest wait in line.
+    """
+    
+    def __init__(self, root, image_manager, max_workers):
+        self.image_manager = image_manager
+        self.runner = TaskRunner(root, max_workers=max_workers, poll_interval=15)
+        
+        # Destroyed labels cancel their pending request
+        self.destroy_tag = f"ImageLoader{id(self)}"
+        root.bind_class(self.destroy_tag, "<Destroy>", lambda e: self.runner.cancel(str(e.widget)))
+    
+    def load(self, label, filename, rendition, on_error=None):
+        """Show a rendition in label; returns True if it was cached and shown right away.
+        
+        Otherwise the caller keeps its placeholder up until the decode lands.
+        """
+        key = str(label)
+        img = self.image_manager.cached_rendition(filename, rendition)
+        if img is not None:
+            self.runner.cancel(key)
+            self.show(label, img, rendition)
+            return True
+        
+        tags = label.bindtags()
+        if self.destroy_tag not in tags:
+            label.bindtags(tags + (self.destroy_tag,))
+        
+        self.runner.submit(
+            key,
+            self.image_manager.load_rendition,
+            filename,
+            rendition,
+            on_success=lambda img: self.show(label, img, rendition),
+            on_error=lambda e: on_error(e) if on_error and label.winfo_exists() else None
+        )
+        return False
+    
+    def cancel(self, label):
+        """Drop the pending request for label; returns whether one was pending"""
+        key = str(label)
+        pending = self.runner.is_busy(key)
+        self.runner.cancel(key)
+        return pending
+    
+    def show(self, label, img, rendition):
+        """Swap a decoded image into label (Tk thread)"""
+        if not label.winfo_exists():
+            return
+        
+        if img is None:
+            photo = self.image_manager.get_placeholder_image(Config.IMAGE_RENDITIONS[rendition])
+        else:
+            photo = ImageTk.PhotoImage(img)
+        
+        label.configure(image=photo, text="", bg="white")
+        # Keep reference to prevent garbage collection
+        label.image = photo
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cover_size(source_size, target_size):
+    """Smallest aspect-preserving scale of source_size that covers target_size"""
+    scale = max(target_size[0] / source_size[0], target_size[1] / source_size[1])
+    return (min(source_size[0], math.ceil(source_size[0] * scale)),
+            min(source_size[1], math.ceil(source_size[1] * scale)))
+
+def decode_image(image_path, target_sizes=()):
+    """Open and decode an image as RGB, letting the decoder downscale where it can.
+
+    For JPEGs, draft mode makes libjpeg decode at 1/2, 1/4 or 1/8 scale as
+    long as the result still covers every size in target_sizes, which is far
+    faster and smaller than a full decode. Other formats decode at full size.
+    Images that would still decode to more than Config.IMAGE_MAX_DECODE_PIXELS
+    are refused with ValueError.
+    """
+    img = Image.open(image_path)
+    try:
+        if target_sizes:
+            needed = [cover_size(img.size, size) for size in target_sizes]
+            img.draft('RGB', (max(w for w, _ in needed), max(h for _, h in needed)))
+        
+        if img.width * img.height > Config.IMAGE_MAX_DECODE_PIXELS:
+            raise ValueError(f"Image too large to decode ({img.width}x{img.height})")
+        
+        img.load()
+        if img.mode != 'RGB':
+            converted = img.convert('RGB')
+            img.close()
+            return converted
+        return img
+        
+    except BaseException:
+        img.close()
+        raise
+
+def is_content_addressed(filename):
+    """Whether filename is a <sha256>.<ext> name (as opposed to a legacy uuid4 name)"""
+    stem = os.path.splitext(filename)[0]
+    return len(stem) == 64 and all(c in "0123456789abcdef" for c in stem)
+
+def shard_path(base_dir, filename):
+    """Two-level sharded location (ab/cd/abcd...) for content-addressed names, flat otherwise"""
+    if is_content_addressed(filename):
+        return os.path.join(base_dir, filename[:2], filename[2:4], filename)
+    return os.path.join(base_dir, filename)
+
+def content_hash(image_path):
+    """SHA-256 of a stored image; content-addressed names already carry it"""
+    filename = os.path.basename(image_path)
+    if is_content_addressed(filename):
+        return os.path.splitext(filename)[0]
+    return hash_file(image_path)
+
+def describe_image(image_path):
+    """Metadata stored with each property image: dimensions, bytes, hash, dominant color, BlurHash"""
+    with Image.open(image_path) as img:
+        width, height = img.size
+    
+    with decode_image(image_path, [(32, 32)]) as img:
+        small = img.copy()
+    small.thumbnail((32, 32), Image.Resampling.BILINEAR)
+    
+    # Most common of a handful of representative colors
+    quantized = small.quantize(colors=5)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    
+    return {
+        'width': width,
+        'height': height,
+        'byte_size': os.path.getsize(image_path),
+        'content_hash': content_hash(image_path),
+        'dominant_color': f"#{r:02x}{g:02x}{b:02x}",
+        'blurhash': blurhash.encode(list(small.getdata()), small.width, small.height)
+    }
+
+def ingest_image(image_path):
+    """Hash, store, render and describe one upload; runs in a worker process.
+
+    Returns (image_path, saved_filename, metadata), with None for both on failure.
+    """
+    manager = ImageManager()
+    saved_filename = manager.save_property_image(image_path)
+    if not saved_filename:
+        return image_path, None, None
+    
+    try:
+        metadata = describe_image(manager.get_image_path(saved_filename))
+    except Exception as e:
+        # The image is stored and displayable; maintenance can backfill metadata
+        print(f"Error describing image: {e}")
+        metadata = None
+    return image_path, saved_filename, metadata
 
 class ImageManager:
     def __init__(self):
         self.images_dir = "images"
         self.property_images_dir = os.path.join(self.images_dir, "properties")
         self.thumbnails_dir = os.path.join(self.images_dir, "thumbnails")
+        self.renditions_dir = os.path.join(self.images_dir, "renditions")
         
         # Create directories if they don't exist
         os.makedirs(self.property_images_dir, exist_ok=True)
         os.makedirs(self.thumbnails_dir, exist_ok=True)
+        for rendition in Config.IMAGE_RENDITIONS:
+            os.makedirs(os.path.join(self.renditions_dir, rendition), exist_ok=True)
+        
+        # Decoded images and per-size placeholders
+        self.cache = ImageCache(Config.IMAGE_CACHE_MAX_BYTES)
+        self.placeholders = {}
     
     def save_property_image(self, image_path, property_id=None):
-        """Save property image and create thumbnail"""
+        """Store property image under its content hash and pre-render its display renditions.
+
+        Identical uploads map to the same file, which is stored once.
+        """
         try:
             if not os.path.exists(image_path):
                 return None
             
-            # Generate unique filename
+            # Content-addressed filename
             file_extension = os.path.splitext(image_path)[1].lower()
             if file_extension not in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
                 raise ValueError("Unsupported image format")
+            if file_extension == '.jpeg':
+                file_extension = '.jpg'
+            
+            unique_filename = f"{hash_file(image_path)}{file_extension}"
+            dest_path = self.get_image_path(unique_filename)
             
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
+            if os.path.exists(dest_path):
+                # Already stored; refresh the mtime so GC's grace period covers the new reference
+                os.utime(dest_path)
+                missing = self.missing_renditions(unique_filename)
+                if missing:
+                    self.create_renditions(dest_path, unique_filename, missing)
+                return unique_filename
             
-            # Copy original image
-            dest_path = os.path.join(self.property_images_dir, unique_filename)
-            shutil.copy2(image_path, dest_path)
+            # Copy original image (copy then rename, so concurrent identical uploads never see a partial file)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            temp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(image_path, temp_path)
+            os.replace(temp_path, dest_path)
             
-            # Create thumbnail
-            self.create_thumbnail(dest_path, unique_filename)
+            # Create display renditions; don't keep an original that can't be displayed
+            if not self.create_renditions(dest_path, unique_filename):
+                self.delete_image(unique_filename)
+                return None
             
             return unique_filename
             
@@ -42,23 +362,117 @@ class ImageManager:
             print(f"Error saving image: {e}")
             return None
     
-    def create_thumbnail(self, image_path, filename):
-        """Create thumbnail for image"""
+    def ingest_images(self, image_paths, max_workers=None, on_result=None):
+        """Save many uploads, fanning decode/render/hash work out to a process pool.
+
+        on_result(done, total, result) is called as each file finishes and may
+        raise (e.g. TaskCancelled) to abort. Files saved before an abort may be
+        shared with other listings, so they are left for image_maintenance gc.
+        Returns ingest_image results in the order of image_paths.
+        """
+        if max_workers is None:
+            max_workers = Config.IMAGE_INGEST_WORKERS
+        
+        results = {}
+        if len(image_paths) <= 1 or max_workers == 1:
+            # Not worth starting worker processes
+            for image_path in image_paths:
+                results[image_path] = ingest_image(image_path)
+                if on_result:
+                    on_result(len(results), len(image_paths), results[image_path])
+        else:
+            # Spawned, not forked: this runs on a TaskRunner thread of a process holding Tk, MySQL
+            # connections and other threads, whose locks a forked child could inherit held
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = [pool.submit(ingest_image, image_path) for image_path in image_paths]
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        results[result[0]] = result
+                        if on_result:
+                            on_result(len(results), len(image_paths), result)
+                except BaseException:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+        
+        return [results[image_path] for image_path in image_paths]
+    
+    def create_renditions(self, image_path, filename, renditions=None):
+        """Render the named display sizes of an image, center-cropped to each aspect ratio"""
+        renditions = list(renditions or Config.IMAGE_RENDITIONS)
+        created = []
         try:
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Create thumbnail
-                img.thumbnail(Config.THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-                
-                # Save thumbnail
-                thumb_path = os.path.join(self.thumbnails_dir, filename)
-                img.save(thumb_path, 'JPEG', quality=85)
-                
+            # Decode only as many pixels as the largest rendition needs
+            with decode_image(image_path, [Config.IMAGE_RENDITIONS[r] for r in renditions]) as img:
+                for rendition in renditions:
+                    size = Config.IMAGE_RENDITIONS[rendition]
+                    rendered = ImageOps.fit(img, size, Image.Resampling.LANCZOS)
+                    rendition_path = self.get_rendition_path(filename, rendition)
+                    os.makedirs(os.path.dirname(rendition_path), exist_ok=True)
+                    encoding = rendition_encoding(rendition)
+                    rendered.save(rendition_path, encoding['format'], **encoding['options'])
+                    created.append(rendition)
+                    
         except Exception as e:
-            print(f"Error creating thumbnail: {e}")
+            print(f"Error creating renditions: {e}")
+        
+        self.cache.invalidate(filename)
+        return created
+    
+    def get_rendition_path(self, filename, rendition):
+        """Get full path to a named rendition of an image"""
+        if not filename:
+            return None
+        
+        stem = os.path.splitext(filename)[0]
+        extension = rendition_encoding(rendition)['extension']
+        return shard_path(os.path.join(self.renditions_dir, rendition), f"{stem}{extension}")
+    
+    def get_rendition_mime_type(self, rendition):
+        """MIME type of a rendition as currently encoded"""
+        return rendition_encoding(rendition)['mime_type']
+    
+    def missing_renditions(self, filename):
+        """Names of the renditions not yet rendered for an image"""
+        return [
+            rendition for rendition in Config.IMAGE_RENDITIONS
+            if not os.path.exists(self.get_rendition_path(filename, rendition))
+        ]
+    
+    def iter_originals(self):
+        """Filenames of every stored original, legacy flat and sharded alike"""
+        for _, dirs, files in os.walk(self.property_images_dir):
+            dirs.sort()
+            for filename in sorted(files):
+                if not filename.startswith('.') and not filename.endswith('.tmp'):
+                    yield filename
+    
+    def migrate_renditions(self, force=False, progress=None):
+        """Render missing renditions for every stored original; returns (images, renditions) counts.
+        
+        Legacy thumbnails (JPEG data, often under a .png name) are removed once
+        an image has all its renditions.
+        """
+        filenames = list(self.iter_originals())
+        migrated = 0
+        rendered = 0
+        
+        for index, filename in enumerate(filenames):
+            missing = list(Config.IMAGE_RENDITIONS) if force else self.missing_renditions(filename)
+            if missing:
+                created = self.create_renditions(self.get_image_path(filename), filename, missing)
+                if created:
+                    migrated += 1
+                    rendered += len(created)
+            
+            thumb_path = self.get_image_path(filename, thumbnail=True)
+            if os.path.exists(thumb_path) and not self.missing_renditions(filename):
+                os.remove(thumb_path)
+            
+            if progress:
+                progress(index + 1, len(filenames), filename)
+        
+        return migrated, rendered
     
     def get_image_path(self, filename, thumbnail=False):
         """Get full path to image or thumbnail"""
@@ -68,13 +482,13 @@ class ImageManager:
         if thumbnail:
             return os.path.join(self.thumbnails_dir, filename)
         else:
-            return os.path.join(self.property_images_dir, filename)
+            return shard_path(self.property_images_dir, filename)
     
     def delete_image(self, filename):
-        """Delete image and its thumbnail"""
+        """Delete image, its thumbnail and its renditions"""
         try:
             # Delete original image
-            image_path = os.path.join(self.property_images_dir, filename)
+            image_path = self.get_image_path(filename)
             if os.path.exists(image_path):
                 os.remove(image_path)
             
@@ -82,58 +496,167 @@ class ImageManager:
             thumb_path = os.path.join(self.thumbnails_dir, filename)
             if os.path.exists(thumb_path):
                 os.remove(thumb_path)
-                
+            
+            # Delete renditions
+            for rendition in Config.IMAGE_RENDITIONS:
+                rendition_path = self.get_rendition_path(filename, rendition)
+                if os.path.exists(rendition_path):
+                    os.remove(rendition_path)
+            
+            self.cache.invalidate(filename)
             return True
             
         except Exception as e:
             print(f"Error deleting image: {e}")
             return False
     
+    def load_image(self, filename, size=None, thumbnail=False):
+        """Decoded (and resized) PIL image, served from the shared cache when possible"""
+        key = (filename, tuple(size) if size else None, "thumbnail" if thumbnail else "original")
+        img = self.cache.get(key)
+        if img is not None:
+            return img
+        
+        image_path = self.get_image_path(filename, thumbnail)
+        if not image_path or not os.path.exists(image_path):
+            return None
+        
+        # Open and resize image
+        img = decode_image(image_path, [size] if size else ())
+        if size and img.size != tuple(size):
+            resized = img.resize(size, Image.Resampling.LANCZOS)
+            img.close()
+            img = resized
+        
+        self.cache.put(key, img)
+        return img
+    
+    def load_blurhash_preview(self, blurhash_text, size):
+        """Blurred preview decoded from a stored BlurHash, or None"""
+        if not blurhash_text:
+            return None
+        
+        key = (blurhash_text, tuple(size), "blurhash")
+        img = self.cache.get(key)
+        if img is None:
+            # Decode a few pixels and let the resize do the blurring
+            width = 32
+            height = max(1, round(width * size[1] / size[0]))
+            try:
+                pixels = blurhash.decode(blurhash_text, width, height)
+            except ValueError as e:
+                print(f"Error decoding BlurHash: {e}")
+                return None
+            img = Image.frombytes('RGB', (width, height), pixels).resize(size, Image.Resampling.BILINEAR)
+            self.cache.put(key, img)
+        return img
+    
+    def blurhash_preview_for_display(self, blurhash_text, size):
+        """BlurHash preview as a PhotoImage, or None"""
+        img = self.load_blurhash_preview(blurhash_text, size)
+        return ImageTk.PhotoImage(img) if img is not None else None
+    
+    def cached_rendition(self, filename, rendition):
+        """Decoded rendition if it is already in the cache, else None (never touches disk)"""
+        return self.cache.get((filename, Config.IMAGE_RENDITIONS[rendition], rendition), count_miss=False)
+    
+    def load_rendition(self, filename, rendition):
+        """Decoded pre-rendered image at its exact display size (no runtime resize)"""
+        key = (filename, Config.IMAGE_RENDITIONS[rendition], rendition)
+        img = self.cache.get(key)
+        if img is not None:
+            return img
+        
+        rendition_path = self.get_rendition_path(filename, rendition)
+        if not rendition_path:
+            return None
+        
+        if not os.path.exists(rendition_path):
+            # Not migrated yet: render it once from the original
+            original_path = self.get_image_path(filename)
+            if not os.path.exists(original_path) or not self.create_renditions(original_path, filename, [rendition]):
+                return None
+        
+        with Image.open(rendition_path) as img:
+            img.load()
+        
+        self.cache.put(key, img)
+        return img
+    
+    def load_rendition_for_display(self, filename, rendition):
+        """Load a named rendition for Tkinter display"""
+        try:
+            img = self.load_rendition(filename, rendition)
+            
+            if img is None:
+                return self.get_placeholder_image(Config.IMAGE_RENDITIONS[rendition])
+            
+            return ImageTk.PhotoImage(img)
+            
+        except Exception as e:
+            print(f"Error loading image: {e}")
+            return self.get_placeholder_image(Config.IMAGE_RENDITIONS[rendition])
+    
     def load_image_for_display(self, filename, size=None, thumbnail=False):
         """Load image for Tkinter display"""
         try:
-            image_path = self.get_image_path(filename, thumbnail)
+            img = self.load_image(filename, size, thumbnail)
             
-            if not image_path or not os.path.exists(image_path):
+            if img is None:
                 return self.get_placeholder_image(size)
             
-            # Open and resize image
-            with Image.open(image_path) as img:
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                if size:
-                    img = img.resize(size, Image.Resampling.LANCZOS)
-                
-                return ImageTk.PhotoImage(img)
+            return ImageTk.PhotoImage(img)
                 
         except Exception as e:
             print(f"Error loading image: {e}")
             return self.get_placeholder_image(size)
     
     def get_placeholder_image(self, size=None):
-        """Create placeholder image"""
+        """Placeholder image, created once per size"""
         try:
             if not size:
                 size = Config.PROPERTY_IMAGE_SIZE
+            size = tuple(size)
             
-            # Create a simple placeholder
-            img = Image.new('RGB', size, color='#E1E8ED')
+            if size not in self.placeholders:
+                # Create a simple placeholder
+                img = Image.new('RGB', size, color='#E1E8ED')
+                self.placeholders[size] = ImageTk.PhotoImage(img)
             
-            return ImageTk.PhotoImage(img)
+            return self.placeholders[size]
             
         except Exception as e:
             print(f"Error creating placeholder: {e}")
             return None
+    
+    def cache_stats(self):
+        """Hit/miss metrics of the decoded-image cache"""
+        stats = self.cache.stats()
+        stats['placeholders'] = len(self.placeholders)
+        return stats
+
+def ingest_with_progress(image_manager, image_paths):
+    """ImageManager.ingest_images reporting progress to the current background task"""
+    task = current_task()
+    
+    def on_result(done, total, result):
+        if task:
+            task.check_cancelled()
+            task.report_progress(done / total, f"Uploading {done}/{total}...")
+    
+    return image_manager.ingest_images(image_paths, on_result=on_result)
 
 class ImageUploadWidget(tk.Frame):
-    def __init__(self, parent, on_image_selected=None, **kwargs):
+    def __init__(self, parent, on_image_selected=None, on_image_removed=None, **kwargs):
         super().__init__(parent, **kwargs)
         
         self.on_image_selected = on_image_selected
-        self.image_manager = ImageManager()
+        self.on_image_removed = on_image_removed
+        self.image_manager = get_image_manager()
+        self.task_runner = TaskRunner(self)
         self.current_image = None
         self.current_filename = None
+        self.image_metadata = {}  # filename -> describe_image metadata of uploads
         
         self.create_widgets()
     
@@ -157,9 +680,9 @@ class ImageUploadWidget(tk.Frame):
         button_frame = tk.Frame(self, bg=Config.CARD_COLOR)
         button_frame.pack(fill="x", padx=10, pady=(0, 10))
         
-        upload_btn = tk.Button(
+        self.upload_btn = tk.Button(
             button_frame,
-            text="Upload Image",
+            text="Upload Images",
             command=self.upload_image,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
             bg=Config.PRIMARY_COLOR,
@@ -167,7 +690,7 @@ class ImageUploadWidget(tk.Frame):
             relief="flat",
             cursor="hand2"
         )
-        upload_btn.pack(side="left", padx=(0, 5))
+        self.upload_btn.pack(side="left", padx=(0, 5))
         
         self.remove_btn = tk.Button(
             button_frame,
@@ -182,11 +705,23 @@ class ImageUploadWidget(tk.Frame):
         )
         self.remove_btn.pack(side="left")
         
+        self.status_label = tk.Label(
+            button_frame,
+            text="",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            bg=Config.CARD_COLOR,
+            fg=Config.TEXT_SECONDARY
+        )
+        self.status_label.pack(side="left", padx=(10, 0))
+        
         # Bind click event to image label
         self.image_label.bind("<Button-1>", lambda e: self.upload_image())
     
     def upload_image(self):
-        """Handle image upload"""
+        """Handle image upload (several files may be selected)"""
+        if self.task_runner.is_busy():
+            return
+        
         file_types = [
             ("Image files", "*.jpg *.jpeg *.png *.gif *.bmp"),
             ("JPEG files", "*.jpg *.jpeg"),
@@ -194,32 +729,55 @@ class ImageUploadWidget(tk.Frame):
             ("All files", "*.*")
         ]
         
-        filename = filedialog.askopenfilename(
-            title="Select Property Image",
+        filenames = filedialog.askopenfilenames(
+            title="Select Property Images",
             filetypes=file_types
         )
         
-        if filename:
-            # Save image using ImageManager
-            saved_filename = self.image_manager.save_property_image(filename)
-            
-            if saved_filename:
-                self.current_filename = saved_filename
-                self.display_image(saved_filename)
-                self.remove_btn.configure(state="normal")
-                
-                if self.on_image_selected:
-                    self.on_image_selected(saved_filename)
-            else:
-                messagebox.showerror("Error", "Failed to upload image")
+        if filenames:
+            self.upload_btn.configure(state="disabled")
+            self.task_runner.submit(
+                "upload",
+                ingest_with_progress,
+                self.image_manager,
+                list(filenames),
+                on_success=self.on_upload_done,
+                on_error=self.on_upload_error,
+                on_progress=self.on_upload_progress
+            )
+    
+    def on_upload_progress(self, fraction, message):
+        self.status_label.configure(text=message or "")
+    
+    def on_upload_done(self, results):
+        """Show the last uploaded image and report each saved file"""
+        self.upload_btn.configure(state="normal")
+        self.status_label.configure(text="")
+        
+        saved_filenames = [saved_filename for _, saved_filename, _ in results if saved_filename]
+        self.image_metadata.update((saved_filename, metadata) for _, saved_filename, metadata in results if saved_filename)
+        for saved_filename in saved_filenames:
+            if self.on_image_selected:
+                self.on_image_selected(saved_filename)
+        
+        if saved_filenames:
+            self.current_filename = saved_filenames[-1]
+            self.display_image(self.current_filename)
+            self.remove_btn.configure(state="normal")
+        
+        failed = len(results) - len(saved_filenames)
+        if failed:
+            messagebox.showerror("Error", f"Failed to upload {failed} of {len(results)} images")
+    
+    def on_upload_error(self, error):
+        self.upload_btn.configure(state="normal")
+        self.status_label.configure(text="")
+        messagebox.showerror("Error", f"Failed to upload images: {str(error)}")
     
     def display_image(self, filename):
         """Display uploaded image"""
         try:
-            self.current_image = self.image_manager.load_image_for_display(
-                filename, 
-                size=(250, 150)
-            )
+            self.current_image = self.image_manager.load_rendition_for_display(filename, "preview")
             
             if self.current_image:
                 self.image_label.configure(
@@ -234,7 +792,11 @@ class ImageUploadWidget(tk.Frame):
     def remove_image(self):
         """Remove current image"""
         if self.current_filename:
-            self.image_manager.delete_image(self.current_filename)
+            if self.on_image_removed:
+                self.on_image_removed(self.current_filename)
+            
+            # Stored files are content-addressed and may be shared with other
+            # listings, so an unreferenced upload is left to image_maintenance gc
             self.current_filename = None
             self.current_image = None
             
@@ -266,7 +828,8 @@ class ImageGalleryWidget(tk.Frame):
         
         self.property_id = property_id
         self.db_manager = db_manager
-        self.image_manager = ImageManager()
+        self.image_manager = get_image_manager()
+        self.task_runner = TaskRunner(self)
         self.images = []
         
         self.create_widgets()
@@ -287,9 +850,9 @@ class ImageGalleryWidget(tk.Frame):
             fg=Config.TEXT_PRIMARY
         ).pack(side="left")
         
-        add_btn = tk.Button(
+        self.add_btn = tk.Button(
             header_frame,
-            text="+ Add Image",
+            text="+ Add Images",
             command=self.add_image,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
             bg=Config.SUCCESS_COLOR,
@@ -297,7 +860,16 @@ class ImageGalleryWidget(tk.Frame):
             relief="flat",
             cursor="hand2"
         )
-        add_btn.pack(side="right")
+        self.add_btn.pack(side="right")
+        
+        self.status_label = tk.Label(
+            header_frame,
+            text="",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            bg=Config.CARD_COLOR,
+            fg=Config.TEXT_SECONDARY
+        )
+        self.status_label.pack(side="right", padx=10)
         
         # Images container with scrollbar
         self.create_scrollable_gallery()
@@ -342,17 +914,15 @@ class ImageGalleryWidget(tk.Frame):
             image_frame = tk.Frame(self.gallery_frame, bg=Config.CARD_COLOR)
             image_frame.pack(side="left", padx=5, pady=5)
             
-            # Load and display image
+            # Placeholder now, decoded image once a worker has it
             try:
-                img = self.image_manager.load_image_for_display(
-                    image_data['image_path'],
-                    size=(150, 100),
-                    thumbnail=True
-                )
+                size = Config.IMAGE_RENDITIONS["gallery"]
+                placeholder = (self.image_manager.blurhash_preview_for_display(image_data.get('blurhash'), size)
+                               or self.image_manager.get_placeholder_image(size))
                 
                 image_label = tk.Label(
                     image_frame,
-                    image=img,
+                    image=placeholder,
                     bg="white",
                     relief="solid",
                     borderwidth=1
@@ -360,7 +930,8 @@ class ImageGalleryWidget(tk.Frame):
                 image_label.pack()
                 
                 # Keep reference to prevent garbage collection
-                image_label.image = img
+                image_label.image = placeholder
+                get_image_loader(self).load(image_label, image_data['image_path'], "gallery")
                 
                 # Primary indicator
                 if image_data.get('is_primary'):
@@ -408,35 +979,62 @@ class ImageGalleryWidget(tk.Frame):
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
     
     def add_image(self):
-        """Add new image to property"""
+        """Add new images to property (several files may be selected)"""
+        if self.task_runner.is_busy():
+            return
+        
         file_types = [
             ("Image files", "*.jpg *.jpeg *.png *.gif *.bmp"),
             ("All files", "*.*")
         ]
         
-        filename = filedialog.askopenfilename(
-            title="Select Property Image",
+        filenames = filedialog.askopenfilenames(
+            title="Select Property Images",
             filetypes=file_types
         )
         
-        if filename:
-            saved_filename = self.image_manager.save_property_image(filename)
-            
-            if saved_filename:
-                # Add to database
-                is_primary = len(self.images) == 0  # First image is primary
-                success = self.db_manager.add_property_image(
-                    self.property_id, 
-                    saved_filename, 
-                    is_primary
-                )
-                
-                if success:
-                    self.load_images()  # Refresh gallery
-                else:
-                    messagebox.showerror("Error", "Failed to save image to database")
-            else:
-                messagebox.showerror("Error", "Failed to upload image")
+        if filenames:
+            self.add_btn.configure(state="disabled")
+            self.task_runner.submit(
+                "upload",
+                self.ingest_images,
+                list(filenames),
+                len(self.images) == 0,  # First image is primary
+                on_success=self.on_upload_done,
+                on_error=self.on_upload_error,
+                on_progress=self.on_upload_progress
+            )
+    
+    def ingest_images(self, filenames, first_is_primary):
+        """Save the files and insert all their rows in one batch (worker thread)"""
+        results = ingest_with_progress(self.image_manager, filenames)
+        
+        saved = [(saved_filename, metadata) for _, saved_filename, metadata in results if saved_filename]
+        saved_filenames = [saved_filename for saved_filename, _ in saved]
+        if saved and not self.db_manager.add_property_images(
+                self.property_id, saved_filenames, first_is_primary, metadata=[metadata for _, metadata in saved]):
+            # Files may be shared with other listings; unreferenced ones are left to gc
+            raise RuntimeError("Failed to save images to database")
+        
+        return len(saved_filenames), len(filenames) - len(saved_filenames)
+    
+    def on_upload_progress(self, fraction, message):
+        self.status_label.configure(text=message or "")
+    
+    def on_upload_done(self, counts):
+        saved, failed = counts
+        self.add_btn.configure(state="normal")
+        self.status_label.configure(text="")
+        
+        if saved:
+            self.load_images()  # Refresh gallery
+        if failed:
+            messagebox.showerror("Error", f"Failed to upload {failed} of {saved + failed} images")
+    
+    def on_upload_error(self, error):
+        self.add_btn.configure(state="normal")
+        self.status_label.configure(text="")
+        messagebox.showerror("Error", f"Failed to upload images: {str(error)}")
     
     def set_primary(self, image_id):
         """Set image as primary"""
@@ -455,8 +1053,9 @@ class ImageGalleryWidget(tk.Frame):
             success = self.db_manager.delete_property_image(image_id)
             
             if success:
-                # Delete file
-                self.image_manager.delete_image(image_path)
+                # The stored file is shared by content and may be about to gain a reference (an
+                # upload deduplicated against it, an unsaved dialog); image_maintenance gc reclaims
+                # it once unreferenced past its grace period
                 self.load_images()  # Refresh gallery
             else:
                 messagebox.showerror("Error", "Failed to delete image")
\ No newline at end of file
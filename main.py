@@ -1,14 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
+import time
 from database import DatabaseManager
 from auth import AuthWindow
 from admin_auth import AdminAuthWindow
 from admin_dashboard import AdminDashboard
 from property_details import PropertyDetailsWindow
-from ui_components import ModernButton, PropertyCard, SearchFilter
+from ui_components import ModernButton, PropertyCard, SearchFilter, BusyIndicator, VirtualPropertyGrid
 from config import Config
 from user_profile import UserProfileWindow
+from task_runner import TaskRunner
+from property_search import PropertySearch
 
 class RealEstateApp:
     def __init__(self):
@@ -28,8 +31,17 @@ class RealEstateApp:
         self.current_listing_type = "sale"  # or "rent"
         self.current_filters = {}
         
+        # Last fetched result set, used to answer refinements in memory
+        self.property_search = PropertySearch(max_age=Config.SEARCH_CACHE_MAX_AGE)
+        
+        # Background loads (superseded by newer requests of the same kind)
+        self.task_runner = TaskRunner(self.root, on_busy_change=self.on_busy_change)
+        
         self.create_widgets()
         self.load_properties()
+        
+        # Buffered activity events and audit entries are written on the way out
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def create_widgets(self):
         # Create main container
@@ -117,7 +129,8 @@ class RealEstateApp:
         # Search and filters
         self.search_filter = SearchFilter(
             content_frame,
-            on_filter_change=self.apply_filters
+            on_filter_change=self.apply_filters,
+            on_refresh=self.refresh_properties
         )
         self.search_filter.pack(fill="x", pady=(0, 20))
         
@@ -129,40 +142,22 @@ class RealEstateApp:
         self.create_scrollable_properties()
     
     def create_scrollable_properties(self):
-        """Create scrollable frame for property listings with grid layout"""
-        # Canvas and scrollbar
-        canvas = tk.Canvas(self.properties_container, bg=Config.BACKGROUND_COLOR, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.properties_container, orient="vertical", command=canvas.yview)
-        
-        self.properties_frame = tk.Frame(canvas, bg=Config.BACKGROUND_COLOR)
-        
-        # Configure scrolling
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.create_window((0, 0), window=self.properties_frame, anchor="nw")
-        
-        # Pack canvas and scrollbar
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # Update scroll region when frame changes
-        def configure_scroll_region(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-            # Update canvas window width to match canvas width
-            canvas_width = canvas.winfo_width()
-            canvas.itemconfig(canvas.create_window((0, 0), window=self.properties_frame, anchor="nw"), width=canvas_width)
-        
-        self.properties_frame.bind("<Configure>", configure_scroll_region)
-        canvas.bind("<Configure>", configure_scroll_region)
-        
-        # Mouse wheel scrolling
-        def on_mousewheel(event):
-            canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        
-        canvas.bind("<MouseWheel>", on_mousewheel)
-        
-        # Store references
-        self.canvas = canvas
-        self.scrollbar = scrollbar
+        """Create the virtualized 3-column grid for property listings"""
+        self.property_grid = VirtualPropertyGrid(
+            self.properties_container,
+            create_card=self.create_property_card,
+            columns=3,
+            card_height=300
+        )
+        self.property_grid.pack(fill="both", expand=True)
+    
+    def create_property_card(self, parent, property_data):
+        """Card factory used by the property grid"""
+        return PropertyCard(
+            parent,
+            property_data,
+            on_click=self.handle_property_action
+        )
     
     def create_status_bar(self):
         """Create status bar at bottom"""
@@ -179,6 +174,14 @@ class RealEstateApp:
             anchor="w"
         )
         self.status_label.pack(side="left", padx=10, pady=2)
+        
+        self.busy_indicator = BusyIndicator(self.status_bar)
+        self.busy_indicator.pack(side="right", padx=10, pady=2)
+    
+    def on_busy_change(self, busy, message):
+        """Reflect background task activity in the status bar"""
+        self.busy_indicator.set_busy(busy, message)
+        self.root.configure(cursor="watch" if busy else "")
     
     def update_user_display(self):
         """Update user display in header"""
@@ -263,6 +266,7 @@ class RealEstateApp:
     def switch_listing_type(self, listing_type):
         """Switch between sale and rent listings"""
         self.current_listing_type = listing_type
+        self.property_search.invalidate()
         
         # Update button styles
         if listing_type == "sale":
@@ -279,68 +283,56 @@ class RealEstateApp:
         self.current_filters = filters
         self.load_properties()
     
+    def refresh_properties(self, filters):
+        """Apply search filters from an explicit Apply or Clear, re-querying the database"""
+        self.property_search.invalidate()
+        self.apply_filters(filters)
+    
     def load_properties(self):
-        """Load and display properties in a 3-column grid"""
-        # Clear existing properties
-        for widget in self.properties_frame.winfo_children():
-            widget.destroy()
+        """Query properties in the background; a newer request supersedes this one"""
+        started = time.perf_counter()
+        listing_type = self.current_listing_type
+        filters = self.current_filters
+        # Read before querying, so a write that lands during the query invalidates its results
+        version = self.db_manager.listings_version
+        
+        # Refinements of the last result set are filtered in memory
+        cached = self.property_search.lookup(listing_type, filters, version)
+        if cached is not None:
+            self.task_runner.cancel("properties")
+            self.display_properties(cached, started)
+            return
         
-        # Get properties from database
-        properties = self.db_manager.get_properties(
-            listing_type=self.current_listing_type,
-            filters=self.current_filters
+        def on_loaded(properties):
+            self.property_search.store(listing_type, filters, properties, version)
+            self.display_properties(properties, started)
+        
+        self.task_runner.submit(
+            "properties",
+            self.db_manager.get_properties,
+            listing_type=listing_type,
+            filters=filters,
+            on_success=on_loaded,
+            on_error=lambda e: self.update_status(f"Error loading properties: {e}"),
+            description="Loading properties..."
+        )
+    
+    def display_properties(self, properties, started=None):
+        """Display properties in the 3-column grid"""
+        self.property_grid.set_items(
+            properties,
+            empty_text="No properties found matching your criteria."
         )
         
         if not properties:
-            # No properties found
-            no_props_label = tk.Label(
-                self.properties_frame,
-                text="No properties found matching your criteria.",
-                font=(Config.FONT_FAMILY, Config.FONT_SIZE_LARGE),
-                bg=Config.BACKGROUND_COLOR,
-                fg=Config.TEXT_SECONDARY
-            )
-            no_props_label.grid(row=0, column=0, columnspan=3, pady=50)
             self.update_status("No properties found")
             return
         
-        # Configure grid columns to be equal width
-        self.properties_frame.columnconfigure(0, weight=1, uniform="column")
-        self.properties_frame.columnconfigure(1, weight=1, uniform="column")
-        self.properties_frame.columnconfigure(2, weight=1, uniform="column")
-        
-        # Display properties in 3-column grid
-        for i, property_data in enumerate(properties):
-            row = i // 3
-            col = i % 3
-            
-            # Create property card with fixed width for grid consistency
-            property_card = PropertyCard(
-                self.properties_frame,
-                property_data,
-                on_click=self.handle_property_action,
-                width=350,  # Fixed width for consistent grid
-                height=280  # Fixed height for consistent grid
-            )
-            
-            # Grid the property card with padding
-            property_card.grid(
-                row=row, 
-                column=col, 
-                padx=10, 
-                pady=10, 
-                sticky="ew"
-            )
-            
-            # Prevent the card from shrinking
-            property_card.grid_propagate(False)
-        
-        # Update status
-        self.update_status(f"Found {len(properties)} properties")
-        
-        # Update canvas scroll region
-        self.properties_frame.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Update status with search-to-results latency (after the debounce fired)
+        status = f"Found {len(properties)} properties"
+        if started is not None:
+            status += f" ({(time.perf_counter() - started) * 1000:.0f} ms)"
+        self.update_status(status)
     
     def handle_property_action(self, property_data, action_type="view"):
         """Handle property actions (view details or quick transaction)"""
@@ -372,6 +364,12 @@ class RealEstateApp:
         # Auto-clear status after 5 seconds
         self.root.after(5000, lambda: self.status_label.configure(text="Ready"))
     
+    def on_close(self):
+        """Flush buffered writes, close the database and quit"""
+        self.task_runner.shutdown()
+        self.db_manager.close_connection()
+        self.root.destroy()
+    
     def run(self):
         """Run the application"""
         # Center the window
@@ -380,7 +378,11 @@ class RealEstateApp:
         y = (self.root.winfo_screenheight() // 2) - (Config.WINDOW_HEIGHT // 2)
         self.root.geometry(f"{Config.WINDOW_WIDTH}x{Config.WINDOW_HEIGHT}+{x}+{y}")
         
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            # Also on Ctrl+C; closing twice is harmless
+            self.db_manager.close_connection()
 
 if __name__ == "__main__":
     app = RealEstateApp()
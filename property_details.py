@@ -1,8 +1,12 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import ttk, messagebox
+from datetime import date
 from ui_components import ModernButton
 from config import Config
-from image_manager import ImageManager, ImageGalleryWidget
+from task_runner import TaskRunner
+from image_manager import get_image_manager, ImageGalleryWidget
+from comps_engine import get_comps_engine
+from analytics_engine import to_day
 
 class PropertyDetailsWindow:
     def __init__(self, parent, property_data, db_manager, current_user=None):
@@ -10,7 +14,7 @@ class PropertyDetailsWindow:
         self.property_data = property_data
         self.db_manager = db_manager
         self.current_user = current_user
-        self.image_manager = ImageManager()
+        self.image_manager = get_image_manager()
         
         self.window = tk.Toplevel(parent)
         self.window.title(f"Property Details - {property_data['title']}")
@@ -22,6 +26,11 @@ class PropertyDetailsWindow:
         self.window.grab_set()
         
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window)
+        self.load_comps()
+        
+        # Top of the view -> favorite -> transaction funnel
+        self.db_manager.record_event('view', self.current_user['id'] if self.current_user else None, property_data['id'])
     
     def create_widgets(self):
         # Create scrollable main container
@@ -246,6 +255,9 @@ class PropertyDetailsWindow:
                 anchor="w"
             ).pack(side="left", padx=(10, 0))
         
+        # Comparable properties
+        self.create_comps_section(content_frame)
+        
         # Action buttons
         action_frame = tk.Frame(content_frame, bg=Config.BACKGROUND_COLOR)
         action_frame.pack(fill="x", pady=(20, 0))
@@ -312,10 +324,7 @@ class PropertyDetailsWindow:
         try:
             primary_image = self.property_data.get('primary_image')
             if primary_image:
-                img = self.image_manager.load_image_for_display(
-                    primary_image, 
-                    size=(600, 300)
-                )
+                img = self.image_manager.load_rendition_for_display(primary_image, "detail")
                 
                 image_label = tk.Label(
                     main_image_frame,
@@ -362,6 +371,101 @@ class PropertyDetailsWindow:
         )
         gallery_widget.pack(fill="x", padx=20, pady=(0, 20))
     
+    def create_comps_section(self, parent):
+        """Similar active listings and recent closed deals, filled in by load_comps"""
+        comps_frame = tk.Frame(parent, bg=Config.CARD_COLOR, relief="solid", borderwidth=1)
+        comps_frame.pack(fill="x", pady=(0, 20))
+        
+        comps_content = tk.Frame(comps_frame, bg=Config.CARD_COLOR, padx=20, pady=20)
+        comps_content.pack(fill="both", expand=True)
+        
+        comps_header = tk.Label(
+            comps_content,
+            text="Comparable Properties",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_LARGE, "bold"),
+            bg=Config.CARD_COLOR,
+            fg=Config.TEXT_PRIMARY,
+            anchor="w"
+        )
+        comps_header.pack(fill="x", pady=(0, 10))
+        
+        closed_title = "Recent Sales" if self.property_data['listing_type'] == 'sale' else "Recent Rentals"
+        columns = ("Property", "Beds/Baths", "Sq Ft", "Price", "City")
+        self.comps_trees = {}
+        for key, title in (('listings', "Similar Listings"), ('closed', closed_title)):
+            tk.Label(
+                comps_content,
+                text=title,
+                font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
+                bg=Config.CARD_COLOR,
+                fg=Config.TEXT_PRIMARY,
+                anchor="w"
+            ).pack(fill="x", pady=(5, 5))
+            
+            tree = ttk.Treeview(comps_content, columns=columns, show="headings", height=Config.COMPS_COUNT)
+            for col in columns:
+                tree.heading(col, text=col)
+                tree.column(col, width=240 if col == "Property" else 100)
+            tree.insert("", "end", values=("Loading...", "", "", "", ""))
+            tree.bind("<Double-1>", lambda e, key=key: self.open_comp(key))
+            tree.pack(fill="x")
+            self.comps_trees[key] = tree
+        self.comps = {}
+    
+    def load_comps(self):
+        """Find comparable properties in the background"""
+        self.task_runner.submit(
+            "comps",
+            self.fetch_comps,
+            on_success=self.display_comps,
+            on_error=lambda e: print(f"Error loading comparable properties: {e}"),
+            description="Finding comparable properties..."
+        )
+    
+    def fetch_comps(self):
+        """Bring the comps index up to date, search it and load the matches (worker thread)"""
+        engine = get_comps_engine()
+        engine.refresh(self.db_manager)
+        since_day = to_day(date.today()) - Config.COMPS_CLOSED_DAYS
+        
+        comps = {}
+        for key, closed in (('listings', False), ('closed', True)):
+            matches = engine.nearest(self.property_data, Config.COMPS_COUNT, closed=closed, since_day=since_day)
+            ids = [property_id for _, property_id in matches]
+            comps[key] = self.db_manager.get_properties_by_ids(ids)
+            
+            # Deleted since the index last saw them
+            found = {prop['id'] for prop in comps[key]}
+            for property_id in ids:
+                if property_id not in found:
+                    engine.remove(property_id)
+        return comps
+    
+    def display_comps(self, comps):
+        self.comps = comps
+        suffix = "/month" if self.property_data['listing_type'] == 'rent' else ""
+        for key, tree in self.comps_trees.items():
+            for item in tree.get_children():
+                tree.delete(item)
+            if not comps[key]:
+                tree.insert("", "end", values=("No comparable properties found", "", "", "", ""))
+            for index, prop in enumerate(comps[key]):
+                price = prop['sale_price'] if key == 'closed' and prop['sale_price'] else prop['price']
+                tree.insert("", "end", iid=str(index), values=(
+                    prop['title'][:40] + "..." if len(prop['title']) > 40 else prop['title'],
+                    f"{prop['bedrooms']} bd / {prop['bathrooms']} ba",
+                    f"{prop['square_feet']:,}" if prop['square_feet'] else "N/A",
+                    f"${price:,.0f}{suffix}",
+                    prop['city']
+                ))
+    
+    def open_comp(self, key):
+        """Open the double-clicked comparable in its own details window"""
+        selection = self.comps_trees[key].selection()
+        if not selection or not selection[0].isdigit() or key not in self.comps:
+            return
+        PropertyDetailsWindow(self.window, self.comps[key][int(selection[0])], self.db_manager, self.current_user)
+    
     def handle_purchase(self):
         """Handle property purchase"""
         if not self.current_user:
@@ -1,8 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ui_components import ModernButton, ModernEntry
+from ui_components import ModernButton, ModernEntry, BusyIndicator
 from config import Config
+from task_runner import TaskRunner
 from image_manager import ImageUploadWidget, ImageGalleryWidget
+from comps_engine import get_comps_engine
+from avm import run_valuations
+
+def is_mispriced(prop):
+    """Asking price outside the valuation band and at least AVM_FLAG_RATIO away from the estimate"""
+    if not prop.get('valuation') or prop['status'] != 'available':
+        return False
+    estimate, low, high = prop['valuation']
+    price = float(prop['price'])
+    return (price < low or price > high) and abs(price / estimate - 1) >= Config.AVM_FLAG_RATIO
+
+def valuation_text(prop):
+    if not prop.get('valuation'):
+        return "Not valued"
+    estimate, low, high = prop['valuation']
+    text = f"${estimate:,.0f} (${low:,.0f} - ${high:,.0f})"
+    if is_mispriced(prop):
+        text += f"\nPriced {float(prop['price']) / estimate - 1:+.0%} vs estimate"
+    return text
 
 class PropertyManagementWindow:
     def __init__(self, parent, db_manager, admin_user):
@@ -18,6 +38,7 @@ class PropertyManagementWindow:
         self.selected_property = None
         
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window, on_busy_change=self.busy_indicator.set_busy)
         self.load_properties()
     
     def create_widgets(self):
@@ -46,6 +67,10 @@ class PropertyManagementWindow:
         )
         close_btn.pack(side="right")
         
+        # Background activity indicator
+        self.busy_indicator = BusyIndicator(header_content, bg=Config.PRIMARY_COLOR, fg="white")
+        self.busy_indicator.pack(side="right", padx=(0, 20))
+        
         # Main content
         main_frame = tk.Frame(self.window, bg=Config.BACKGROUND_COLOR)
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -77,24 +102,37 @@ class PropertyManagementWindow:
         )
         refresh_btn.pack(side="right")
         
+        valuation_btn = ModernButton(
+            list_header,
+            text="Run Valuations",
+            command=self.run_valuations,
+            style="outline",
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            padx=10,
+            pady=5
+        )
+        valuation_btn.pack(side="right", padx=(0, 10))
+        
         # Properties treeview
         tree_frame = tk.Frame(left_panel, bg=Config.CARD_COLOR)
         tree_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         
         # Treeview with scrollbar
-        self.tree = ttk.Treeview(tree_frame, columns=("ID", "Title", "Type", "Price", "Status"), show="headings")
+        self.tree = ttk.Treeview(tree_frame, columns=("ID", "Title", "Type", "Price", "Estimate", "Status"), show="headings")
         
         # Configure columns
         self.tree.heading("ID", text="ID")
         self.tree.heading("Title", text="Title")
         self.tree.heading("Type", text="Type")
         self.tree.heading("Price", text="Price")
+        self.tree.heading("Estimate", text="Estimate")
         self.tree.heading("Status", text="Status")
         
         self.tree.column("ID", width=50)
         self.tree.column("Title", width=200)
         self.tree.column("Type", width=100)
         self.tree.column("Price", width=100)
+        self.tree.column("Estimate", width=100)
         self.tree.column("Status", width=100)
         
         # Scrollbar for treeview
@@ -104,6 +142,9 @@ class PropertyManagementWindow:
         self.tree.pack(side="left", fill="both", expand=True)
         tree_scrollbar.pack(side="right", fill="y")
         
+        # Listings priced well outside their automated valuation
+        self.tree.tag_configure("mispriced", foreground=Config.ERROR_COLOR)
+        
         # Bind selection event
         self.tree.bind("<<TreeviewSelect>>", self.on_property_select)
         
@@ -159,30 +200,75 @@ class PropertyManagementWindow:
         self.delete_btn.configure(state="disabled")
     
     def load_properties(self):
-        """Load all properties into the treeview"""
+        """Load all properties in the background"""
+        self.task_runner.submit(
+            "properties",
+            self.db_manager.get_all_properties_admin,
+            on_success=self.display_properties,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load properties: {str(e)}"),
+            description="Loading properties..."
+        )
+    
+    def display_properties(self, properties):
+        """Fill the treeview with loaded properties"""
         # Clear existing items
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         try:
-            properties = self.db_manager.get_all_properties_admin()
-            
             for prop in properties:
                 price_text = f"${prop['price']:,.0f}"
                 if prop['listing_type'] == 'rent':
                     price_text += "/mo"
                 
+                estimate_text = ""
+                if prop.get('valuation') and prop['status'] == 'available':
+                    estimate_text = f"${prop['valuation'][0]:,.0f}"
+                    if is_mispriced(prop):
+                        estimate_text += " ⚠"
+                
                 self.tree.insert("", "end", values=(
                     prop['id'],
                     prop['title'][:30] + "..." if len(prop['title']) > 30 else prop['title'],
                     prop['property_type'],
                     price_text,
+                    estimate_text,
                     prop['status'].title()
-                ))
+                ), tags=("mispriced",) if is_mispriced(prop) else ())
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load properties: {str(e)}")
     
+    def run_valuations(self):
+        """Retrain the valuation model and rescore every available listing in the background"""
+        self.task_runner.submit(
+            "valuations",
+            run_valuations,
+            self.db_manager,
+            on_success=self.on_valuations_done,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to run valuations: {str(e)}"),
+            description="Valuing listings..."
+        )
+    
+    def on_valuations_done(self, summary):
+        """Report the run and show the new estimates"""
+        if not summary['models']:
+            messagebox.showinfo(
+                "Valuations",
+                f"Not enough completed transactions to train a model "
+                f"(at least {Config.AVM_MIN_TRAINING_ROWS} per listing type are needed)."
+            )
+            return
+        
+        lines = [f"Valued {summary['scored']:,} available listings."]
+        for listing_type, metrics in summary['models'].items():
+            line = f"{listing_type.title()}: trained on {metrics['training_rows']:,} transactions"
+            if metrics.get('holdout_rows'):
+                line += f", median error {metrics['median_abs_error']:.1%}"
+            lines.append(line)
+        messagebox.showinfo("Valuations", "\n".join(lines))
+        self.load_properties()
+    
     def on_property_select(self, event):
         """Handle property selection"""
         selection = self.tree.selection()
@@ -219,6 +305,7 @@ class PropertyManagementWindow:
             ("State", prop['state']),
             ("ZIP", prop['zip_code']),
             ("Price", f"${prop['price']:,.0f}"),
+            ("Estimate", valuation_text(prop)),
             ("Bedrooms", str(prop['bedrooms'])),
             ("Bathrooms", str(prop['bathrooms'])),
             ("Sq Ft", f"{prop['square_feet']:,}"),
@@ -284,7 +371,8 @@ class PropertyManagementWindow:
         if not self.selected_property:
             return
         
-        PropertyEditDialog(self.window, self.db_manager, self.selected_property, self.on_property_updated)
+        PropertyEditDialog(self.window, self.db_manager, self.selected_property, self.on_property_updated,
+                           actor_id=self.admin_user['id'])
     
     def delete_property(self):
         """Delete selected property"""
@@ -300,8 +388,9 @@ class PropertyManagementWindow:
         
         if result:
             try:
-                success = self.db_manager.delete_property(self.selected_property['id'])
+                success = self.db_manager.delete_property(self.selected_property['id'], actor_id=self.admin_user['id'])
                 if success:
+                    get_comps_engine().remove(self.selected_property['id'])
                     messagebox.showinfo("Success", "Property deleted successfully")
                     self.load_properties()
                     self.clear_details()
@@ -312,7 +401,8 @@ class PropertyManagementWindow:
     
     def add_property(self):
         """Open add property dialog"""
-        PropertyEditDialog(self.window, self.db_manager, None, self.on_property_updated)
+        PropertyEditDialog(self.window, self.db_manager, None, self.on_property_updated,
+                           actor_id=self.admin_user['id'])
     
     def on_property_updated(self):
         """Callback when property is updated/added"""
@@ -329,11 +419,12 @@ class PropertyManagementWindow:
         self.delete_btn.configure(state="disabled")
 
 class PropertyEditDialog:
-    def __init__(self, parent, db_manager, property_data, on_success_callback):
+    def __init__(self, parent, db_manager, property_data, on_success_callback, actor_id=None):
         self.parent = parent
         self.db_manager = db_manager
         self.property_data = property_data
         self.on_success_callback = on_success_callback
+        self.actor_id = actor_id  # Admin recorded in the audit trail
         
         self.window = tk.Toplevel(parent)
         self.window.title("Edit Property" if property_data else "Add Property")
@@ -434,7 +525,8 @@ class PropertyEditDialog:
             # Image upload widget for new property
             self.image_upload = ImageUploadWidget(
                 image_section,
-                on_image_selected=self.on_image_selected
+                on_image_selected=self.on_image_selected,
+                on_image_removed=self.on_image_removed
             )
             self.image_upload.pack(padx=20, pady=(0, 20))
         
@@ -494,6 +586,11 @@ class PropertyEditDialog:
         if filename:
             self.uploaded_images.append(filename)
     
+    def on_image_removed(self, filename):
+        """Forget an upload removed before the property was saved"""
+        if filename in self.uploaded_images:
+            self.uploaded_images.remove(filename)
+    
     def populate_fields(self):
         """Populate fields with existing property data"""
         if not self.property_data:
@@ -541,25 +638,23 @@ class PropertyEditDialog:
             # Save to database
             if self.property_data:
                 # Update existing property
-                success = self.db_manager.update_property(self.property_data['id'], data)
+                success = self.db_manager.update_property(self.property_data['id'], data, actor_id=self.actor_id)
                 message = "Property updated successfully"
             else:
                 # Create new property
-                success = self.db_manager.create_property(data)
+                property_id = self.db_manager.create_property(data)
+                success = property_id is not None
                 message = "Property created successfully"
                 
                 # Add uploaded images for new property
                 if success and self.uploaded_images:
-                    # Get the newly created property ID
-                    cursor = self.db_manager.connection.cursor()
-                    cursor.execute("SELECT LAST_INSERT_ID()")
-                    property_id = cursor.fetchone()[0]
-                    cursor.close()
-                    
-                    # Add images to the property
-                    for i, image_filename in enumerate(self.uploaded_images):
-                        is_primary = (i == 0)  # First image is primary
-                        self.db_manager.add_property_image(property_id, image_filename, is_primary)
+                    # Add images to the property; first image is primary
+                    self.db_manager.add_property_images(
+                        property_id,
+                        self.uploaded_images,
+                        first_is_primary=True,
+                        metadata=[self.image_upload.image_metadata.get(f) for f in self.uploaded_images]
+                    )
             
             if success:
                 messagebox.showinfo("Success", message)
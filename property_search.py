@@ -0,0 +1,109 @@
+import time
+from typing import Dict, List, Optional
+
+
+def normalize_filters(filters: Dict) -> Dict:
+    """Canonical form of a filter dict: empty values dropped, city trimmed and lowercased.
+
+    Mirrors DatabaseManager.get_properties, which ignores falsy filter values
+    and matches the city with a case-insensitive LIKE.
+    """
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if isinstance(value, str):
+            value = value.strip()
+        if not value:
+            continue
+        if key == 'city':
+            value = value.lower()
+        normalized[key] = value
+    return normalized
+
+
+def is_refinement(filters: Dict, base: Dict) -> bool:
+    """Whether every listing matching `filters` also matches `base` (both normalized)"""
+    for key, base_value in base.items():
+        value = filters.get(key)
+        if value is None:
+            return False
+        if key == 'city':
+            if base_value not in value:
+                return False
+        elif key in ('min_price', 'bedrooms'):
+            if value < base_value:
+                return False
+        elif key == 'max_price':
+            if value > base_value:
+                return False
+        elif value != base_value:
+            return False
+    return True
+
+
+def matches_filters(property_data: Dict, filters: Dict) -> bool:
+    """In-memory equivalent of the WHERE clause built by get_properties (normalized filters)"""
+    price = property_data['price']
+    if 'min_price' in filters and price < filters['min_price']:
+        return False
+    if 'max_price' in filters and price > filters['max_price']:
+        return False
+    if 'bedrooms' in filters and (property_data['bedrooms'] or 0) < filters['bedrooms']:
+        return False
+    if 'property_type' in filters and property_data['property_type'] != filters['property_type']:
+        return False
+    if 'city' in filters and filters['city'] not in property_data['city'].lower():
+        return False
+    return True
+
+
+def filter_properties(properties: List[Dict], filters: Dict) -> List[Dict]:
+    """Narrow an already-fetched result set to normalized `filters`, preserving order"""
+    if not filters:
+        return list(properties)
+    return [p for p in properties if matches_filters(p, filters)]
+
+
+class PropertySearch:
+    """Result cache that answers refinements of the last query without hitting MySQL.
+
+    get_properties has no LIMIT, so the last result set for a listing type is
+    complete; any narrower query can be served by filtering it in memory.
+    Cached results expire after `max_age` seconds, or as soon as the caller's
+    data version (DatabaseManager.listings_version) moves past the one they
+    were fetched at, so sold, rented and new listings show up.
+    """
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        self.base_listing_type = None
+        self.base_filters = None
+        self.base_results = None
+        self.base_time = 0.0
+        self.base_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, listing_type: str, filters: Dict, version=None) -> Optional[List[Dict]]:
+        """Serve the query from memory if it refines the cached one at the same data version, else None"""
+        filters = normalize_filters(filters)
+        if (self.base_results is not None
+                and listing_type == self.base_listing_type
+                and version == self.base_version
+                and time.monotonic() - self.base_time < self.max_age
+                and is_refinement(filters, self.base_filters)):
+            self.hits += 1
+            return filter_properties(self.base_results, filters)
+        self.misses += 1
+        return None
+
+    def store(self, listing_type: str, filters: Dict, results: List[Dict], version=None):
+        """Remember a result set fetched from the database at data version `version`"""
+        self.base_listing_type = listing_type
+        self.base_filters = normalize_filters(filters)
+        self.base_results = results
+        self.base_time = time.monotonic()
+        self.base_version = version
+
+    def invalidate(self):
+        """Drop the cached result set (e.g. after a purchase or explicit refresh)"""
+        self.base_results = None
@@ -0,0 +1,218 @@
+import threading
+import queue
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+_current = threading.local()
+
+
+def current_task() -> Optional["Task"]:
+    """Return the Task being executed on the calling worker thread, if any"""
+    return getattr(_current, 'task', None)
+
+
+class TaskCancelled(BaseException):
+    """Raised by Task.check_cancelled when a task has been superseded or cancelled.
+
+    Derives from BaseException (like asyncio.CancelledError) so the broad
+    ``except Exception`` handlers around database calls do not swallow it.
+    """
+
+
+class Task:
+    """Handle for one background job submitted to a TaskRunner"""
+
+    def __init__(self, runner, key: str, generation: int, description: str = ""):
+        self.runner = runner
+        self.key = key
+        self.generation = generation
+        self.description = description
+        self.future = None
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Request cancellation; queued work is dropped, running work should poll check_cancelled"""
+        self._cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if this task is no longer wanted"""
+        if self.cancelled:
+            raise TaskCancelled(self.key)
+
+    def report_progress(self, fraction: float = None, message: str = None):
+        """Post a progress update to be delivered on the Tk thread"""
+        if not self.cancelled:
+            self.runner._post(self, 'progress', (fraction, message))
+
+
+class TaskRunner:
+    """Thread-pool task runner integrated with the Tk mainloop.
+
+    Tasks are keyed by purpose (e.g. "properties"). Submitting a task under a
+    key supersedes any in-flight task with the same key: queued work is
+    cancelled and results of work that already started are discarded.
+    Callbacks (on_success, on_error, on_progress) always run on the Tk thread.
+    """
+
+    def __init__(self, widget, max_workers: int = 4, poll_interval: int = 30,
+                 on_busy_change: Callable = None):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self.on_busy_change = on_busy_change
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ui-task")
+        self._results = queue.Queue()
+        self._active: Dict[str, Task] = {}
+        self._callbacks: Dict[Task, Dict] = {}
+        self._generations = itertools.count(1)
+        self._polling = False
+        self._closed = False
+
+        # Owning window closed: drop outstanding work
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    def submit(self, key: str, func: Callable, *args, on_success: Callable = None,
+               on_error: Callable = None, on_progress: Callable = None,
+               description: str = "", **kwargs) -> Task:
+        """Run func(*args, **kwargs) on a worker thread, superseding any task with the same key"""
+        if self._closed:
+            raise RuntimeError("TaskRunner has been shut down")
+
+        previous = self._active.get(key)
+        if previous is not None:
+            previous.cancel()
+            self._callbacks.pop(previous, None)
+
+        task = Task(self, key, next(self._generations), description)
+        self._active[key] = task
+        self._callbacks[task] = {
+            'on_success': on_success,
+            'on_error': on_error,
+            'on_progress': on_progress
+        }
+        task.future = self._executor.submit(self._run, task, func, args, kwargs)
+
+        self._notify_busy()
+        self._schedule_poll()
+        return task
+
+    def cancel(self, key: str):
+        """Cancel the in-flight task for key, discarding its result"""
+        task = self._active.pop(key, None)
+        if task is not None:
+            task.cancel()
+            self._callbacks.pop(task, None)
+            self._notify_busy()
+
+    def cancel_all(self):
+        """Cancel every in-flight task"""
+        for key in list(self._active):
+            self.cancel(key)
+
+    def is_busy(self, key: str = None) -> bool:
+        """Whether any task (or the task for key) is still in flight"""
+        if key is not None:
+            return key in self._active
+        return bool(self._active)
+
+    def busy_message(self) -> str:
+        """Description of the most recently submitted in-flight task"""
+        for task in sorted(self._active.values(), key=lambda t: t.generation, reverse=True):
+            if task.description:
+                return task.description
+        return "Working..."
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def shutdown(self):
+        """Cancel outstanding work and release the worker threads"""
+        if self._closed:
+            return
+        self._closed = True
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+
+    def _on_destroy(self, event):
+        if event.widget is self.widget:
+            self.shutdown()
+
+    def _run(self, task: Task, func: Callable, args, kwargs):
+        if task.cancelled:
+            return
+        _current.task = task
+        try:
+            result = func(*args, **kwargs)
+        except TaskCancelled:
+            return
+        except Exception as e:
+            self._post(task, 'error', e)
+        else:
+            self._post(task, 'success', result)
+        finally:
+            _current.task = None
+
+    def _post(self, task: Task, kind: str, payload):
+        self._results.put((task, kind, payload))
+
+    def _schedule_poll(self):
+        if not self._polling and not self._closed:
+            self._polling = True
+            self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Drain worker results on the Tk thread"""
+        self._polling = False
+        try:
+            if not self.widget.winfo_exists():
+                self.shutdown()
+                return
+        except Exception:
+            self.shutdown()
+            return
+
+        while True:
+            try:
+                task, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task, kind, payload)
+
+        if self._active:
+            self._schedule_poll()
+
+    def _deliver(self, task: Task, kind: str, payload):
+        # Results from superseded or cancelled tasks are dropped
+        if task.cancelled or self._active.get(task.key) is not task:
+            return
+
+        callbacks = self._callbacks.get(task, {})
+
+        if kind == 'progress':
+            if callbacks.get('on_progress'):
+                callbacks['on_progress'](*payload)
+            return
+
+        del self._active[task.key]
+        self._callbacks.pop(task, None)
+        self._notify_busy()
+
+        if kind == 'success':
+            if callbacks.get('on_success'):
+                callbacks['on_success'](payload)
+        elif callbacks.get('on_error'):
+            callbacks['on_error'](payload)
+        else:
+            print(f"Error in background task '{task.key}': {payload}")
+
+    def _notify_busy(self):
+        if self.on_busy_change and not self._closed:
+            self.on_busy_change(self.is_busy(), self.busy_message())
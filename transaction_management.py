@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ui_components import ModernButton
+from ui_components import ModernButton, BusyIndicator
 from config import Config
+from task_runner import TaskRunner
+from analytics_engine import get_analytics_engine
 from datetime import datetime
 
 class TransactionManagementWindow:
@@ -18,6 +20,7 @@ class TransactionManagementWindow:
         self.selected_transaction = None
         
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window, on_busy_change=self.busy_indicator.set_busy)
         self.load_transactions()
     
     def create_widgets(self):
@@ -46,6 +49,10 @@ class TransactionManagementWindow:
         )
         close_btn.pack(side="right")
         
+        # Background activity indicator
+        self.busy_indicator = BusyIndicator(header_content, bg=Config.PRIMARY_COLOR, fg="white")
+        self.busy_indicator.pack(side="right", padx=(0, 20))
+        
         # Main content
         main_frame = tk.Frame(self.window, bg=Config.BACKGROUND_COLOR)
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -199,17 +206,27 @@ class TransactionManagementWindow:
         self.delete_btn.configure(state="disabled")
     
     def load_transactions(self):
-        """Load transactions into the treeview"""
+        """Load transactions in the background; changing a filter supersedes the previous load"""
+        status_filter = self.status_filter.get() if self.status_filter.get() != "all" else None
+        type_filter = self.type_filter.get() if self.type_filter.get() != "all" else None
+        
+        self.task_runner.submit(
+            "transactions",
+            self.db_manager.get_all_transactions_admin,
+            status_filter,
+            type_filter,
+            on_success=self.display_transactions,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load transactions: {str(e)}"),
+            description="Loading transactions..."
+        )
+    
+    def display_transactions(self, transactions):
+        """Fill the treeview with loaded transactions"""
         # Clear existing items
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         try:
-            status_filter = self.status_filter.get() if self.status_filter.get() != "all" else None
-            type_filter = self.type_filter.get() if self.type_filter.get() != "all" else None
-            
-            transactions = self.db_manager.get_all_transactions_admin(status_filter, type_filter)
-            
             for trans in transactions:
                 # Format amount
                 amount_text = f"${trans['amount']:,.0f}"
@@ -359,9 +376,11 @@ class TransactionManagementWindow:
             try:
                 success = self.db_manager.update_transaction_status(
                     self.selected_transaction['id'], 
-                    'completed'
+                    'completed',
+                    actor_id=self.admin_user['id']
                 )
                 if success:
+                    get_analytics_engine().update_status(self.selected_transaction['id'], 'completed')
                     messagebox.showinfo("Success", "Transaction marked as completed")
                     self.load_transactions()
                     self.clear_details()
@@ -386,8 +405,9 @@ class TransactionManagementWindow:
         
         if result:
             try:
-                success = self.db_manager.cancel_transaction(self.selected_transaction['id'])
+                success = self.db_manager.cancel_transaction(self.selected_transaction['id'], actor_id=self.admin_user['id'])
                 if success:
+                    get_analytics_engine().update_status(self.selected_transaction['id'], 'cancelled')
                     messagebox.showinfo("Success", "Transaction cancelled successfully")
                     self.load_transactions()
                     self.clear_details()
@@ -412,8 +432,9 @@ class TransactionManagementWindow:
         
         if result:
             try:
-                success = self.db_manager.delete_transaction(self.selected_transaction['id'])
+                success = self.db_manager.delete_transaction(self.selected_transaction['id'], actor_id=self.admin_user['id'])
                 if success:
+                    get_analytics_engine().remove(self.selected_transaction['id'])
                     messagebox.showinfo("Success", "Transaction deleted successfully")
                     self.load_transactions()
                     self.clear_details()
@@ -1,47 +1,48 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from config import Config
-from image_manager import ImageManager
+from image_manager import get_image_manager, get_image_loader
+from property_search import normalize_filters
 
 class ModernButton(tk.Button):
-    def __init__(self, parent, text, command=None, style="primary", **kwargs):
-        # Color schemes for different button styles
-        styles = {
-            "primary": {
-                "bg": Config.PRIMARY_COLOR,
-                "fg": "white",
-                "activebackground": "#1E5A73",
-                "activeforeground": "white"
-            },
-            "secondary": {
-                "bg": Config.SECONDARY_COLOR,
-                "fg": "white",
-                "activebackground": "#7A2B56",
-                "activeforeground": "white"
-            },
-            "accent": {
-                "bg": Config.ACCENT_COLOR,
-                "fg": "white",
-                "activebackground": "#D17701",
-                "activeforeground": "white"
-            },
-            "success": {
-                "bg": Config.SUCCESS_COLOR,
-                "fg": "white",
-                "activebackground": "#A82A1A",
-                "activeforeground": "white"
-            },
-            "outline": {
-                "bg": "white",
-                "fg": Config.PRIMARY_COLOR,
-                "activebackground": Config.BACKGROUND_COLOR,
-                "activeforeground": Config.PRIMARY_COLOR,
-                "relief": "solid",
-                "borderwidth": 2
-            }
+    # Color schemes for different button styles
+    STYLES = {
+        "primary": {
+            "bg": Config.PRIMARY_COLOR,
+            "fg": "white",
+            "activebackground": "#1E5A73",
+            "activeforeground": "white"
+        },
+        "secondary": {
+            "bg": Config.SECONDARY_COLOR,
+            "fg": "white",
+            "activebackground": "#7A2B56",
+            "activeforeground": "white"
+        },
+        "accent": {
+            "bg": Config.ACCENT_COLOR,
+            "fg": "white",
+            "activebackground": "#D17701",
+            "activeforeground": "white"
+        },
+        "success": {
+            "bg": Config.SUCCESS_COLOR,
+            "fg": "white",
+            "activebackground": "#A82A1A",
+            "activeforeground": "white"
+        },
+        "outline": {
+            "bg": "white",
+            "fg": Config.PRIMARY_COLOR,
+            "activebackground": Config.BACKGROUND_COLOR,
+            "activeforeground": Config.PRIMARY_COLOR,
+            "relief": "solid",
+            "borderwidth": 2
         }
-        
-        style_config = styles.get(style, styles["primary"])
+    }
+    
+    def __init__(self, parent, text, command=None, style="primary", **kwargs):
+        style_config = self.STYLES.get(style, self.STYLES["primary"])
         
         # Merge style_config with kwargs, giving priority to kwargs
         button_config = {
@@ -67,6 +68,13 @@ class ModernButton(tk.Button):
         self.original_bg = self.cget("bg")
         self.original_fg = self.cget("fg")
     
+    def set_style(self, style):
+        """Switch to another color scheme (used when recycled cards change listing type)"""
+        style_config = self.STYLES.get(style, self.STYLES["primary"])
+        self.configure(**style_config)
+        self.original_bg = self.cget("bg")
+        self.original_fg = self.cget("fg")
+    
     def on_enter(self, event):
         self.configure(bg=self.cget("activebackground"))
     
@@ -115,6 +123,49 @@ class ModernEntry(tk.Entry):
         value = self.get()
         return value if value != self.placeholder else ""
 
+class BusyIndicator(tk.Label):
+    """Status bar spinner driven by a TaskRunner's busy callback"""
+
+    FRAMES = "⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏"
+
+    def __init__(self, parent, **kwargs):
+        label_config = {
+            "font": (Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            "bg": Config.BORDER_COLOR,
+            "fg": Config.PRIMARY_COLOR,
+            "anchor": "e"
+        }
+        label_config.update(kwargs)
+
+        super().__init__(parent, text="", **label_config)
+
+        self.busy = False
+        self.message = ""
+        self.frame_index = 0
+        self.after_id = None
+
+    def set_busy(self, busy, message=""):
+        """Show or hide the spinner"""
+        self.busy = busy
+        self.message = message
+
+        if busy and self.after_id is None:
+            self.animate()
+        elif not busy:
+            if self.after_id is not None:
+                self.after_cancel(self.after_id)
+                self.after_id = None
+            self.configure(text="")
+
+    def animate(self):
+        self.frame_index = (self.frame_index + 1) % len(self.FRAMES)
+        self.render()
+        self.after_id = self.after(100, self.animate)
+
+    def render(self):
+        if self.busy:
+            self.configure(text=f"{self.FRAMES[self.frame_index]} {self.message}")
+
 class PropertyCard(tk.Frame):
     def __init__(self, parent, property_data, on_click=None, **kwargs):
         # Prepare frame configuration
@@ -129,117 +180,72 @@ class PropertyCard(tk.Frame):
         
         self.property_data = property_data
         self.on_click = on_click
-        self.image_manager = ImageManager()
+        self.image_manager = get_image_manager()
+        self.image_pending = False  # Decode cancelled while hidden; redo when shown again
         
         self.create_widgets()
+        self.update_widgets()
         self.bind_events()
     
     def create_widgets(self):
+        """Build the card's widget tree; contents are filled in by update_widgets"""
         # Main container with padding
         main_frame = tk.Frame(self, bg=Config.CARD_COLOR)
         main_frame.pack(fill="both", expand=True, padx=12, pady=12)
+        self.main_frame = main_frame
         
         # Property image
         image_frame = tk.Frame(main_frame, bg=Config.BORDER_COLOR, height=120)
         image_frame.pack(fill="x", pady=(0, 10))
         image_frame.pack_propagate(False)
         
-        # Load and display property image
-        try:
-            primary_image = self.property_data.get('primary_image')
-            if primary_image:
-                img = self.image_manager.load_image_for_display(
-                    primary_image, 
-                    size=(320, 120),
-                    thumbnail=True
-                )
-                
-                image_label = tk.Label(
-                    image_frame,
-                    image=img,
-                    bg="white"
-                )
-                image_label.pack(expand=True)
-                # Keep reference to prevent garbage collection
-                image_label.image = img
-            else:
-                # Placeholder if no image
-                image_label = tk.Label(
-                    image_frame,
-                    text="📷 No Image",
-                    font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
-                    bg=Config.BORDER_COLOR,
-                    fg=Config.TEXT_SECONDARY
-                )
-                image_label.pack(expand=True)
-        except Exception as e:
-            print(f"Error loading property image: {e}")
-            # Fallback placeholder
-            image_label = tk.Label(
-                image_frame,
-                text="📷 Image Error",
-                font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
-                bg=Config.BORDER_COLOR,
-                fg=Config.TEXT_SECONDARY
-            )
-            image_label.pack(expand=True)
-        
-        # Title (truncated if too long)
-        title_text = self.property_data['title']
-        if len(title_text) > 25:
-            title_text = title_text[:22] + "..."
+        self.image_label = tk.Label(
+            image_frame,
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            bg=Config.BORDER_COLOR,
+            fg=Config.TEXT_SECONDARY
+        )
+        self.image_label.pack(expand=True)
         
-        title_label = tk.Label(
+        # Title
+        self.title_label = tk.Label(
             main_frame,
-            text=title_text,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_PRIMARY,
             anchor="w"
         )
-        title_label.pack(fill="x", pady=(0, 5))
+        self.title_label.pack(fill="x", pady=(0, 5))
         
         # Price
-        price_text = f"${self.property_data['price']:,.0f}"
-        if self.property_data['listing_type'] == 'rent':
-            price_text += "/mo"
-        
-        price_label = tk.Label(
+        self.price_label = tk.Label(
             main_frame,
-            text=price_text,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_MEDIUM, "bold"),
             bg=Config.CARD_COLOR,
             fg=Config.PRIMARY_COLOR,
             anchor="w"
         )
-        price_label.pack(fill="x", pady=(0, 5))
+        self.price_label.pack(fill="x", pady=(0, 5))
         
         # Property details (compact)
-        details_text = f"{self.property_data['bedrooms']}bd • {self.property_data['bathrooms']}ba • {self.property_data['square_feet']} sqft"
-        details_label = tk.Label(
+        self.details_label = tk.Label(
             main_frame,
-            text=details_text,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_SECONDARY,
             anchor="w"
         )
-        details_label.pack(fill="x", pady=(0, 5))
+        self.details_label.pack(fill="x", pady=(0, 5))
         
-        # Location (truncated)
-        location_text = f"{self.property_data['city']}, {self.property_data['state']}"
-        if len(location_text) > 20:
-            location_text = location_text[:17] + "..."
-        
-        location_label = tk.Label(
+        # Location
+        self.location_label = tk.Label(
             main_frame,
-            text=location_text,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
             bg=Config.CARD_COLOR,
             fg=Config.TEXT_SECONDARY,
             anchor="w"
         )
-        location_label.pack(fill="x", pady=(0, 10))
+        self.location_label.pack(fill="x", pady=(0, 10))
         
         # Action buttons (smaller for grid layout)
         button_frame = tk.Frame(main_frame, bg=Config.CARD_COLOR)
@@ -257,35 +263,110 @@ class PropertyCard(tk.Frame):
         )
         view_btn.pack(side="left", padx=(0, 5))
         
-        # Quick action button (smaller)
-        action_text = "Buy" if self.property_data['listing_type'] == 'sale' else "Rent"
-        action_style = "success" if self.property_data['listing_type'] == 'sale' else "accent"
-        
-        action_btn = ModernButton(
+        # Quick action button (smaller); text and style depend on the listing type
+        self.action_btn = ModernButton(
             button_frame,
-            text=action_text,
+            text="",
             command=lambda: self.on_click(self.property_data, action_type="transaction") if self.on_click else None,
-            style=action_style,
             font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL, "bold"),
             padx=8,
             pady=5
         )
-        action_btn.pack(side="left")
+        self.action_btn.pack(side="left")
+    
+    def update_widgets(self):
+        """Show the current property_data in the existing widgets"""
+        self.update_image()
+        
+        # Title (truncated if too long)
+        title_text = self.property_data['title']
+        if len(title_text) > 25:
+            title_text = title_text[:22] + "..."
+        self.title_label.configure(text=title_text)
+        
+        # Price
+        price_text = f"${self.property_data['price']:,.0f}"
+        if self.property_data['listing_type'] == 'rent':
+            price_text += "/mo"
+        self.price_label.configure(text=price_text)
+        
+        details_text = f"{self.property_data['bedrooms']}bd • {self.property_data['bathrooms']}ba • {self.property_data['square_feet']} sqft"
+        self.details_label.configure(text=details_text)
+        
+        # Location (truncated)
+        location_text = f"{self.property_data['city']}, {self.property_data['state']}"
+        if len(location_text) > 20:
+            location_text = location_text[:17] + "..."
+        self.location_label.configure(text=location_text)
+        
+        if self.property_data['listing_type'] == 'sale':
+            self.action_btn.set_style("success")
+            self.action_btn.configure(text="Buy")
+        else:
+            self.action_btn.set_style("accent")
+            self.action_btn.configure(text="Rent")
+    
+    def update_image(self):
+        """Show the property image, decoded in the background behind a placeholder"""
+        loader = get_image_loader(self)
+        self.image_pending = False
+        primary_image = self.property_data.get('primary_image')
+        if primary_image:
+            if not loader.load(self.image_label, primary_image, "card", on_error=self.on_image_error):
+                self.show_image_preview()
+        else:
+            # Placeholder if no image
+            loader.cancel(self.image_label)
+            self.image_label.configure(image="", text="📷 No Image", bg=Config.BORDER_COLOR)
+            self.image_label.image = None
+    
+    def show_image_preview(self):
+        """Blurred preview from the stored BlurHash (or the dominant color) while the thumbnail decodes"""
+        preview = self.image_manager.blurhash_preview_for_display(
+            self.property_data.get('primary_blurhash'),
+            Config.IMAGE_RENDITIONS["card"]
+        )
+        if preview is not None:
+            self.image_label.configure(image=preview, text="", bg="white")
+        else:
+            bg = self.property_data.get('primary_color') or Config.BORDER_COLOR
+            self.image_label.configure(image="", text="📷 Loading...", bg=bg)
+        # Keep reference to prevent garbage collection
+        self.image_label.image = preview
+    
+    def on_image_error(self, error):
+        print(f"Error loading property image: {error}")
+        # Fallback placeholder
+        self.image_label.configure(image="", text="📷 Image Error", bg=Config.BORDER_COLOR)
+        self.image_label.image = None
+    
+    def cancel_image_load(self):
+        """Drop a pending image decode (card scrolled out of view)"""
+        if get_image_loader(self).cancel(self.image_label):
+            self.image_pending = True
+    
+    def set_property(self, property_data):
+        """Rebind the card to another listing in place, without recreating widgets"""
+        if property_data is self.property_data:
+            if self.image_pending:
+                self.update_image()
+            return
+        self.property_data = property_data
+        self.update_widgets()
+    
+    def on_card_click(self, event):
+        # Check if click was on a button
+        widget = event.widget
+        if isinstance(widget, ModernButton):
+            return
+        
+        if self.on_click:
+            self.on_click(self.property_data, action_type="view")
     
     def bind_events(self):
         # Make the entire card clickable for viewing details (except buttons)
-        def on_card_click(event):
-            # Check if click was on a button
-            widget = event.widget
-            if isinstance(widget, ModernButton):
-                return
-            
-            if self.on_click:
-                self.on_click(self.property_data, action_type="view")
-        
-        # Bind click event to card and non-button children
-        self.bind("<Button-1>", on_card_click)
-        self.bind_click_to_children(self, on_card_click)
+        self.bind("<Button-1>", self.on_card_click)
+        self.bind_click_to_children(self, self.on_card_click)
     
     def bind_click_to_children(self, widget, callback):
         """Recursively bind click event to non-button children"""
@@ -294,15 +375,254 @@ class PropertyCard(tk.Frame):
                 child.bind("<Button-1>", callback)
                 self.bind_click_to_children(child, callback)
 
+class CardPool:
+    """Pool of card widgets that are rebound to new data instead of rebuilt.
+
+    Cards must implement `set_property(data)`. Releasing a card keeps it for
+    the next acquire; `trim` destroys only the spares beyond what is needed.
+    """
+    
+    def __init__(self, create_card, destroy_card=None, max_spare=6):
+        self.create_card = create_card
+        self.destroy_card = destroy_card or (lambda card: card.destroy())
+        self.max_spare = max_spare
+        self.spare = []
+        
+        # Counters for benchmarking
+        self.created = 0
+        self.reused = 0
+        self.destroyed = 0
+    
+    def acquire(self, item):
+        """Return a card showing item, reusing a spare one when possible"""
+        if self.spare:
+            card = self.spare.pop()
+            card.set_property(item)
+            self.reused += 1
+            return card
+        
+        self.created += 1
+        return self.create_card(item)
+    
+    def release(self, card):
+        """Return a card to the pool"""
+        self.spare.append(card)
+    
+    def trim(self, keep=None):
+        """Destroy spare cards beyond `keep` (default max_spare)"""
+        keep = self.max_spare if keep is None else keep
+        while len(self.spare) > keep:
+            self.destroy_card(self.spare.pop(0))
+            self.destroyed += 1
+
+class VirtualPropertyGrid(tk.Frame):
+    """Scrollable card grid that only materializes the rows in view.
+
+    The canvas scroll region is sized for every item, but cards exist only for
+    the visible rows plus `overscan` rows above and below. Cards come from a
+    CardPool: those scrolled out of view or left over after a filter change
+    are hidden and rebound to incoming rows, so widget count and time to first
+    paint do not depend on the item count.
+    """
+    
+    def __init__(self, parent, create_card, columns=3, card_height=300, padding=10, overscan=1, **kwargs):
+        frame_config = {"bg": Config.BACKGROUND_COLOR}
+        frame_config.update(kwargs)
+        
+        super().__init__(parent, **frame_config)
+        
+        self.create_card = create_card
+        self.columns = columns
+        self.card_height = card_height
+        self.padding = padding
+        self.overscan = overscan
+        
+        self.items = []
+        self.visible = {}  # item index -> card
+        self.window_ids = {}  # card -> canvas window item
+        self.cell_width = 0
+        self.refresh_pending = False
+        self.empty_text_id = None
+        
+        # Spare cards: enough for one overscan band on each side
+        self.card_pool = CardPool(
+            create_card=self.new_card,
+            destroy_card=self.discard_card,
+            max_spare=2 * overscan * columns
+        )
+        
+        self.create_widgets()
+    
+    def create_widgets(self):
+        self.canvas = tk.Canvas(self, bg=Config.BACKGROUND_COLOR, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        
+        self.canvas.configure(yscrollcommand=self.scrollbar.set, yscrollincrement=20)
+        
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.canvas.bind("<Configure>", self.on_resize)
+        
+        # Mouse wheel scrolling, also while the pointer is over a card
+        def on_mousewheel(event):
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+            self.schedule_refresh()
+        
+        self.wheel_tag = f"VirtualGridWheel{id(self)}"
+        self.canvas.bind("<MouseWheel>", on_mousewheel)
+        self.bind_class(self.wheel_tag, "<MouseWheel>", on_mousewheel)
+    
+    @property
+    def row_height(self):
+        return self.card_height + 2 * self.padding
+    
+    def set_items(self, items, empty_text=""):
+        """Replace the grid contents and scroll back to the top"""
+        self.items = items
+        
+        if self.empty_text_id is not None:
+            self.canvas.delete(self.empty_text_id)
+            self.empty_text_id = None
+        
+        if not items and empty_text:
+            self.empty_text_id = self.canvas.create_text(
+                max(self.canvas.winfo_width(), 1) // 2, 50,
+                text=empty_text,
+                font=(Config.FONT_FAMILY, Config.FONT_SIZE_LARGE),
+                fill=Config.TEXT_SECONDARY,
+                justify="center",
+                anchor="n"
+            )
+        
+        rows = (len(items) + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), rows * self.row_height))
+        self.canvas.yview_moveto(0)
+        
+        # Cards whose slot is still on screen are rebound in place
+        first, last = self.visible_range()
+        for index in list(self.visible):
+            if first <= index < last:
+                self.visible[index].set_property(items[index])
+            else:
+                self.release_card(self.visible.pop(index))
+        
+        self.refresh()
+    
+    def visible_range(self):
+        """Indices [first, last) of the items in view, including overscan rows"""
+        if not self.items:
+            return 0, 0
+        
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        rows = (len(self.items) + self.columns - 1) // self.columns
+        
+        first_row = max(0, int(top // self.row_height) - self.overscan)
+        last_row = min(rows, int((top + height) // self.row_height) + 1 + self.overscan)
+        
+        return first_row * self.columns, min(len(self.items), last_row * self.columns)
+    
+    def refresh(self):
+        """Bring materialized cards in line with the scroll position"""
+        self.refresh_pending = False
+        first, last = self.visible_range()
+        
+        # Release cards that scrolled out of the window
+        for index in [i for i in self.visible if not first <= i < last]:
+            self.release_card(self.visible.pop(index))
+        
+        # Bind cards to rows that scrolled in
+        for index in range(first, last):
+            if index not in self.visible:
+                self.visible[index] = self.show_card(index)
+        
+        self.card_pool.trim()
+    
+    def schedule_refresh(self):
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.after_idle(self.refresh)
+    
+    def new_card(self, item):
+        card = self.create_card(self.canvas, item)
+        self.window_ids[card] = self.canvas.create_window(0, 0, window=card, anchor="nw")
+        self.add_wheel_tag(card)
+        return card
+    
+    def discard_card(self, card):
+        self.canvas.delete(self.window_ids.pop(card))
+        card.destroy()
+    
+    def show_card(self, index):
+        card = self.card_pool.acquire(self.items[index])
+        self.place_card(card, index)
+        self.canvas.itemconfigure(self.window_ids[card], state="normal")
+        return card
+    
+    def release_card(self, card):
+        self.canvas.itemconfigure(self.window_ids[card], state="hidden")
+        # Don't spend decode time on cards nobody can see
+        if hasattr(card, "cancel_image_load"):
+            card.cancel_image_load()
+        self.card_pool.release(card)
+    
+    def add_wheel_tag(self, widget):
+        """Route wheel events from a card and its descendants to the grid"""
+        tags = widget.bindtags()
+        if self.wheel_tag not in tags:
+            widget.bindtags((self.wheel_tag,) + tags)
+        for child in widget.winfo_children():
+            self.add_wheel_tag(child)
+    
+    def place_card(self, card, index):
+        row, col = divmod(index, self.columns)
+        self.canvas.coords(
+            self.window_ids[card],
+            col * self.cell_width + self.padding,
+            row * self.row_height + self.padding
+        )
+        self.canvas.itemconfigure(
+            self.window_ids[card],
+            width=max(self.cell_width - 2 * self.padding, 1),
+            height=self.card_height
+        )
+    
+    def on_scrollbar(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_refresh()
+    
+    def on_resize(self, event):
+        self.cell_width = event.width // self.columns
+        
+        rows = (len(self.items) + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, event.width, rows * self.row_height))
+        
+        if self.empty_text_id is not None:
+            self.canvas.coords(self.empty_text_id, event.width // 2, 50)
+        
+        for index, card in self.visible.items():
+            self.place_card(card, index)
+        self.schedule_refresh()
+
 class SearchFilter(tk.Frame):
-    def __init__(self, parent, on_filter_change=None, **kwargs):
+    def __init__(self, parent, on_filter_change=None, live=True, on_refresh=None, **kwargs):
         frame_config = {"bg": Config.BACKGROUND_COLOR}
         frame_config.update(kwargs)
         
         super().__init__(parent, **frame_config)
         
         self.on_filter_change = on_filter_change
+        # Explicit Apply and Clear go here when given (a fresh query), live searches to on_filter_change
+        self.on_refresh = on_refresh
+        
+        # Live search state
+        self.live_var = tk.BooleanVar(value=live)
+        self.debounce_id = None
+        self.last_emitted = None
+        
         self.create_widgets()
+        self.bind_live_events()
     
     def create_widgets(self):
         # Title
@@ -396,25 +716,89 @@ class SearchFilter(tk.Frame):
         # Configure grid weights
         filter_frame.columnconfigure(1, weight=1)
         
-        # Apply filter button
+        self.type_combo = type_combo
+        self.bedrooms_combo = bedrooms_combo
+        
+        # Apply filter button and live search toggle
+        actions_frame = tk.Frame(self, bg=Config.BACKGROUND_COLOR)
+        actions_frame.pack(pady=(10, 0))
+        
         apply_btn = ModernButton(
-            self,
+            actions_frame,
             text="Apply Filters",
             command=self.apply_filters,
             style="primary"
         )
-        apply_btn.pack(pady=(10, 0))
+        apply_btn.pack(side="left")
+        
+        live_check = tk.Checkbutton(
+            actions_frame,
+            text="Live search",
+            variable=self.live_var,
+            font=(Config.FONT_FAMILY, Config.FONT_SIZE_SMALL),
+            bg=Config.BACKGROUND_COLOR,
+            fg=Config.TEXT_PRIMARY,
+            activebackground=Config.BACKGROUND_COLOR
+        )
+        live_check.pack(side="left", padx=(10, 0))
+    
+    def bind_live_events(self):
+        """Schedule a debounced search whenever an input changes"""
+        for entry in (self.location_entry, self.min_price_entry, self.max_price_entry):
+            entry.bind("<KeyRelease>", self.on_input_changed, add="+")
+        for combo in (self.type_combo, self.bedrooms_combo):
+            combo.bind("<<ComboboxSelected>>", self.on_input_changed, add="+")
+    
+    def on_input_changed(self, event=None):
+        if not self.live_var.get():
+            return
+        
+        if self.debounce_id is not None:
+            self.after_cancel(self.debounce_id)
+        self.debounce_id = self.after(Config.SEARCH_DEBOUNCE_MS, self.live_search)
+    
+    def live_search(self):
+        """Emit the current filters unless they are incomplete or unchanged"""
+        self.debounce_id = None
+        try:
+            filters = self.get_filters()
+        except ValueError:
+            # Half-typed price; wait for more input
+            return
+        
+        if normalize_filters(filters) == self.last_emitted:
+            return
+        
+        self.emit(filters)
+    
+    def get_filters(self):
+        """Read the filter inputs; raises ValueError on a malformed price"""
+        return {
+            'city': self.location_entry.get_value(),
+            'property_type': self.type_var.get() if self.type_var.get() else None,
+            'min_price': float(self.min_price_entry.get_value()) if self.min_price_entry.get_value() else None,
+            'max_price': float(self.max_price_entry.get_value()) if self.max_price_entry.get_value() else None,
+            'bedrooms': int(self.bedrooms_var.get()) if self.bedrooms_var.get() and self.bedrooms_var.get() != "5+" else None
+        }
+    
+    def emit(self, filters, refresh=False):
+        self.last_emitted = normalize_filters(filters)
+        callback = self.on_refresh if refresh and self.on_refresh else self.on_filter_change
+        if callback:
+            callback(filters)
     
     def apply_filters(self):
-        if self.on_filter_change:
-            filters = {
-                'city': self.location_entry.get_value(),
-                'property_type': self.type_var.get() if self.type_var.get() else None,
-                'min_price': float(self.min_price_entry.get_value()) if self.min_price_entry.get_value() else None,
-                'max_price': float(self.max_price_entry.get_value()) if self.max_price_entry.get_value() else None,
-                'bedrooms': int(self.bedrooms_var.get()) if self.bedrooms_var.get() and self.bedrooms_var.get() != "5+" else None
-            }
-            self.on_filter_change(filters)
+        if self.debounce_id is not None:
+            self.after_cancel(self.debounce_id)
+            self.debounce_id = None
+        
+        try:
+            filters = self.get_filters()
+        except ValueError:
+            messagebox.showerror("Invalid Filter", "Please enter a valid number for the price range.")
+            return
+        
+        self.emit(filters, refresh=True)
     
     def clear_filters(self):
         self.location_entry.delete(0, tk.END)
@@ -422,5 +806,4 @@ class SearchFilter(tk.Frame):
         self.min_price_entry.delete(0, tk.END)
         self.max_price_entry.delete(0, tk.END)
         self.bedrooms_var.set("")
-        if self.on_filter_change:
-            self.on_filter_change({})
\ No newline at end of file
+        self.emit({}, refresh=True)
\ No newline at end of file
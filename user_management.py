@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from ui_components import ModernButton, ModernEntry
+from ui_components import ModernButton, ModernEntry, BusyIndicator
 from config import Config
+from task_runner import TaskRunner
+from analytics_engine import get_analytics_engine
 
 class UserManagementWindow:
     def __init__(self, parent, db_manager, admin_user):
@@ -17,6 +19,7 @@ class UserManagementWindow:
         self.selected_user = None
         
         self.create_widgets()
+        self.task_runner = TaskRunner(self.window, on_busy_change=self.busy_indicator.set_busy)
         self.load_users()
     
     def create_widgets(self):
@@ -45,6 +48,10 @@ class UserManagementWindow:
         )
         close_btn.pack(side="right")
         
+        # Background activity indicator
+        self.busy_indicator = BusyIndicator(header_content, bg=Config.PRIMARY_COLOR, fg="white")
+        self.busy_indicator.pack(side="right", padx=(0, 20))
+        
         # Main content
         main_frame = tk.Frame(self.window, bg=Config.BACKGROUND_COLOR)
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
@@ -168,14 +175,22 @@ class UserManagementWindow:
         self.delete_btn.configure(state="disabled")
     
     def load_users(self):
-        """Load all users into the treeview"""
+        """Load all users in the background"""
+        self.task_runner.submit(
+            "users",
+            self.db_manager.get_all_users_admin,
+            on_success=self.display_users,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load users: {str(e)}"),
+            description="Loading users..."
+        )
+    
+    def display_users(self, users):
+        """Fill the treeview with loaded users"""
         # Clear existing items
         for item in self.tree.get_children():
             self.tree.delete(item)
         
         try:
-            users = self.db_manager.get_all_users_admin()
-            
             for user in users:
                 full_name = f"{user['first_name']} {user['last_name']}"
                 status = "Active" if user['is_active'] else "Inactive"
@@ -331,7 +346,8 @@ class UserManagementWindow:
         
         if result:
             try:
-                success = self.db_manager.update_user_status(self.selected_user['id'], new_status)
+                success = self.db_manager.update_user_status(self.selected_user['id'], new_status,
+                                                             actor_id=self.admin_user['id'])
                 if success:
                     messagebox.showinfo("Success", f"User {action}d successfully")
                     self.load_users()
@@ -358,8 +374,11 @@ class UserManagementWindow:
         
         if result:
             try:
-                success = self.db_manager.delete_user(self.selected_user['id'])
-                if success:
+                transaction_ids = self.db_manager.delete_user(self.selected_user['id'], actor_id=self.admin_user['id'])
+                if transaction_ids is not None:
+                    engine = get_analytics_engine()
+                    for transaction_id in transaction_ids:
+                        engine.remove(transaction_id)
                     messagebox.showinfo("Success", "User deleted successfully")
                     self.load_users()
                     self.clear_details()